@@ -0,0 +1,117 @@
+"""
+In process stand in for the aiokafka client, so the KafkaQueueConnector code path runs
+without a broker. The topics are multiprocessing queues created before the workers fork.
+"""
+import asyncio
+from multiprocessing import Queue
+from queue import Empty
+from typing import Dict, List
+
+from aiokafka import ConsumerRecord
+from kafka import TopicPartition
+
+# Time in seconds between the topic polls of a long poll getmany
+POLL_INTERVAL = 0.001
+
+
+class FakeBroker:
+    _topics: Dict[str, Queue] = {}
+
+    @classmethod
+    def topic(cls, name: str) -> Queue:
+        if name not in cls._topics:
+            cls._topics[name] = Queue()
+        return cls._topics[name]
+
+
+class FakeAIOKafkaConsumer:
+    def __init__(self, topic: str, **_):
+        self._topic = topic
+        self._topic_partition = TopicPartition(topic, 0)
+        self._offset = 0
+        self._paused = set()
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def assignment(self) -> set:
+        return {self._topic_partition}
+
+    def paused(self) -> set:
+        return set(self._paused)
+
+    def pause(self, *partitions: TopicPartition):
+        self._paused.update(partitions)
+
+    def resume(self, *partitions: TopicPartition):
+        self._paused.difference_update(partitions)
+
+    async def commit(self, offsets: dict):
+        pass
+
+    async def getmany(
+        self, timeout_ms: int = 0, max_records: int | None = None
+    ) -> Dict[TopicPartition, List[ConsumerRecord]]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        records = []
+        if self._topic_partition in self._paused:
+            await asyncio.sleep(timeout_ms / 1000)
+            return {}
+        queue = FakeBroker.topic(self._topic)
+        while True:
+            try:
+                while max_records is None or len(records) < max_records:
+                    records.append(self._record(queue.get_nowait()))
+            except Empty:
+                pass
+            if records or loop.time() >= deadline:
+                break
+            await asyncio.sleep(POLL_INTERVAL)
+        if not records:
+            return {}
+        return {self._topic_partition: records}
+
+    def _record(self, value: bytes) -> ConsumerRecord:
+        self._offset += 1
+        return ConsumerRecord(
+            topic=self._topic,
+            partition=0,
+            offset=self._offset,
+            timestamp=0,
+            timestamp_type=0,
+            key=None,
+            value=value,
+            checksum=None,
+            serialized_key_size=0,
+            serialized_value_size=len(value),
+            headers=(),
+        )
+
+
+class FakeAIOKafkaProducer:
+    def __init__(self, **_):
+        pass
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def send(self, topic: str, value: bytes) -> asyncio.Future:
+        FakeBroker.topic(topic).put_nowait(value)
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(None)
+        return delivery
+
+
+def install():
+    # pylint: disable=C0415
+    from romeways_kafka_queue.infrastructure.connector import infrastructure
+
+    infrastructure.AIOKafkaConsumer = FakeAIOKafkaConsumer
+    infrastructure.AIOKafkaProducer = FakeAIOKafkaProducer
@@ -0,0 +1,45 @@
+"""
+Micro benchmarks of the message decoding that runs for every retrieved message.
+"""
+import timeit
+from typing import Dict
+
+from romeways import LazyMessage, Message
+from romeways.src.infrastructure.codec import JsonCodec, OrjsonCodec
+
+RAW = b"x" * 100
+ENVELOPE = JsonCodec().encode({"payload": "x" * 100, "rw_resend_times": 1})
+
+
+def _cases() -> Dict[str, tuple]:
+    cases = {
+        "message.raw.json": (Message, RAW, JsonCodec()),
+        "message.envelope.json": (Message, ENVELOPE, JsonCodec()),
+        "lazy_message.envelope.json": (LazyMessage, ENVELOPE, JsonCodec()),
+    }
+    try:
+        cases["message.envelope.orjson"] = (Message, ENVELOPE, OrjsonCodec())
+    except ImportError:
+        pass
+    return cases
+
+
+def run_micro(number: int = 100_000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Best of repeat runs in nanoseconds per from_message call and payload access, so
+    the lazy cases also pay for the decode that they defer
+    """
+    results = {}
+    for name, (message_type, data, codec) in _cases().items():
+        timer = timeit.Timer(
+            lambda message_type=message_type, data=data, codec=codec: (
+                message_type.from_message(message=data, codec=codec).payload
+            )
+        )
+        results[name] = min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+    return results
+
+
+if __name__ == "__main__":
+    for case, nanoseconds in run_micro().items():
+        print(f"{case:<32} {nanoseconds:>10.1f} ns")
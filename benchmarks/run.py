@@ -0,0 +1,163 @@
+"""
+Runs the benchmark matrix and compares it against a stored baseline.
+
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Each matrix axis can be narrowed or widened from the command line, the exit code is 1
+when a result regressed past the tolerance of the baseline.
+"""
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.message import run_micro
+from benchmarks.scenario import Scenario
+
+ROOT = Path(__file__).resolve().parent.parent
+# Result metrics and if an increase of them is a regression
+METRICS = {
+    "msgs_per_s": False,
+    "p50_ms": True,
+    "p99_ms": True,
+    "peak_rss_mb": True,
+    "ns_per_op": True,
+}
+
+
+def _parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connectors", nargs="+", default=["memory", "kafka"])
+    parser.add_argument("--chunk-sizes", nargs="+", type=int, default=[1, 100])
+    parser.add_argument("--modes", nargs="+", default=["sequential", "concurrent"])
+    parser.add_argument("--payload-sizes", nargs="+", type=int, default=[100])
+    parser.add_argument(
+        "--handler-latencies",
+        nargs="+",
+        type=float,
+        default=[0.0],
+        help="Seconds that the handler awaits for each message",
+    )
+    parser.add_argument("--spawn-processes", nargs="+", type=int, default=[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Messages per second sent, 0 sends them all at once",
+    )
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--skip-micro", action="store_true")
+    return parser.parse_args(argv)
+
+
+def _scenarios(args: argparse.Namespace) -> List[Scenario]:
+    scenarios = []
+    for (
+        connector,
+        max_chunk_size,
+        mode,
+        payload_size,
+        handler_latency,
+        spawn_process,
+    ) in itertools.product(
+        args.connectors,
+        args.chunk_sizes,
+        args.modes,
+        args.payload_sizes,
+        args.handler_latencies,
+        args.spawn_processes,
+    ):
+        scenarios.append(
+            Scenario(
+                connector=connector,
+                max_chunk_size=max_chunk_size,
+                sequential=mode == "sequential",
+                payload_size=payload_size,
+                handler_latency=handler_latency,
+                spawn_process=spawn_process,
+                messages=args.messages,
+                rate=args.rate,
+                timeout=args.timeout,
+            )
+        )
+    return scenarios
+
+
+def _run_scenario(scenario: Scenario) -> dict:
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.scenario", json.dumps(asdict(scenario))],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=scenario.timeout * 2,
+        check=False,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"The scenario {scenario.name} failed\n{process.stderr}")
+    result = json.loads(process.stdout.splitlines()[-1])
+    return {metric: result[metric] for metric in METRICS if metric in result}
+
+
+def _compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, value in result.items():
+            expected = baseline[name].get(metric)
+            if not expected:
+                continue
+            higher_is_worse = METRICS[metric]
+            change = (value - expected) / expected
+            if (higher_is_worse and change > tolerance) or (
+                not higher_is_worse and change < -tolerance
+            ):
+                regressions.append(
+                    f"{name} {metric} {value:.2f} against {expected:.2f} ({change:+.0%})"
+                )
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+    results = {}
+    if not args.skip_micro:
+        for name, nanoseconds in run_micro().items():
+            results[name] = {"ns_per_op": nanoseconds}
+            print(f"{name:<72} {nanoseconds:>10.1f} ns/op")
+    print(f"{'scenario':<72} {'msgs/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'rss MB':>8}")
+    for scenario in _scenarios(args):
+        result = _run_scenario(scenario)
+        results[scenario.name] = result
+        print(
+            f"{scenario.name:<72} {result['msgs_per_s']:>10.0f} "
+            f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+            f"{result['peak_rss_mb']:>8.1f}"
+        )
+    if args.save_baseline is not None:
+        args.save_baseline.write_text(json.dumps(results, indent=2, sort_keys=True))
+    if args.baseline is None:
+        return 0
+    regressions = _compare(
+        results=results,
+        baseline=json.loads(args.baseline.read_text()),
+        tolerance=args.tolerance,
+    )
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
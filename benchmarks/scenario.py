@@ -0,0 +1,180 @@
+"""
+Runs one benchmark scenario through GuideService and prints its result as json.
+It runs on its own interpreter, started by benchmarks.run, so the GuideService
+singleton, the registries and the peak RSS do not leak between scenarios.
+"""
+import asyncio
+import json
+import logging
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from multiprocessing import Queue
+from queue import Empty
+from typing import Callable, List
+
+import romeways
+from romeways.src.service.guide import GuideService
+
+CONNECTOR_NAME = "benchmark"
+QUEUE_NAME = "benchmark"
+# Time in seconds that a blocking fetch waits for messages
+FREQUENCY = 0.1
+
+# Latency results queue and handler latency of the running scenario, read by handler
+_STATE = {"results": None, "handler_latency": 0.0}
+
+
+@dataclass(slots=True, frozen=True)
+class Scenario:  # pylint: disable=R0902
+    """
+    connector: str memory or kafka, the later runs KafkaQueueConnector on a fake client
+    max_chunk_size: int Queue config max_chunk_size
+    sequential: bool Queue config sequential
+    payload_size: int Bytes of each message
+    handler_latency: float Time in seconds that the handler awaits for each message
+    spawn_process: int Connector spawn_process, 0 runs the handler on this process
+    messages: int Messages sent to the queue
+    rate: float Messages per second sent to the queue, 0 sends them all at once
+    timeout: float Max time in seconds to wait all the messages to be handled
+    """
+
+    connector: str
+    max_chunk_size: int
+    sequential: bool
+    payload_size: int
+    handler_latency: float
+    spawn_process: int
+    messages: int
+    rate: float = 0.0
+    timeout: float = 120.0
+
+    @property
+    def name(self) -> str:
+        mode = "sequential" if self.sequential else "concurrent"
+        return (
+            f"{self.connector}-chunk{self.max_chunk_size}-{mode}-"
+            f"payload{self.payload_size}-handler{self.handler_latency * 1000:g}ms-"
+            f"spawn{self.spawn_process}"
+        )
+
+
+async def handler(message: romeways.Message):
+    if _STATE["handler_latency"]:
+        await asyncio.sleep(_STATE["handler_latency"])
+    sent_at = float(message.payload.split(" ", 1)[0])
+    _STATE["results"].put_nowait(time.time() - sent_at)
+
+
+def _register(scenario: Scenario) -> Callable[[bytes], None]:
+    # astroid misses the fields of the extras configs, subclasses of dataclasses
+    # with kw_only fields
+    # pylint: disable=E1123
+    queue_kwargs = {
+        "connector_name": CONNECTOR_NAME,
+        "frequency": FREQUENCY,
+        "max_chunk_size": scenario.max_chunk_size,
+        "sequential": scenario.sequential,
+    }
+    if scenario.connector == "memory":
+        queue = Queue()
+        romeways.connector_register(
+            connector=romeways.MemoryQueueConnector,
+            config=romeways.MemoryConnectorConfig(connector_name=CONNECTOR_NAME),
+            spawn_process=scenario.spawn_process,
+        )
+        config = romeways.MemoryQueueConfig(queue=queue, **queue_kwargs)
+    elif scenario.connector == "kafka":
+        # pylint: disable=C0415
+        from benchmarks.fake_kafka import FakeBroker, install
+
+        install()
+        queue = FakeBroker.topic(QUEUE_NAME)
+        romeways.connector_register(
+            connector=romeways.KafkaQueueConnector,
+            config=romeways.KafkaConnectorConfig(
+                connector_name=CONNECTOR_NAME,
+                bootstrap_server="fake:9092",
+                client_id="benchmark",
+            ),
+            spawn_process=scenario.spawn_process,
+        )
+        config = romeways.KafkaQueueConfig(
+            topic=QUEUE_NAME, group_id="benchmark", **queue_kwargs
+        )
+    else:
+        raise ValueError(f"The connector {scenario.connector} is not supported")
+    romeways.queue_consumer(queue_name=QUEUE_NAME, config=config)(handler)
+    return queue.put_nowait
+
+
+async def _produce(scenario: Scenario, send: Callable[[bytes], None]):
+    started = time.time()
+    for index in range(scenario.messages):
+        if scenario.rate > 0:
+            await asyncio.sleep(max(started + index / scenario.rate - time.time(), 0))
+        header = f"{time.time():.6f} "
+        send((header + "x" * max(scenario.payload_size - len(header), 0)).encode())
+
+
+def _collect(results: Queue, messages: int, deadline: float) -> List[float]:
+    latencies = []
+    while len(latencies) < messages:
+        try:
+            latencies.append(results.get(timeout=max(deadline - time.time(), 0)))
+        except Empty as exception:
+            raise TimeoutError(
+                f"Only {len(latencies)} of {messages} messages were handled"
+            ) from exception
+    return latencies
+
+
+def percentile(values: List[float], quantile: float) -> float:
+    """
+    Nearest rank percentile of sorted values
+    """
+    rank = max(int(round(quantile * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+async def run_scenario(scenario: Scenario) -> dict:
+    results = Queue()
+    _STATE["results"] = results
+    _STATE["handler_latency"] = scenario.handler_latency
+    send = _register(scenario)
+    guide_service = GuideService()
+    await guide_service.start()
+    started = time.time()
+    producer = asyncio.create_task(_produce(scenario=scenario, send=send))
+    try:
+        latencies = await asyncio.get_running_loop().run_in_executor(
+            None, _collect, results, scenario.messages, started + scenario.timeout
+        )
+        elapsed = time.time() - started
+        await producer
+    finally:
+        await guide_service.end()
+    latencies.sort()
+    # ru_maxrss is in KiB on Linux, the children are the spawned workers
+    peak_rss = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return {
+        "scenario": asdict(scenario),
+        "msgs_per_s": scenario.messages / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "peak_rss_mb": peak_rss / 1024,
+    }
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    scenario = Scenario(**json.loads(sys.argv[1]))
+    print(json.dumps(asyncio.run(run_scenario(scenario))))
+
+
+if __name__ == "__main__":
+    main()
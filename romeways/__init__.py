@@ -1,23 +1,50 @@
 from .src.romeways import (
     queue_consumer,
     connector_register,
+    codec_register,
+    metrics_register,
+    middleware_register,
+    restart_counts,
     start,
     GenericConnectorConfig,
     GenericQueueConfig,
     AQueueConnector,
+    ACodec,
+    AMetricsSink,
+    AMiddleware,
 )
-from .src.domain.exceptions.exception import ResendException
-from .src.domain.models.message import Message
+from .src.domain.exceptions.exception import (
+    ResendException,
+    BatchResendException,
+    HandlerTimeoutException,
+)
+from .src.domain.models.message import Message, LazyMessage
+from .src.domain.models.record import Record
+from .src.domain.models.handler_context import HandlerContext
+from .src.infrastructure.middleware import ProfilerMiddleware
 
 __all__ = [
     "queue_consumer",
     "connector_register",
+    "codec_register",
+    "metrics_register",
+    "middleware_register",
+    "restart_counts",
     "start",
     "GenericConnectorConfig",
     "GenericQueueConfig",
     "AQueueConnector",
+    "ACodec",
+    "AMetricsSink",
+    "AMiddleware",
     "ResendException",
+    "BatchResendException",
+    "HandlerTimeoutException",
     "Message",
+    "LazyMessage",
+    "Record",
+    "HandlerContext",
+    "ProfilerMiddleware",
 ]
 
 # Memory queue extra
@@ -26,9 +53,36 @@ try:
         MemoryConnectorConfig,
         MemoryQueueConnector,
         MemoryQueueConfig,
+        AsyncMemoryQueueConnector,
+        AsyncMemoryQueueConfig,
+    )
+
+    __all__ += (
+        "MemoryConnectorConfig",
+        "MemoryQueueConnector",
+        "MemoryQueueConfig",
+        "AsyncMemoryQueueConnector",
+        "AsyncMemoryQueueConfig",
+    )
+except ImportError as error:  # pragma: no cover
+    pass
+
+
+# Shared memory queue extra
+try:
+    from romeways_shm_queue import (
+        SharedMemoryConnectorConfig,
+        SharedMemoryQueueConnector,
+        SharedMemoryQueueConfig,
+        SharedMemoryRing,
     )
 
-    __all__ += ("MemoryConnectorConfig", "MemoryQueueConnector", "MemoryQueueConfig")
+    __all__ += (
+        "SharedMemoryConnectorConfig",
+        "SharedMemoryQueueConnector",
+        "SharedMemoryQueueConfig",
+        "SharedMemoryRing",
+    )
 except ImportError as error:  # pragma: no cover
     pass
 
@@ -0,0 +1 @@
+from .abstract import ACodec
@@ -0,0 +1,29 @@
+from abc import abstractmethod
+from typing import Any
+
+from romeways.src.core.interfaces.infrastructure.codec import ICodec
+
+
+class ACodec(ICodec):
+    """
+    Codec used to decode and encode the romeways message envelope.
+    decode must raise a ValueError subclass for data that can not be decoded.
+    text: bool If encode returns utf-8 text, binary codecs set it to False and the
+     decoded payloads are shown to the handlers as json text
+    """
+
+    text = True
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        pass
+
+    @abstractmethod
+    def encode(self, content: Any) -> bytes:
+        pass
+
+    def may_be_envelope(self, data: bytes) -> bool:
+        """
+        Cheap check to skip decode for raw messages that can not be an envelope
+        """
+        return True
@@ -0,0 +1,38 @@
+from romeways.src.core.interfaces.infrastructure.metrics_sink import IMetricsSink
+
+
+class AMetricsSink(IMetricsSink):
+    """
+    Sink of the chauffeur metrics, one instance is built for each queue handler on its
+    own process. The hooks run on the event loop and must not block, they are no-ops by
+    default so a sink only overrides the ones it records.
+    """
+
+    def __init__(self, connector_name: str, queue_name: str):
+        self.connector_name = connector_name
+        self.queue_name = queue_name
+
+    def on_fetch(self, latency: float, chunk_size: int):
+        """
+        latency: float Time in seconds spent on get_records, it includes the long poll
+         wait of the blocking fetch connectors
+        chunk_size: int Records retrieved
+        """
+
+    def on_handler(self, latency: float, size: int, outcome: str):
+        """
+        latency: float Time in seconds spent on the handler call
+        size: int Messages passed to the handler, greater than 1 on batch handlers
+        outcome: str success, error, resend when the handler raised ResendException or
+         timeout when it was cancelled past the queue config handler_timeout
+        """
+
+    def on_in_flight(self, in_flight: int):
+        """
+        in_flight: int Handler calls running, reported each time it changes
+        """
+
+    def close(self):
+        """
+        Called once when the queue handler stops
+        """
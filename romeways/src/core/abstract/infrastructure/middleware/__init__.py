@@ -0,0 +1 @@
+from .abstract import AMiddleware
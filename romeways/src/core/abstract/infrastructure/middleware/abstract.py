@@ -0,0 +1,24 @@
+from abc import abstractmethod
+from typing import Awaitable, Callable
+
+from romeways.src.core.interfaces.infrastructure.middleware import IMiddleware
+from romeways.src.domain.models.handler_context import HandlerContext
+
+
+class AMiddleware(IMiddleware):
+    """
+    Middleware that wraps the handler calls. One registered instance is shared by all
+    the queues of a process, it must await call_next to run the rest of the chain and
+    the handler, and let the handler exceptions go through.
+    """
+
+    @abstractmethod
+    async def __call__(
+        self, context: HandlerContext, call_next: Callable[[], Awaitable[None]]
+    ):
+        pass
+
+    def close(self):
+        """
+        Called when each queue handler that uses the middleware stops
+        """
@@ -2,18 +2,35 @@ from abc import abstractmethod
 from typing import List
 
 from romeways.src.core.interfaces.infrastructure.queue_connector import IQueueConnector
+from romeways.src.core.interfaces.infrastructure.resource_pool import IResourcePool
 from romeways.src.domain.models.config.connector.model import GenericConnectorConfig
 from romeways.src.domain.models.config.queue import GenericQueueConfig
+from romeways.src.domain.models.record import Record
+from romeways.src.infrastructure.resource_pool import ResourcePool
 
 
 class AQueueConnector(IQueueConnector):
+    # If get_records waits up to timeout seconds for messages instead of the chauffeur sleep
+    supports_blocking_fetch: bool = False
+
     def __init__(
         self,
         connector_config: GenericConnectorConfig,
         config: GenericQueueConfig,
+        resource_pool: IResourcePool | None = None,
     ):
         self._connector_config = connector_config
         self._config = config
+        self._resource_pool = (
+            resource_pool if resource_pool is not None else ResourcePool()
+        )
+
+    @property
+    def acks_records(self) -> bool:
+        """
+        If the chauffeur must call ack with the records once they are resolved
+        """
+        return False
 
     @abstractmethod
     async def on_start(self):
@@ -23,6 +40,60 @@ class AQueueConnector(IQueueConnector):
     async def get_messages(self, max_chunk_size: int) -> List[bytes]:
         pass
 
+    async def get_records(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[Record]:
+        """
+        Retrieve the messages with their partition and offset. By default the
+        get_messages result without them. The timeout is only given when
+        supports_blocking_fetch is set
+        """
+        messages = await self.get_messages(max_chunk_size=max_chunk_size)
+        return [Record(value=message) for message in messages]
+
+    async def ack(self, records: List[Record]):
+        """
+        Called when acks_records is set with the records whose handler finished
+        and, if they were resent, whose resend was sent
+        """
+
     @abstractmethod
     async def send_messages(self, message: bytes):
         pass
+
+    async def send_messages_batch(self, messages: List[bytes]):
+        """
+        Send a group of messages together. Connectors with a batching producer
+        should override it, by default each message is sent with send_messages
+        """
+        for message in messages:
+            await self.send_messages(message)
+
+    async def pause(self):
+        """
+        Called when the handlers fall behind the high water marks, the connector
+        should stop buffering new messages
+        """
+
+    async def resume(self):
+        """
+        Called when the paused handlers drain under the low water marks
+        """
+
+    async def on_stop(self):
+        """
+        Called after the in flight messages finish on a graceful stop
+        """
+
+    async def on_start_sender(self):
+        """
+        Start a connector that only sends messages, like a dead letter target.
+        By default the on_start
+        """
+        await self.on_start()
+
+    async def on_stop_sender(self):
+        """
+        Stop a connector started by on_start_sender. By default the on_stop
+        """
+        await self.on_stop()
@@ -0,0 +1 @@
+from .interface import ICodec
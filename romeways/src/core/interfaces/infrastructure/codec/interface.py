@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class ICodec(ABC):
+    text: bool
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        pass
+
+    @abstractmethod
+    def encode(self, content: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def may_be_envelope(self, data: bytes) -> bool:
+        pass
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+
+
+class IMetricsSink(ABC):
+    @abstractmethod
+    def on_fetch(self, latency: float, chunk_size: int):
+        pass
+
+    @abstractmethod
+    def on_handler(self, latency: float, size: int, outcome: str):
+        pass
+
+    @abstractmethod
+    def on_in_flight(self, in_flight: int):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
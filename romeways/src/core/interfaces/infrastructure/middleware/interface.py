@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+from romeways.src.domain.models.handler_context import HandlerContext
+
+
+class IMiddleware(ABC):
+    @abstractmethod
+    async def __call__(
+        self, context: HandlerContext, call_next: Callable[[], Awaitable[None]]
+    ):
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
@@ -1,14 +1,18 @@
+# pylint: disable=duplicate-code
 from abc import ABC, abstractmethod
 from typing import List
 
 from romeways.src.domain.models.config.connector import GenericConnectorConfig
 from romeways.src.domain.models.config.queue import GenericQueueConfig
+from romeways.src.domain.models.record import Record
 
 
 class IQueueConnector(ABC):
     connector_config: GenericConnectorConfig
     queue_name: str
     config: GenericQueueConfig
+    acks_records: bool
+    supports_blocking_fetch: bool
 
     @abstractmethod
     async def on_start(self):
@@ -18,6 +22,40 @@ class IQueueConnector(ABC):
     async def get_messages(self, max_chunk_size: int) -> List[bytes]:
         pass
 
+    @abstractmethod
+    async def get_records(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[Record]:
+        pass
+
+    @abstractmethod
+    async def ack(self, records: List[Record]):
+        pass
+
     @abstractmethod
     async def send_messages(self, message: bytes):
         pass
+
+    @abstractmethod
+    async def send_messages_batch(self, messages: List[bytes]):
+        pass
+
+    @abstractmethod
+    async def pause(self):
+        pass
+
+    @abstractmethod
+    async def resume(self):
+        pass
+
+    @abstractmethod
+    async def on_stop(self):
+        pass
+
+    @abstractmethod
+    async def on_start_sender(self):
+        pass
+
+    @abstractmethod
+    async def on_stop_sender(self):
+        pass
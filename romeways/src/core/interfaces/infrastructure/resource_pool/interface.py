@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class IResourcePool(ABC):
+    @abstractmethod
+    async def acquire(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        closer: Callable[[Any], Awaitable[None]],
+    ) -> Any:
+        pass
+
+    @abstractmethod
+    async def release(self, key: Hashable):
+        pass
@@ -0,0 +1,18 @@
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+from romeways.src.domain.models.record import Record
+
+
+class IRetryScheduler(ABC):
+    @abstractmethod
+    def schedule(self, delayed: List[Tuple[float, bytes]], records: List[Record]):
+        pass
+
+    @abstractmethod
+    def drain(self) -> Tuple[List[bytes], List[Record]]:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
@@ -1,12 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import Callable, List
 
 
 class ISpawner(ABC):
+    connector_name: str
+    restart_counts: List[int]
+
     @abstractmethod
     async def start(self, callback_to_spawn: Callable):
         pass
 
     @abstractmethod
-    def close(self):
+    async def close(self):
         pass
@@ -1,3 +1,4 @@
+import asyncio
 from abc import abstractmethod, ABC
 from typing import List
 
@@ -12,5 +13,14 @@ class IChauffeur(ABC):
 
     @classmethod
     @abstractmethod
-    async def run(cls, region_map: RegionMap, itineraries: List[Itinerary]):
+    async def run(
+        cls,
+        region_map: RegionMap,
+        itineraries: List[Itinerary],
+        stop_event: asyncio.Event | None = None,
+    ):
+        pass
+
+    @abstractmethod
+    async def stop(self, timeout: float):
         pass
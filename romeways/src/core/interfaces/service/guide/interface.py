@@ -1,5 +1,5 @@
 from abc import abstractmethod, ABC
-from typing import Callable, Type
+from typing import Callable, Dict, Type
 
 from romeways.src.core.abstract.infrastructure.queue_connector import AQueueConnector
 from romeways.src.domain.models.config.connector import GenericConnectorConfig
@@ -9,7 +9,11 @@ from romeways.src.domain.models.config.queue import GenericQueueConfig
 class IGuide(ABC):
     @abstractmethod
     def register_route(
-        self, queue_name: str, config: GenericQueueConfig, callback: Callable
+        self,
+        queue_name: str,
+        config: GenericQueueConfig,
+        callback: Callable,
+        batch: bool = False,
     ):
         pass
 
@@ -18,7 +22,7 @@ class IGuide(ABC):
         self,
         connector: Type[AQueueConnector],
         config: GenericConnectorConfig,
-        spawn_process: bool,
+        spawn_process: bool | int,
     ):
         pass
 
@@ -27,5 +31,9 @@ class IGuide(ABC):
         pass
 
     @abstractmethod
-    def end(self):
+    def restart_counts(self) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    async def end(self):
         pass
@@ -1 +1,5 @@
-from .exception import ResendException
+from .exception import (
+    ResendException,
+    BatchResendException,
+    HandlerTimeoutException,
+)
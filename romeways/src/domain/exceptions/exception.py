@@ -1,2 +1,29 @@
+from functools import partial
+from typing import List
+
+from romeways.src.domain.models.message import Message
+
+
 class ResendException(Exception):
     pass
+
+
+class BatchResendException(ResendException):
+    """
+    Raised by batch handlers to resend only a subset of the received messages.
+    messages: List[Message] The received messages that must be resend
+    """
+
+    def __init__(self, *args, messages: List[Message]):
+        super().__init__(*args)
+        self.messages = messages
+
+    def __reduce__(self):
+        return partial(self.__class__, messages=self.messages), self.args
+
+
+class HandlerTimeoutException(ResendException):
+    """
+    Raised when a handler call does not finish in the queue config handler_timeout, the
+    handler is cancelled and its messages are resent
+    """
@@ -1,10 +1,22 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, KW_ONLY
 
 
 @dataclass(slots=True, frozen=True)
 class GenericConnectorConfig:
     """
     connector_name: str Connector name
+    shutdown_timeout: float Max time in seconds that the stop waits the in flight messages
+     before cancel them
+    max_restarts: int Max consecutive restarts of a crashed worker before give up on it
+    restart_backoff: float Time in seconds before the first restart of a crashed worker,
+     it doubles on each consecutive crash
+    max_restart_backoff: float Max time in seconds before restart a crashed worker. A worker
+     alive for longer than that resets its consecutive crashes
     """
 
     connector_name: str
+    _: KW_ONLY
+    shutdown_timeout: float = 30.0
+    max_restarts: int = 5
+    restart_backoff: float = 1.0
+    max_restart_backoff: float = 60.0
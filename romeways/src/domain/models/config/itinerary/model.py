@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from typing import Callable
 
+from romeways.src.domain.models.config.map import RegionMap
 from romeways.src.domain.models.config.queue import GenericQueueConfig
 
 
@@ -9,3 +10,5 @@ class Itinerary:
     queue_name: str
     config: GenericQueueConfig
     callback: Callable
+    batch: bool = False
+    dead_letter_map: RegionMap | None = None
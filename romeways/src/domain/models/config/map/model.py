@@ -7,6 +7,6 @@ from romeways.src.domain.models.config.connector import GenericConnectorConfig
 
 @dataclass(slots=True, frozen=True)
 class RegionMap:
-    spawn_process: bool
+    spawn_process: bool | int
     config: GenericConnectorConfig
     connector: Type[AQueueConnector]
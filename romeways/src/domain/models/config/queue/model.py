@@ -1,16 +1,79 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, KW_ONLY
+from typing import Tuple
 
 
 @dataclass(slots=True, frozen=True)
-class GenericQueueConfig:
+class GenericQueueConfig:  # pylint: disable=R0902
     """
     connector_name: str For what connector this queue must be delivered
     frequency: float Time in seconds for retrieve messages from queue
     max_chunk_size: int Max quantity for messages that one retrieve will get
     sequential: bool If the handler call must be sequential or in asyncio.gather
+    adaptive_frequency: bool If the retrieve frequency must adapt to the queue load.
+     A full chunk is followed by an immediate retrieve and empty retrieves back off
+     exponentially from frequency up to max_frequency
+    max_frequency: float Max time in seconds between retrieves when adaptive_frequency is on
+    max_in_flight: int | None Max handlers running at the same time when sequential is off.
+     The next retrieve starts as soon as slots free up instead of waiting the whole chunk
+    prefetch: int Max chunks retrieved ahead into a local buffer while the current chunk
+     is handled, 0 means that retrieve and handle are serialized
+    codec: str Registered codec name used to decode and encode the messages envelope.
+     Builtin codecs are json, orjson and msgpack
+    lazy_message: bool If the handler must receive a LazyMessage that only decodes the
+     received bytes on the first access
+    executor: str | None Runs a plain function handler out of the event loop on a thread
+     or process pool, the values are thread and process
+    executor_workers: int | None Max workers of the executor pool, None uses the
+     concurrent.futures default
+    partition_ordered: bool If the messages with the same partition key must be handled
+     in order while the different partitions are handled concurrently
+    high_water_messages: int | None Retrieved messages not yet handled that pause the
+     connector, None disables it
+    low_water_messages: int | None Retrieved messages not yet handled under which a paused
+     connector resumes, None is the half of high_water_messages
+    high_water_bytes: int | None Retrieved bytes not yet handled that pause the connector,
+     None disables it
+    low_water_bytes: int | None Retrieved bytes not yet handled under which a paused
+     connector resumes, None is the half of high_water_bytes
+    retry_max_attempts: int | None Max resends of a message, the next ResendException
+     drops it. None resends without limit
+    retry_delay: float Time in seconds before the first resend, 0 resends right away
+    retry_multiplier: float Factor applied to the delay on each next resend
+    retry_jitter: float Random fraction, between 0 and 1, added or removed from each delay
+    dead_letter: GenericQueueConfig | None Queue config of the dead letter target, on any
+     registered connector. The messages past retry_max_attempts are sent there instead
+     of being dropped
+    metrics: str | None Registered metrics sink name that receives the fetch and handler
+     metrics of the queue, None disables them. Builtin sink is log
+    middlewares: Tuple[str, ...] Registered middleware names that wrap the handler calls
+     of the queue, in order after the default middlewares
+    handler_timeout: float | None Max time in seconds of a handler call, past it the
+     handler is cancelled and its messages are resent. None waits without limit
     """
 
     connector_name: str
     frequency: float
     max_chunk_size: int
     sequential: bool
+    _: KW_ONLY
+    adaptive_frequency: bool = False
+    max_frequency: float = 30.0
+    max_in_flight: int | None = None
+    prefetch: int = 0
+    codec: str = "json"
+    lazy_message: bool = False
+    executor: str | None = None
+    executor_workers: int | None = None
+    partition_ordered: bool = False
+    high_water_messages: int | None = None
+    low_water_messages: int | None = None
+    high_water_bytes: int | None = None
+    low_water_bytes: int | None = None
+    retry_max_attempts: int | None = None
+    retry_delay: float = 0.0
+    retry_multiplier: float = 2.0
+    retry_jitter: float = 0.0
+    dead_letter: "GenericQueueConfig | None" = None
+    metrics: str | None = None
+    middlewares: Tuple[str, ...] = ()
+    handler_timeout: float | None = None
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Any, Callable, List
+
+from romeways.src.domain.models.record import Record
+
+
+@dataclass(slots=True, frozen=True)
+class HandlerContext:
+    """
+    connector_name: str The connector of the queue
+    queue_name: str The queue of the handler
+    callback: Callable The registered handler
+    argument: Any The Message or LazyMessage passed to the handler, a list of them on
+     batch handlers
+    records: List[Record] The records retrieved from the connector for this handler call
+    batch: bool If the handler is a batch handler
+    """
+
+    connector_name: str
+    queue_name: str
+    callback: Callable
+    argument: Any
+    records: List[Record]
+    batch: bool = False
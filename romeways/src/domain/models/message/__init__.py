@@ -1 +1 @@
-from .model import Message
+from .model import Message, LazyMessage
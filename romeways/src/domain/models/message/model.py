@@ -1,7 +1,23 @@
 import json
-from dataclasses import dataclass
-from json import JSONDecodeError
-from typing import Self
+from dataclasses import dataclass, field
+from typing import Any, Self, Tuple
+
+from romeways.src.core.interfaces.infrastructure.codec import ICodec
+from romeways.src.infrastructure.codec import JsonCodec
+
+DEFAULT_CODEC = JsonCodec()
+
+
+def _to_text(content: Any, codec: ICodec) -> str:
+    if codec.text:
+        return codec.encode(content).decode()
+    return json.dumps(content)
+
+
+def _from_text(text: str, codec: ICodec) -> Any:
+    if codec.text:
+        return codec.decode(text.encode())
+    return json.loads(text)
 
 
 @dataclass(slots=True)
@@ -10,26 +26,161 @@ class Message:
     rw_resend_times: int
 
     @classmethod
-    def from_message(cls, message: bytes) -> Self:
-        resend_times = 0
-        try:
-            content = json.loads(message)
-            resend_times = content["rw_resend_times"]
-            payload = content["payload"]
-            if isinstance(payload, dict):
-                payload = json.dumps(payload)
-        except (JSONDecodeError, KeyError, TypeError):
-            payload = message.decode()
-
-        return cls(payload=payload, rw_resend_times=resend_times)
+    def from_message(
+        cls, message: bytes | memoryview, codec: ICodec = DEFAULT_CODEC
+    ) -> Self:
+        if codec.may_be_envelope(message):
+            try:
+                content = codec.decode(message)
+                resend_times = content["rw_resend_times"]
+                payload = content["payload"]
+                if isinstance(payload, dict):
+                    payload = _to_text(payload, codec=codec)
+            except (ValueError, KeyError, TypeError):
+                pass
+            else:
+                if isinstance(payload, bytes):
+                    payload = str(payload, "utf-8")
+                return cls(payload=payload, rw_resend_times=resend_times)
+
+        return cls(payload=str(message, "utf-8"), rw_resend_times=0)
 
     def raise_resend_counter(self) -> Self:
         return Message(self.payload, self.rw_resend_times + 1)
 
-    def to_json(self):
-        return json.dumps(
+    def to_json(self, codec: ICodec = DEFAULT_CODEC) -> bytes:
+        return codec.encode(
             {
                 "payload": self.payload,
                 "rw_resend_times": self.rw_resend_times,
             }
-        ).encode()
+        )
+
+
+_UNSET = object()
+_INVALID = object()
+
+
+@dataclass(slots=True)
+class LazyMessage:
+    """
+    Message variant that keeps the received bytes and only decodes them on the first access
+    raw: bytes | memoryview The received message
+    codec: ICodec Codec used to decode the envelope and the json view
+    """
+
+    raw: bytes | memoryview
+    codec: ICodec = field(default=DEFAULT_CODEC, repr=False, compare=False)
+    _decoded: Any = field(default=_UNSET, init=False, repr=False, compare=False)
+    _envelope: Any = field(default=_UNSET, init=False, repr=False, compare=False)
+    _payload: Any = field(default=_UNSET, init=False, repr=False, compare=False)
+    _json: Any = field(default=_UNSET, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_message(
+        cls, message: bytes | memoryview, codec: ICodec = DEFAULT_CODEC
+    ) -> Self:
+        return cls(raw=message, codec=codec)
+
+    def __reduce__(self):
+        # The decode caches and their sentinels do not survive a pickle, the copy
+        # decodes again. A memoryview can not be pickled so it goes as bytes
+        raw = self.raw.tobytes() if isinstance(self.raw, memoryview) else self.raw
+        return self.__class__, (raw, self.codec)
+
+    def _get_decoded(self) -> Any:
+        if self._decoded is _UNSET:
+            try:
+                self._decoded = self.codec.decode(self.raw)
+            except (ValueError, TypeError):
+                self._decoded = _INVALID
+        return self._decoded
+
+    def _get_envelope(self) -> Tuple[Any, int] | None:
+        if self._envelope is _UNSET:
+            self._envelope = None
+            if self.codec.may_be_envelope(self.raw):
+                content = self._get_decoded()
+                try:
+                    self._envelope = (content["payload"], content["rw_resend_times"])
+                except (KeyError, TypeError):
+                    pass
+        return self._envelope
+
+    @property
+    def rw_resend_times(self) -> int:
+        envelope = self._get_envelope()
+        return 0 if envelope is None else envelope[1]
+
+    @property
+    def payload(self) -> str:
+        if self._payload is _UNSET:
+            envelope = self._get_envelope()
+            if envelope is None:
+                self._payload = str(self.raw, "utf-8")
+            elif isinstance(envelope[0], dict):
+                self._payload = _to_text(envelope[0], codec=self.codec)
+            elif isinstance(envelope[0], bytes):
+                self._payload = str(envelope[0], "utf-8")
+            else:
+                self._payload = envelope[0]
+        return self._payload
+
+    @property
+    def body(self) -> bytes | memoryview:
+        envelope = self._get_envelope()
+        if envelope is None:
+            return self.raw
+        if isinstance(envelope[0], bytes):
+            return envelope[0]
+        if isinstance(envelope[0], str):
+            return envelope[0].encode()
+        return self.codec.encode(envelope[0])
+
+    @property
+    def json(self) -> Any:
+        if self._json is _UNSET:
+            envelope = self._get_envelope()
+            if envelope is None:
+                decoded = self._get_decoded()
+                self._json = (
+                    self.codec.decode(self.raw) if decoded is _INVALID else decoded
+                )
+            elif isinstance(envelope[0], str):
+                self._json = _from_text(envelope[0], codec=self.codec)
+            elif isinstance(envelope[0], bytes):
+                self._json = self.codec.decode(envelope[0])
+            else:
+                self._json = envelope[0]
+        return self._json
+
+    def _envelope_payload(self, codec: ICodec) -> Any:
+        """
+        Payload of a new envelope encoded with codec. The binary codecs keep a raw
+        message as bytes instead of a utf-8 decode, so it passes through as it came
+        """
+        envelope = self._get_envelope()
+        if envelope is None:
+            return self.payload if codec.text else bytes(self.raw)
+        if isinstance(envelope[0], bytes) and codec.text:
+            return self.payload
+        return envelope[0]
+
+    def raise_resend_counter(self) -> Self:
+        return self.__class__(
+            raw=self.codec.encode(
+                {
+                    "payload": self._envelope_payload(codec=self.codec),
+                    "rw_resend_times": self.rw_resend_times + 1,
+                }
+            ),
+            codec=self.codec,
+        )
+
+    def to_json(self, codec: ICodec = DEFAULT_CODEC) -> bytes:
+        return codec.encode(
+            {
+                "payload": self._envelope_payload(codec=codec),
+                "rw_resend_times": self.rw_resend_times,
+            }
+        )
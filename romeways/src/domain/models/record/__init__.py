@@ -0,0 +1 @@
+from .model import Record
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from typing import Hashable
+
+
+@dataclass(slots=True, frozen=True)
+class Record:
+    """
+    value: bytes | memoryview The message retrieved from the queue
+    partition_key: Hashable | None The queue partition of the message, None when the queue
+     is not partitioned
+    offset: int | None The message position on its partition, None when the queue has no
+     positions
+    """
+
+    value: bytes | memoryview
+    partition_key: Hashable | None = None
+    offset: int | None = None
@@ -0,0 +1,7 @@
+from .infrastructure import (
+    JsonCodec,
+    OrjsonCodec,
+    MsgpackCodec,
+    get_codec,
+    register_codec,
+)
@@ -0,0 +1,77 @@
+import json
+from typing import Any, Dict, Type
+
+from romeways.src.core.abstract.infrastructure.codec import ACodec
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+
+class JsonCodec(ACodec):
+    def decode(self, data: bytes) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def encode(self, content: Any) -> bytes:
+        return json.dumps(content).encode()
+
+    def may_be_envelope(self, data: bytes) -> bool:
+        return data[:1] == b"{"
+
+
+class OrjsonCodec(ACodec):
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("The orjson codec needs the orjson package installed")
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)  # pylint: disable=no-member
+
+    def encode(self, content: Any) -> bytes:
+        return orjson.dumps(content)  # pylint: disable=no-member
+
+    def may_be_envelope(self, data: bytes) -> bool:
+        return data[:1] == b"{"
+
+
+class MsgpackCodec(ACodec):
+    text = False
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("The msgpack codec needs the msgpack package installed")
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data)
+
+    def encode(self, content: Any) -> bytes:
+        return msgpack.packb(content)
+
+    def may_be_envelope(self, data: bytes) -> bool:
+        # fixmap, map 16 and map 32 formats
+        return len(data) > 0 and (0x80 <= data[0] <= 0x8F or data[0] in (0xDE, 0xDF))
+
+
+_codecs: Dict[str, Type[ACodec]] = {
+    "json": JsonCodec,
+    "orjson": OrjsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def register_codec(name: str, codec: Type[ACodec]):
+    _codecs[name] = codec
+
+
+def get_codec(name: str) -> ACodec:
+    if name not in _codecs:
+        raise ValueError(f"The codec {name} is not registered")
+    return _codecs[name]()
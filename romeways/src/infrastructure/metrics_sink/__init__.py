@@ -0,0 +1 @@
+from .infrastructure import LogMetricsSink, get_metrics_sink, register_metrics_sink
@@ -0,0 +1,125 @@
+import logging
+import os
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Dict, List, Type
+
+from romeways.src.core.abstract.infrastructure.metrics_sink import AMetricsSink
+
+# Upper bounds in seconds of the handler latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+# Time in seconds between the summaries logged by LogMetricsSink
+LOG_INTERVAL = 60.0
+
+
+@dataclass(slots=True)
+class _Window:
+    """
+    started_at: float Monotonic time when the window started
+    fetches: int Retrieves done in the window
+    fetch_latency: float Sum in seconds of the retrieves latency
+    fetched: int Records retrieved in the window
+    outcomes: Dict[str, int] Messages handled by outcome
+    buckets: List[int] Handler calls by latency histogram bucket
+    max_in_flight: int Max handlers running at the same time
+    """
+
+    started_at: float
+    fetches: int = 0
+    fetch_latency: float = 0.0
+    fetched: int = 0
+    outcomes: Dict[str, int] = field(
+        default_factory=lambda: {"success": 0, "error": 0, "resend": 0, "timeout": 0}
+    )
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    max_in_flight: int = 0
+
+
+class LogMetricsSink(AMetricsSink):
+    def __init__(self, connector_name: str, queue_name: str):
+        super().__init__(connector_name=connector_name, queue_name=queue_name)
+        self._pid = os.getpid()
+        self._window = _Window(started_at=monotonic())
+
+    def on_fetch(self, latency: float, chunk_size: int):
+        self._window.fetches += 1
+        self._window.fetch_latency += latency
+        self._window.fetched += chunk_size
+        self._log_if_due()
+
+    def on_handler(self, latency: float, size: int, outcome: str):
+        self._window.outcomes[outcome] += size
+        self._window.buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self._log_if_due()
+
+    def on_in_flight(self, in_flight: int):
+        self._window.max_in_flight = max(self._window.max_in_flight, in_flight)
+
+    def close(self):
+        self._log(now=monotonic())
+
+    def _log_if_due(self):
+        now = monotonic()
+        if now - self._window.started_at >= LOG_INTERVAL:
+            self._log(now=now)
+
+    def _log(self, now: float):
+        window = self._window
+        elapsed = max(now - window.started_at, 1e-9)
+        handled = sum(window.outcomes.values())
+        logging.info(
+            "Metrics of connector %s and queue %s on process %s in the last %.1f seconds: "
+            "%s fetches with %.4f seconds and %.1f records on average, %.1f messages "
+            "per second, %s success, %s error, %s resend, %s timeout, max %s in "
+            "flight, handler latency p50 %s p99 %s seconds",
+            self.connector_name,
+            self.queue_name,
+            self._pid,
+            elapsed,
+            window.fetches,
+            window.fetch_latency / window.fetches if window.fetches else 0.0,
+            window.fetched / window.fetches if window.fetches else 0.0,
+            handled / elapsed,
+            window.outcomes["success"],
+            window.outcomes["error"],
+            window.outcomes["resend"],
+            window.outcomes["timeout"],
+            window.max_in_flight,
+            self.latency_quantile(0.5),
+            self.latency_quantile(0.99),
+        )
+        self._window = _Window(started_at=now)
+
+    def latency_quantile(self, quantile: float) -> float | None:
+        """
+        Upper bound of the histogram bucket holding the quantile, inf when it is over
+        the last bucket and None without handler calls
+        """
+        total = sum(self._window.buckets)
+        if total == 0:
+            return None
+        rank = quantile * total
+        seen = 0
+        for bound, count in zip(
+            LATENCY_BUCKETS + (float("inf"),), self._window.buckets
+        ):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+_metrics_sinks: Dict[str, Type[AMetricsSink]] = {
+    "log": LogMetricsSink,
+}
+
+
+def register_metrics_sink(name: str, sink: Type[AMetricsSink]):
+    _metrics_sinks[name] = sink
+
+
+def get_metrics_sink(name: str) -> Type[AMetricsSink]:
+    if name not in _metrics_sinks:
+        raise ValueError(f"The metrics sink {name} is not registered")
+    return _metrics_sinks[name]
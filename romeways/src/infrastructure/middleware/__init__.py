@@ -0,0 +1,6 @@
+from .infrastructure import (
+    ProfilerMiddleware,
+    get_middleware,
+    get_middlewares,
+    register_middleware,
+)
@@ -0,0 +1,118 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+from typing import Awaitable, Callable, Dict, List, Sequence
+
+from romeways.src.core.abstract.infrastructure.middleware import AMiddleware
+from romeways.src.domain.models.handler_context import HandlerContext
+
+
+class ProfilerMiddleware(AMiddleware):  # pylint: disable=R0902
+    """
+    sample_rate: float Fraction, between 0 and 1, of the handler calls that run under
+     cProfile
+    dump_every: int Sampled calls of a handler between the dumps of its stats
+    dump_dir: str | None Directory where the aggregated stats of each handler are dumped
+     as <connector_name>.<queue_name>.<handler>.<pid>.prof, None logs them instead
+    top: int Functions logged on each dump when dump_dir is None
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.01,
+        dump_every: int = 100,
+        dump_dir: str | None = None,
+        top: int = 20,
+    ):
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError("The sample_rate attribute is not between 0 and 1")
+        self._sample_rate = sample_rate
+        self._dump_every = dump_every
+        self._dump_dir = dump_dir
+        self._top = top
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._samples: Dict[str, int] = {}
+        self._undumped = set()
+        self._profiling = False
+
+    async def __call__(
+        self, context: HandlerContext, call_next: Callable[[], Awaitable[None]]
+    ):
+        # cProfile follows the thread, one sampled call at a time keeps the
+        # stats of a handler apart from the other sampled handlers
+        if self._profiling or random.random() >= self._sample_rate:
+            await call_next()
+            return
+        profile = cProfile.Profile()
+        self._profiling = True
+        profile.enable()
+        try:
+            await call_next()
+        finally:
+            profile.disable()
+            self._profiling = False
+            self._add(
+                key=f"{context.connector_name}.{context.queue_name}."
+                f"{context.callback.__name__}",
+                profile=profile,
+            )
+
+    def _add(self, key: str, profile: cProfile.Profile):
+        if key in self._stats:
+            self._stats[key].add(profile)
+        else:
+            self._stats[key] = pstats.Stats(profile)
+        self._samples[key] = self._samples.get(key, 0) + 1
+        self._undumped.add(key)
+        if self._samples[key] % self._dump_every == 0:
+            self.dump(key=key)
+
+    def dump(self, key: str):
+        stats = self._stats[key]
+        self._undumped.discard(key)
+        if self._dump_dir is not None:
+            stats.dump_stats(os.path.join(self._dump_dir, f"{key}.{os.getpid()}.prof"))
+            return
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self._top)
+        logging.info(
+            "Profile of the handler %s on process %s over %s sampled calls\n%s",
+            key,
+            os.getpid(),
+            self._samples[key],
+            stream.getvalue(),
+        )
+
+    def close(self):
+        for key in list(self._undumped):
+            self.dump(key=key)
+
+
+_middlewares: Dict[str, AMiddleware] = {}
+_default_middlewares: List[str] = []
+
+
+def register_middleware(name: str, middleware: AMiddleware, default: bool = False):
+    _middlewares[name] = middleware
+    if default and name not in _default_middlewares:
+        _default_middlewares.append(name)
+
+
+def get_middleware(name: str) -> AMiddleware:
+    if name not in _middlewares:
+        raise ValueError(f"The middleware {name} is not registered")
+    return _middlewares[name]
+
+
+def get_middlewares(names: Sequence[str]) -> List[AMiddleware]:
+    """
+    The default middlewares in registration order followed by the names that are not
+    default
+    """
+    chain = list(_default_middlewares)
+    chain.extend(name for name in names if name not in chain)
+    return [get_middleware(name) for name in chain]
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from romeways.src.core.interfaces.infrastructure.resource_pool import IResourcePool
+
+
+class ResourcePool(IResourcePool):
+    """
+    Reference counted resources shared by all the connectors of one connector_name in a
+    process. The first acquire of a key builds the resource with the factory and the
+    last release closes it with the closer.
+    """
+
+    def __init__(self):
+        self._resources: Dict[Hashable, Any] = {}
+        self._closers: Dict[Hashable, Callable[[Any], Awaitable[None]]] = {}
+        self._references: Dict[Hashable, int] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    async def acquire(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        closer: Callable[[Any], Awaitable[None]],
+    ) -> Any:
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if key not in self._resources:
+                self._resources[key] = await factory()
+                self._closers[key] = closer
+                self._references[key] = 0
+            self._references[key] += 1
+            return self._resources[key]
+
+    async def release(self, key: Hashable):
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if key not in self._resources:
+                return
+            self._references[key] -= 1
+            if self._references[key] > 0:
+                return
+            resource = self._resources.pop(key)
+            closer = self._closers.pop(key)
+            del self._references[key]
+            await closer(resource)
@@ -0,0 +1 @@
+from .infrastructure import RetryScheduler
@@ -0,0 +1,78 @@
+import asyncio
+import heapq
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+from romeways.src.core.interfaces.infrastructure.retry_scheduler import IRetryScheduler
+from romeways.src.domain.models.record import Record
+
+# Time in seconds after a due retry whose retries are released together with it
+COALESCE_WINDOW = 0.01
+
+
+@dataclass(slots=True)
+class _RetryGroup:
+    records: List[Record]
+    remaining: int
+
+
+class RetryScheduler(IRetryScheduler):
+    """
+    Timer heap of the delayed resends of one itinerary. Only the earliest retry has a
+    loop timer, when it fires all the retries due in the coalesce window are released
+    together to on_due with the records whose resends were all released.
+    """
+
+    def __init__(self, on_due: Callable[[List[bytes], List[Record]], None]):
+        self._on_due = on_due
+        self._heap = []
+        self._counter = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, delayed: List[Tuple[float, bytes]], records: List[Record]):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        group = _RetryGroup(records=records, remaining=len(delayed))
+        for delay, message in delayed:
+            heapq.heappush(
+                self._heap, (now + delay, next(self._counter), message, group)
+            )
+        self._arm(loop=loop)
+
+    def drain(self) -> Tuple[List[bytes], List[Record]]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return self._pop_until(until=math.inf)
+
+    def _arm(self, loop: asyncio.AbstractEventLoop):
+        if not self._heap:
+            return
+        due = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer.when() <= due:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(due, self._fire)
+
+    def _fire(self):
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        messages, records = self._pop_until(until=loop.time() + COALESCE_WINDOW)
+        self._on_due(messages, records)
+        self._arm(loop=loop)
+
+    def _pop_until(self, until: float) -> Tuple[List[bytes], List[Record]]:
+        messages, records = [], []
+        while self._heap and self._heap[0][0] <= until:
+            _, _, message, group = heapq.heappop(self._heap)
+            messages.append(message)
+            group.remaining -= 1
+            if group.remaining == 0:
+                records.extend(group.records)
+        return messages, records
@@ -1,61 +1,181 @@
 import asyncio
+import logging
+import signal
 from multiprocessing import Process
 from typing import List, Callable
 
 from romeways.src.core.interfaces.infrastructure.spawner.interface import ISpawner
+from romeways.src.domain.models.config.connector import GenericConnectorConfig
 from romeways.src.domain.models.config.itinerary import Itinerary
 from romeways.src.domain.models.config.map import RegionMap
 
+# Extra time in seconds over the connector shutdown_timeout before kill the workers
+KILL_GRACE_TIME = 5.0
+# Time in seconds between the workers liveness checks
+SUPERVISOR_INTERVAL = 1.0
 
-class Spawner(ISpawner):
+
+class Spawner(ISpawner):  # pylint: disable=R0902
     def __init__(self, region_map: RegionMap, itineraries: List[Itinerary]):
         self._region_map = region_map
         self._itineraries = itineraries
         self._processes = []
         self._tasks = []
+        self._stop_event = None
+        self._callback_to_spawn = None
+        self._supervisor = None
+        self._restart_counts = []
+        self._crash_counts = []
+        self._started_at = []
+        self._restart_at = []
+        self._given_up = set()
+
+    @property
+    def connector_name(self) -> str:
+        return self._region_map.config.connector_name
+
+    @property
+    def restart_counts(self) -> List[int]:
+        return list(self._restart_counts)
 
     async def start(self, callback_to_spawn: Callable):
+        self._callback_to_spawn = callback_to_spawn
         if self._region_map.spawn_process:
-            await self._process_worker(
-                region_map=self._region_map,
-                itineraries=self._itineraries,
-                callback_to_spawn=callback_to_spawn,
-            )
+            for _ in range(int(self._region_map.spawn_process)):
+                self._processes.append(self._spawn_process())
         else:
-            await self._async_worker(
+            self._tasks.append(self._spawn_task())
+        now = asyncio.get_running_loop().time()
+        workers = self._workers()
+        self._restart_counts = [0] * len(workers)
+        self._crash_counts = [0] * len(workers)
+        self._started_at = [now] * len(workers)
+        self._restart_at = [None] * len(workers)
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def close(self):
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        if self._stop_event is not None:
+            self._stop_event.set()
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+
+        loop = asyncio.get_running_loop()
+        deadline = (
+            loop.time() + self._region_map.config.shutdown_timeout + KILL_GRACE_TIME
+        )
+        if self._tasks:
+            _, pending = await asyncio.wait(
+                self._tasks, timeout=max(deadline - loop.time(), 0.0)
+            )
+            for task in pending:
+                task.cancel()
+        while loop.time() < deadline and any(
+            process.is_alive() for process in self._processes
+        ):
+            await asyncio.sleep(0.1)
+        for process in self._processes:
+            if process.is_alive():
+                process.kill()
+
+    def _workers(self) -> List[Process | asyncio.Task]:
+        if self._region_map.spawn_process:
+            return self._processes
+        return self._tasks
+
+    @staticmethod
+    def _crash_reason(worker: Process | asyncio.Task) -> str | None:
+        if isinstance(worker, Process):
+            if worker.is_alive() or worker.exitcode == 0:
+                return None
+            return f"exit code {worker.exitcode}"
+        if not worker.done():
+            return None
+        if worker.cancelled():
+            return "cancelled"
+        if worker.exception() is None:
+            return None
+        return repr(worker.exception())
+
+    async def _supervise(self):
+        config: GenericConnectorConfig = self._region_map.config
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(SUPERVISOR_INTERVAL)
+            now = loop.time()
+            workers = self._workers()
+            for slot, worker in enumerate(workers):
+                if slot in self._given_up:
+                    continue
+                if self._restart_at[slot] is None:
+                    reason = self._crash_reason(worker)
+                    if reason is None:
+                        continue
+                    if now - self._started_at[slot] >= config.max_restart_backoff:
+                        self._crash_counts[slot] = 0
+                    if self._crash_counts[slot] >= config.max_restarts:
+                        logging.error(
+                            "The worker %s of connector %s crashed with %s after %s "
+                            "consecutive restarts and will not be restarted",
+                            slot,
+                            config.connector_name,
+                            reason,
+                            self._crash_counts[slot],
+                        )
+                        self._given_up.add(slot)
+                        continue
+                    delay = min(
+                        config.restart_backoff * 2 ** self._crash_counts[slot],
+                        config.max_restart_backoff,
+                    )
+                    self._crash_counts[slot] += 1
+                    self._restart_at[slot] = now + delay
+                    logging.warning(
+                        "The worker %s of connector %s crashed with %s and will be "
+                        "restarted in %s seconds",
+                        slot,
+                        config.connector_name,
+                        reason,
+                        delay,
+                    )
+                if now >= self._restart_at[slot]:
+                    if self._region_map.spawn_process:
+                        workers[slot] = self._spawn_process()
+                    else:
+                        workers[slot] = self._spawn_task()
+                    self._restart_counts[slot] += 1
+                    self._started_at[slot] = now
+                    self._restart_at[slot] = None
+
+    def _spawn_task(self) -> asyncio.Task:
+        self._stop_event = asyncio.Event()
+        return asyncio.create_task(
+            self._callback_to_spawn(
                 region_map=self._region_map,
                 itineraries=self._itineraries,
-                callback_to_spawn=callback_to_spawn,
+                stop_event=self._stop_event,
             )
-
-    def close(self):
-        for process in self._processes:
-            process.kill()
-        for task in self._tasks:
-            task.cancel()
-
-    async def _async_worker(
-        self,
-        region_map: RegionMap,
-        itineraries: List[Itinerary],
-        callback_to_spawn: Callable,
-    ):
-        task = asyncio.create_task(
-            callback_to_spawn(region_map=region_map, itineraries=itineraries)
         )
-        self._tasks.append(task)
-
-    async def _process_worker(
-        self,
-        region_map: RegionMap,
-        itineraries: List[Itinerary],
-        callback_to_spawn: Callable,
-    ):
-        def process_wrapper(_region_map, _itineraries):
-            asyncio.run(
-                callback_to_spawn(region_map=_region_map, itineraries=_itineraries)
+
+    def _spawn_process(self) -> Process:
+        callback_to_spawn = self._callback_to_spawn
+
+        async def process_main(_region_map, _itineraries):
+            stop_event = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+            loop.add_signal_handler(signal.SIGINT, stop_event.set)
+            await callback_to_spawn(
+                region_map=_region_map, itineraries=_itineraries, stop_event=stop_event
             )
 
-        process = Process(target=process_wrapper, args=(region_map, itineraries))
+        def process_wrapper(_region_map, _itineraries):
+            asyncio.run(process_main(_region_map, _itineraries))
+
+        process = Process(
+            target=process_wrapper, args=(self._region_map, self._itineraries)
+        )
         process.start()
-        self._processes.append(process)
+        return process
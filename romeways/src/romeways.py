@@ -1,21 +1,53 @@
 import asyncio
-from typing import Callable, Type
+import signal
+from typing import Callable, Dict, Type
 
 
+from .core.abstract.infrastructure.codec import ACodec
+from .core.abstract.infrastructure.metrics_sink import AMetricsSink
+from .core.abstract.infrastructure.middleware import AMiddleware
 from .core.abstract.infrastructure.queue_connector import AQueueConnector
 from .domain.models.config.connector import GenericConnectorConfig
 from .domain.models.config.queue import GenericQueueConfig
+from .infrastructure.codec import get_codec, register_codec
+from .infrastructure.metrics_sink import get_metrics_sink, register_metrics_sink
+from .infrastructure.middleware import get_middlewares, register_middleware
 from .service.guide import GuideService
 
 
-def queue_consumer(queue_name: str, config: GenericQueueConfig):
+def queue_consumer(queue_name: str, config: GenericQueueConfig, batch: bool = False):
     if not isinstance(config, GenericQueueConfig):
         raise TypeError("The config attribute is not a subclass of GenericQueueConfig")
+    get_codec(config.codec)
+    if config.metrics is not None:
+        get_metrics_sink(config.metrics)
+    get_middlewares(config.middlewares)
+
+    if config.executor not in (None, "thread", "process"):
+        raise ValueError("The executor attribute is not thread or process")
+
+    if not 0.0 <= config.retry_jitter <= 1.0:
+        raise ValueError("The retry_jitter attribute is not between 0 and 1")
+
+    if config.handler_timeout is not None and config.handler_timeout <= 0:
+        raise ValueError("The handler_timeout attribute is not greater than 0")
+
+    if config.dead_letter is not None:
+        if not isinstance(config.dead_letter, GenericQueueConfig):
+            raise TypeError(
+                "The dead_letter attribute is not a subclass of GenericQueueConfig"
+            )
+        if config.retry_max_attempts is None:
+            raise ValueError("The dead_letter attribute needs retry_max_attempts")
 
     def request_guide(func: Callable):
-        if not asyncio.iscoroutinefunction(func):
+        if config.executor is None and not asyncio.iscoroutinefunction(func):
             raise TypeError("The callback is not a coroutine function")
-        GuideService().register_route(queue_name, config, func)
+        if config.executor is not None and asyncio.iscoroutinefunction(func):
+            raise TypeError(
+                "The callback is a coroutine function and can not use executor"
+            )
+        GuideService().register_route(queue_name, config, func, batch)
         return func
 
     return request_guide
@@ -24,7 +56,7 @@ def queue_consumer(queue_name: str, config: GenericQueueConfig):
 def connector_register(
     connector: Type[AQueueConnector],
     config: GenericConnectorConfig,
-    spawn_process: bool,
+    spawn_process: bool | int,
 ):
     if not isinstance(config, GenericConnectorConfig):
         raise TypeError(
@@ -34,15 +66,47 @@ def connector_register(
     if not issubclass(connector, AQueueConnector):
         raise TypeError("The connector attribute is not a subclass of AQueueConnector")
 
+    if not isinstance(spawn_process, int):
+        raise TypeError("The spawn_process attribute is not a bool or an int")
+
+    if spawn_process < 0:
+        raise ValueError("The spawn_process attribute must not be negative")
+
     GuideService().register_connector(
         connector=connector, config=config, spawn_process=spawn_process
     )
 
 
+def codec_register(name: str, codec: Type[ACodec]):
+    if not issubclass(codec, ACodec):
+        raise TypeError("The codec attribute is not a subclass of ACodec")
+    register_codec(name=name, codec=codec)
+
+
+def metrics_register(name: str, sink: Type[AMetricsSink]):
+    if not issubclass(sink, AMetricsSink):
+        raise TypeError("The sink attribute is not a subclass of AMetricsSink")
+    register_metrics_sink(name=name, sink=sink)
+
+
+def middleware_register(name: str, middleware: AMiddleware, default: bool = False):
+    if not isinstance(middleware, AMiddleware):
+        raise TypeError("The middleware attribute is not an instance of AMiddleware")
+    register_middleware(name=name, middleware=middleware, default=default)
+
+
+def restart_counts() -> Dict[str, int]:
+    return GuideService().restart_counts()
+
+
 async def start():
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
     try:
         await GuideService().start()
         while True:
             await asyncio.sleep(10)
     except BaseException:  # pylint: disable=W0718
-        GuideService().end()
+        await GuideService().end()
+    finally:
+        loop.remove_signal_handler(signal.SIGTERM)
@@ -1,47 +1,319 @@
 import asyncio
 import logging
-from time import time
-from typing import List
+import random
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from time import perf_counter, time
+from typing import Any, List
 
 from romeways.src.core.abstract.infrastructure.queue_connector import AQueueConnector
 from romeways.src.core.interfaces.service.chauffeur import IChauffeur
-from romeways.src.domain.exceptions import ResendException
+from romeways.src.domain.exceptions import (
+    ResendException,
+    BatchResendException,
+    HandlerTimeoutException,
+)
 from romeways.src.domain.models.config.itinerary import Itinerary
 from romeways.src.domain.models.config.map import RegionMap
 from romeways.src.domain.models.config.queue import GenericQueueConfig
-from romeways.src.domain.models.message import Message
+from romeways.src.domain.models.handler_context import HandlerContext
+from romeways.src.domain.models.message import Message, LazyMessage
+from romeways.src.domain.models.record import Record
+from romeways.src.infrastructure.codec import get_codec
+from romeways.src.infrastructure.metrics_sink import get_metrics_sink
+from romeways.src.infrastructure.middleware import get_middlewares
+from romeways.src.infrastructure.resource_pool import ResourcePool
+from romeways.src.infrastructure.retry_scheduler import RetryScheduler
+
+# Time in seconds that stop waits the tasks cancelled past its timeout to finish
+CANCEL_TIMEOUT = 1.0
+# Time in seconds before a failed resend or dead letter send is tried again, doubled
+# on each consecutive failure up to MAX_SEND_RETRY_DELAY
+SEND_RETRY_DELAY = 0.5
+MAX_SEND_RETRY_DELAY = 30.0
 
 
 class Empty:
     pass
 
 
-class ChauffeurService(IChauffeur):
+class ChauffeurService(IChauffeur):  # pylint: disable=R0902
     @classmethod
-    async def run(cls, region_map: RegionMap, itineraries: List[Itinerary]):
+    async def run(
+        cls,
+        region_map: RegionMap,
+        itineraries: List[Itinerary],
+        stop_event: asyncio.Event | None = None,
+    ):
         chauffeurs = []
+        resource_pools = {region_map.config.connector_name: ResourcePool()}
         for itinerary in itineraries:
             queue_connector = region_map.connector(
                 connector_config=region_map.config,
                 config=itinerary.config,
+                resource_pool=resource_pools[region_map.config.connector_name],
             )
             await queue_connector.on_start()
-            chauffeur = cls(queue_connector=queue_connector, itinerary=itinerary)
-            chauffeurs.append(chauffeur._watch())
-        await asyncio.gather(*chauffeurs)
+            dead_letter_connector = None
+            if itinerary.dead_letter_map is not None:
+                dead_letter_map = itinerary.dead_letter_map
+                dead_letter_connector = dead_letter_map.connector(
+                    connector_config=dead_letter_map.config,
+                    config=itinerary.config.dead_letter,
+                    resource_pool=resource_pools.setdefault(
+                        dead_letter_map.config.connector_name, ResourcePool()
+                    ),
+                )
+                await dead_letter_connector.on_start_sender()
+            chauffeurs.append(
+                cls(
+                    queue_connector=queue_connector,
+                    itinerary=itinerary,
+                    dead_letter_connector=dead_letter_connector,
+                )
+            )
+        watchers = [
+            asyncio.ensure_future(chauffeur._watch())  # pylint: disable=W0212
+            for chauffeur in chauffeurs
+        ]
+        if stop_event is None:
+            stop_event = asyncio.Event()
+        stop_waiter = asyncio.ensure_future(stop_event.wait())
+        try:
+            await asyncio.wait(
+                [*watchers, stop_waiter], return_when=asyncio.FIRST_COMPLETED
+            )
+        except asyncio.CancelledError:
+            for watcher in watchers:
+                watcher.cancel()
+            raise
+        finally:
+            stop_waiter.cancel()
+        # A watcher that ends before the stop_event crashed, the others are stopped
+        # so a restart does not run them twice
+        await asyncio.gather(
+            *[
+                chauffeur.stop(timeout=region_map.config.shutdown_timeout)
+                for chauffeur in chauffeurs
+            ]
+        )
+        await asyncio.gather(*watchers)
 
-    def __init__(self, queue_connector: AQueueConnector, itinerary: Itinerary):
+    def __init__(
+        self,
+        queue_connector: AQueueConnector,
+        itinerary: Itinerary,
+        dead_letter_connector: AQueueConnector | None = None,
+    ):
         self._queue_connector = queue_connector
+        self._dead_letter_connector = dead_letter_connector
         self._itinerary = itinerary
         self._last_execution_time = None
+        self._frequency = itinerary.config.frequency
+        self._codec = get_codec(itinerary.config.codec)
+        self._message_type = LazyMessage if itinerary.config.lazy_message else Message
+        self._executor = self._build_executor(queue_config=itinerary.config)
+        self._metrics = None
+        if itinerary.config.metrics is not None:
+            self._metrics = get_metrics_sink(itinerary.config.metrics)(
+                connector_name=itinerary.config.connector_name,
+                queue_name=itinerary.queue_name,
+            )
+        self._running_handlers = 0
+        self._middlewares = get_middlewares(itinerary.config.middlewares)
+        self._in_flight = set()
+        self._in_flight_slots = None
+        if itinerary.config.max_in_flight:
+            self._in_flight_slots = asyncio.Semaphore(itinerary.config.max_in_flight)
+        self._water_marks = self._build_water_marks(queue_config=itinerary.config)
+        self._pending_messages = 0
+        self._pending_bytes = 0
+        self._paused = False
+        self._resends = []
+        self._dead_letters = []
+        self._delayed = []
+        self._retry_scheduler = RetryScheduler(on_due=self._on_retry_due)
+        self._acks = []
+        self._resent_records = []
+        self._completion_tasks = set()
+        self._failed_sends = []
+        self._send_failures = 0
+        self._send_retry_timer = None
+        self._stopping = False
+        self._stop_expired = False
+        self._fetching = False
+        self._watch_task = None
+        self._fetch_task = None
+
+    async def stop(self, timeout: float):
+        self._stopping = True
+        if self._fetching and self._fetch_task is not None:
+            self._fetch_task.cancel()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        if self._watch_task is not None:
+            await asyncio.wait([self._watch_task], timeout=timeout)
+        if self._in_flight:
+            await asyncio.wait(
+                list(self._in_flight), timeout=max(deadline - loop.time(), 0.0)
+            )
+        pending = [
+            task
+            for task in [self._watch_task, *self._in_flight]
+            if task is not None and not task.done()
+        ]
+        if pending:
+            queue_config: GenericQueueConfig = self._itinerary.config
+            logging.warning(
+                "The queue handler for connector %s and queue %s did not finish "
+                "%s tasks in %s seconds on stop and they will be cancelled",
+                queue_config.connector_name,
+                self._itinerary.queue_name,
+                len(pending),
+                timeout,
+            )
+            self._stop_expired = True
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending, timeout=CANCEL_TIMEOUT)
+        messages, records = self._retry_scheduler.drain()
+        self._resends.extend(messages)
+        self._resent_records.extend(records)
+        if self._send_retry_timer is not None:
+            self._send_retry_timer.cancel()
+        self._requeue_failed_sends()
+        if self._completion_tasks:
+            await asyncio.wait(
+                list(self._completion_tasks), timeout=max(deadline - loop.time(), 0.0)
+            )
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        await self._queue_connector.on_stop()
+        if self._dead_letter_connector is not None:
+            await self._dead_letter_connector.on_stop_sender()
+        if self._metrics is not None:
+            self._metrics.close()
+        for middleware in self._middlewares:
+            middleware.close()
+
+    @staticmethod
+    def _build_executor(queue_config: GenericQueueConfig) -> Executor | None:
+        if queue_config.executor == "thread":
+            return ThreadPoolExecutor(max_workers=queue_config.executor_workers)
+        if queue_config.executor == "process":
+            return ProcessPoolExecutor(max_workers=queue_config.executor_workers)
+        return None
+
+    @staticmethod
+    def _build_water_marks(queue_config: GenericQueueConfig) -> tuple | None:
+        high_messages = queue_config.high_water_messages
+        high_bytes = queue_config.high_water_bytes
+        if high_messages is None and high_bytes is None:
+            return None
+        low_messages = queue_config.low_water_messages
+        if high_messages is not None and low_messages is None:
+            low_messages = high_messages // 2
+        low_bytes = queue_config.low_water_bytes
+        if high_bytes is not None and low_bytes is None:
+            low_bytes = high_bytes // 2
+        return high_messages, low_messages, high_bytes, low_bytes
+
+    def _track_pending(self, records: List[Record], sign: int):
+        if self._water_marks is None:
+            return
+        self._pending_messages += sign * len(records)
+        self._pending_bytes += sign * sum(len(record.value) for record in records)
+
+    async def _apply_backpressure(self):
+        if self._water_marks is None:
+            return
+        high_messages, low_messages, high_bytes, low_bytes = self._water_marks
+        if not self._paused:
+            if (
+                high_messages is not None and self._pending_messages >= high_messages
+            ) or (high_bytes is not None and self._pending_bytes >= high_bytes):
+                self._paused = True
+                await self._queue_connector.pause()
+        elif (low_messages is None or self._pending_messages <= low_messages) and (
+            low_bytes is None or self._pending_bytes <= low_bytes
+        ):
+            self._paused = False
+            await self._queue_connector.resume()
+
+    def _handler_started(self) -> float:
+        if self._metrics is None:
+            return 0.0
+        self._running_handlers += 1
+        self._metrics.on_in_flight(in_flight=self._running_handlers)
+        return perf_counter()
+
+    @staticmethod
+    def _resend_outcome(exception: ResendException) -> str:
+        if isinstance(exception, HandlerTimeoutException):
+            return "timeout"
+        return "resend"
+
+    def _handler_finished(self, started: float, size: int, outcome: str):
+        if self._metrics is None:
+            return
+        self._running_handlers -= 1
+        self._metrics.on_handler(
+            latency=perf_counter() - started, size=size, outcome=outcome
+        )
+        self._metrics.on_in_flight(in_flight=self._running_handlers)
+
+    async def _call_handler(self, argument: Any, records: List[Record] | None = None):
+        handler_timeout = self._itinerary.config.handler_timeout
+        if handler_timeout is None:
+            await self._call_chain(argument=argument, records=records)
+            return
+        deadline = asyncio.timeout(handler_timeout)
+        try:
+            async with deadline:
+                await self._call_chain(argument=argument, records=records)
+        except TimeoutError as exception:
+            if not deadline.expired():
+                raise
+            raise HandlerTimeoutException(
+                f"The handler did not finish in {handler_timeout} seconds"
+            ) from exception
+
+    async def _call_chain(self, argument: Any, records: List[Record] | None = None):
+        if not self._middlewares:
+            await self._run_handler(argument)
+            return
+        context = HandlerContext(
+            connector_name=self._itinerary.config.connector_name,
+            queue_name=self._itinerary.queue_name,
+            callback=self._itinerary.callback,
+            argument=argument,
+            records=records or [],
+            batch=self._itinerary.batch,
+        )
+        await self._call_middleware(index=0, context=context)
+
+    async def _call_middleware(self, index: int, context: HandlerContext):
+        if index == len(self._middlewares):
+            await self._run_handler(context.argument)
+            return
+        await self._middlewares[index](
+            context, lambda: self._call_middleware(index=index + 1, context=context)
+        )
+
+    async def _run_handler(self, argument: Any):
+        if self._executor is None:
+            await self._itinerary.callback(argument)
+        else:
+            await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._itinerary.callback, argument
+            )
 
     async def _clock_handler(self):
         queue_config: GenericQueueConfig = self._itinerary.config
-        await_time = queue_config.frequency
+        await_time = self._frequency
         if self._last_execution_time:
             delta = time() - self._last_execution_time
             await_time = await_time - delta
-            if await_time < 0.0:
+            if await_time < 0.0 < self._frequency:
                 queue_name: str = self._itinerary.queue_name
                 logging.warning(
                     "The queue handler for connector %s and queue %s "
@@ -49,19 +321,67 @@ class ChauffeurService(IChauffeur):
                     queue_config.connector_name,
                     queue_name,
                     float(delta),
-                    queue_config.frequency,
+                    self._frequency,
                 )
-                await_time = 0.0
+            await_time = max(await_time, 0.0)
         else:
             await_time = 0.0
         await asyncio.sleep(await_time)
         self._last_execution_time = time()
 
-    async def _resolve_message(self, message: bytes):
-        message_obj = Message.from_message(message=message)
+    def _adapt_frequency(self, chunk_size: int):
+        queue_config: GenericQueueConfig = self._itinerary.config
+        if not queue_config.adaptive_frequency:
+            return
+        if 0 < abs(queue_config.max_chunk_size) <= chunk_size:
+            self._frequency = 0.0
+        elif chunk_size == 0:
+            self._frequency = min(
+                max(self._frequency * 2, queue_config.frequency),
+                queue_config.max_frequency,
+            )
+        else:
+            self._frequency = queue_config.frequency
+
+    def _log_undecodable(self, messages: int, exception: ValueError):
+        queue_config: GenericQueueConfig = self._itinerary.config
+        logging.error(
+            "%s messages for the connector %s and queue %s could not be decoded and "
+            "will be dropped. Error %s",
+            messages,
+            queue_config.connector_name,
+            self._itinerary.queue_name,
+            exception,
+        )
+
+    def _log_unencodable(self, message: Message | LazyMessage, exception: ValueError):
+        queue_config: GenericQueueConfig = self._itinerary.config
+        logging.error(
+            "The message %s of the connector %s and queue %s could not be encoded to "
+            "resend and will be dropped. Error %s",
+            message,
+            queue_config.connector_name,
+            self._itinerary.queue_name,
+            exception,
+        )
+
+    async def _resolve_message(
+        self, message: bytes, records: List[Record] | None = None
+    ) -> bool:
         try:
-            await self._itinerary.callback(message_obj)
+            message_obj = self._message_type.from_message(
+                message=message, codec=self._codec
+            )
+        except ValueError as exception:
+            self._log_undecodable(messages=1, exception=exception)
+            return False
+        started = self._handler_started()
+        try:
+            await self._call_handler(message_obj, records=records)
         except ResendException as exception:
+            self._handler_finished(
+                started=started, size=1, outcome=self._resend_outcome(exception)
+            )
             queue_config: GenericQueueConfig = self._itinerary.config
             logging.error(
                 "A error occurs on handler %s for the connector %s and queue %s."
@@ -72,8 +392,11 @@ class ChauffeurService(IChauffeur):
                 message_obj,
                 exception,
             )
-            await self._resend_message(message=message)
+            return self._resend_message(message=message_obj, reason=repr(exception))
+        except asyncio.CancelledError:
+            raise
         except BaseException as exception:  # pylint: disable=W0718
+            self._handler_finished(started=started, size=1, outcome="error")
             queue_config: GenericQueueConfig = self._itinerary.config
             logging.error(
                 "A error occurs on handler %s for the connector %s and queue %s. Error %s",
@@ -82,23 +405,376 @@ class ChauffeurService(IChauffeur):
                 self._itinerary.queue_name,
                 exception,
             )
+        else:
+            self._handler_finished(started=started, size=1, outcome="success")
+        return False
+
+    async def _resolve_batch(
+        self, messages: List[bytes], records: List[Record] | None = None
+    ) -> bool:
+        try:
+            message_objs = [
+                self._message_type.from_message(message=message, codec=self._codec)
+                for message in messages
+            ]
+        except ValueError as exception:
+            self._log_undecodable(messages=len(messages), exception=exception)
+            return False
+        started = self._handler_started()
+        try:
+            await self._call_handler(message_objs, records=records)
+        except ResendException as exception:
+            self._handler_finished(
+                started=started,
+                size=len(message_objs),
+                outcome=self._resend_outcome(exception),
+            )
+            queue_config: GenericQueueConfig = self._itinerary.config
+            to_resend = message_objs
+            if isinstance(exception, BatchResendException):
+                to_resend = exception.messages
+            logging.error(
+                "A error occurs on batch handler %s for the connector %s and queue %s."
+                " %s of %s messages will be resend. Error %s",
+                self._itinerary.callback.__name__,
+                queue_config.connector_name,
+                self._itinerary.queue_name,
+                len(to_resend),
+                len(messages),
+                exception,
+            )
+            resent = [
+                self._resend_message(message=message, reason=repr(exception))
+                for message in to_resend
+            ]
+            return any(resent)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as exception:  # pylint: disable=W0718
+            self._handler_finished(
+                started=started, size=len(message_objs), outcome="error"
+            )
+            queue_config: GenericQueueConfig = self._itinerary.config
+            logging.error(
+                "A error occurs on batch handler %s for the connector %s and queue %s. Error %s",
+                self._itinerary.callback.__name__,
+                queue_config.connector_name,
+                self._itinerary.queue_name,
+                exception,
+            )
+        else:
+            self._handler_finished(
+                started=started, size=len(message_objs), outcome="success"
+            )
+        return False
+
+    async def _resolve_record(self, record: Record):
+        try:
+            resent = await self._resolve_message(message=record.value, records=[record])
+        finally:
+            self._track_pending(records=[record], sign=-1)
+        self._complete(records=[record], resent=resent)
+
+    async def _resolve_records_batch(self, records: List[Record]):
+        try:
+            resent = await self._resolve_batch(
+                messages=[record.value for record in records], records=records
+            )
+        finally:
+            self._track_pending(records=records, sign=-1)
+        self._complete(records=records, resent=resent)
+
+    async def _resolve_partition(self, records: List[Record]):
+        for record in records:
+            if self._in_flight_slots is None:
+                await self._resolve_record(record)
+                continue
+            async with self._in_flight_slots:
+                await self._resolve_record(record)
+
+    def _complete(self, records: List[Record], resent: bool):
+        acks_records = self._queue_connector.acks_records
+        if self._delayed:
+            delayed, self._delayed = self._delayed, []
+            self._retry_scheduler.schedule(
+                delayed=delayed, records=records if acks_records else []
+            )
+            return
+        if not acks_records:
+            return
+        if resent:
+            self._resent_records.extend(records)
+        else:
+            self._acks.extend(records)
 
-    async def _resend_message(self, message: bytes):
-        _message = (
-            Message.from_message(message=message).raise_resend_counter().to_json()
+    def _resend_message(
+        self, message: Message | LazyMessage, reason: str | None = None
+    ) -> bool:
+        queue_config: GenericQueueConfig = self._itinerary.config
+        attempt = message.rw_resend_times + 1
+        if (
+            queue_config.retry_max_attempts is not None
+            and attempt > queue_config.retry_max_attempts
+        ):
+            if self._dead_letter_connector is not None:
+                try:
+                    dead_letter = self._codec.encode(
+                        {
+                            "payload": message.payload,
+                            "rw_resend_times": message.rw_resend_times,
+                            "rw_dead_letter_reason": reason,
+                        }
+                    )
+                except ValueError as exception:
+                    self._log_unencodable(message=message, exception=exception)
+                    return False
+                self._dead_letters.append(dead_letter)
+                return True
+            logging.error(
+                "The message %s of the connector %s and queue %s reached the %s "
+                "resend attempts and will be dropped",
+                message,
+                queue_config.connector_name,
+                self._itinerary.queue_name,
+                queue_config.retry_max_attempts,
+            )
+            return False
+        try:
+            _message = message.raise_resend_counter().to_json(codec=self._codec)
+        except ValueError as exception:
+            self._log_unencodable(message=message, exception=exception)
+            return False
+        delay = self._retry_delay(attempt=attempt)
+        if delay > 0.0:
+            self._delayed.append((delay, _message))
+        else:
+            self._resends.append(_message)
+        return True
+
+    def _retry_delay(self, attempt: int) -> float:
+        queue_config: GenericQueueConfig = self._itinerary.config
+        if queue_config.retry_delay <= 0.0:
+            return 0.0
+        delay = queue_config.retry_delay * queue_config.retry_multiplier ** (
+            attempt - 1
         )
-        await self._queue_connector.send_messages(_message)
+        if queue_config.retry_jitter:
+            delay *= 1.0 + random.uniform(
+                -queue_config.retry_jitter, queue_config.retry_jitter
+            )
+        return delay
 
-    async def _watch(self):
-        while True:
-            await self._clock_handler()
-            messages: List[bytes] = await self._queue_connector.get_messages(
-                max_chunk_size=self._itinerary.config.max_chunk_size
-            )
-            if self._itinerary.config.sequential is False:
-                await asyncio.gather(
-                    *[self._resolve_message(message) for message in messages]
+    def _on_retry_due(self, messages: List[bytes], records: List[Record]):
+        self._resends.extend(messages)
+        self._resent_records.extend(records)
+        self._flush_completed()
+
+    def _flush_completed(self):
+        if not (
+            self._resends or self._dead_letters or self._acks or self._resent_records
+        ):
+            return
+        task = asyncio.create_task(
+            self._send_completed(
+                messages=self._resends,
+                acks=self._acks,
+                resent_records=self._resent_records,
+                dead_letters=self._dead_letters,
+            )
+        )
+        self._resends, self._acks, self._resent_records = [], [], []
+        self._dead_letters = []
+        self._completion_tasks.add(task)
+        task.add_done_callback(self._completion_tasks.discard)
+
+    async def _send_completed(
+        self,
+        messages: List[bytes],
+        acks: List[Record] | None = None,
+        resent_records: List[Record] | None = None,
+        dead_letters: List[bytes] | None = None,
+    ):
+        queue_config: GenericQueueConfig = self._itinerary.config
+        acks = list(acks or [])
+        failed_messages, failed_dead_letters = [], []
+        if messages:
+            try:
+                await self._queue_connector.send_messages_batch(messages)
+            except Exception as exception:  # pylint: disable=W0718
+                failed_messages = messages
+                logging.error(
+                    "A error occurs on resend %s messages for the connector %s "
+                    "and queue %s. Error %s",
+                    len(messages),
+                    queue_config.connector_name,
+                    self._itinerary.queue_name,
+                    exception,
+                )
+        if dead_letters:
+            try:
+                await self._dead_letter_connector.send_messages_batch(dead_letters)
+            except Exception as exception:  # pylint: disable=W0718
+                failed_dead_letters = dead_letters
+                logging.error(
+                    "A error occurs on send %s dead letters of the connector %s and queue %s"
+                    " to the connector %s. Error %s",
+                    len(dead_letters),
+                    queue_config.connector_name,
+                    self._itinerary.queue_name,
+                    queue_config.dead_letter.connector_name,
+                    exception,
+                )
+        if failed_messages or failed_dead_letters:
+            self._retry_send(
+                messages=failed_messages,
+                dead_letters=failed_dead_letters,
+                records=resent_records or [],
+            )
+        else:
+            self._send_failures = 0
+            acks.extend(resent_records or [])
+        if acks:
+            try:
+                await self._queue_connector.ack(records=acks)
+            except Exception as exception:  # pylint: disable=W0718
+                logging.error(
+                    "A error occurs on ack %s records for the connector %s and queue %s. Error %s",
+                    len(acks),
+                    queue_config.connector_name,
+                    self._itinerary.queue_name,
+                    exception,
+                )
+
+    def _retry_send(
+        self, messages: List[bytes], dead_letters: List[bytes], records: List[Record]
+    ):
+        self._failed_sends.append((messages, dead_letters, records))
+        delay = min(SEND_RETRY_DELAY * 2**self._send_failures, MAX_SEND_RETRY_DELAY)
+        self._send_failures += 1
+        # On stop the failed sends are requeued once by stop itself, the ones that
+        # fail again are not acknowledged and come again on the next start
+        if self._stopping or self._send_retry_timer is not None:
+            return
+        self._send_retry_timer = asyncio.get_running_loop().call_later(
+            delay, self._requeue_failed_sends
+        )
+
+    def _requeue_failed_sends(self):
+        self._send_retry_timer = None
+        for messages, dead_letters, records in self._failed_sends:
+            self._resends.extend(messages)
+            self._dead_letters.extend(dead_letters)
+            self._resent_records.extend(records)
+        self._failed_sends = []
+        self._flush_completed()
+
+    async def _fetch(self) -> List[Record]:
+        self._fetching = True
+        started = 0.0
+        try:
+            await self._apply_backpressure()
+            if self._queue_connector.supports_blocking_fetch:
+                if self._metrics is not None:
+                    started = perf_counter()
+                records: List[Record] = await self._queue_connector.get_records(
+                    max_chunk_size=self._itinerary.config.max_chunk_size,
+                    timeout=self._frequency,
                 )
             else:
-                for message in messages:
-                    await self._resolve_message(message)
+                await self._clock_handler()
+                if self._metrics is not None:
+                    started = perf_counter()
+                records: List[Record] = await self._queue_connector.get_records(
+                    max_chunk_size=self._itinerary.config.max_chunk_size
+                )
+        finally:
+            self._fetching = False
+        if self._metrics is not None:
+            self._metrics.on_fetch(
+                latency=perf_counter() - started, chunk_size=len(records)
+            )
+        self._track_pending(records=records, sign=1)
+        await self._apply_backpressure()
+        self._adapt_frequency(chunk_size=len(records))
+        return records
+
+    async def _prefetch(self, buffer: asyncio.Queue):
+        self._fetch_task = asyncio.current_task()
+        try:
+            while not self._stopping:
+                records = await self._fetch()
+                if records:
+                    await buffer.put(records)
+        except asyncio.CancelledError:
+            if not self._stopping:
+                raise
+            self._fetch_task.uncancel()
+        except Exception as exception:  # pylint: disable=W0718
+            await buffer.put(exception)
+            return
+        # The watcher may be gone on stop, a full buffer skips the end sentinel and
+        # the watcher ends once it drains the buffer of this finished task
+        if not buffer.full():
+            buffer.put_nowait(None)
+
+    async def _watch(self):
+        self._watch_task = asyncio.current_task()
+        try:
+            if self._itinerary.config.prefetch > 0:
+                await self._watch_prefetched()
+                return
+            self._fetch_task = self._watch_task
+            while not self._stopping:
+                records = await self._fetch()
+                await self._dispatch(records=records)
+        except asyncio.CancelledError:
+            if not self._stopping:
+                raise
+            self._watch_task.uncancel()
+
+    async def _watch_prefetched(self):
+        buffer = asyncio.Queue(maxsize=self._itinerary.config.prefetch)
+        prefetch_task = asyncio.create_task(self._prefetch(buffer=buffer))
+        try:
+            while not (buffer.empty() and prefetch_task.done()):
+                records = await buffer.get()
+                if records is None or self._stop_expired:
+                    break
+                if isinstance(records, Exception):
+                    raise records
+                await self._dispatch(records=records)
+        finally:
+            prefetch_task.cancel()
+
+    async def _dispatch(self, records: List[Record]):
+        if self._itinerary.batch:
+            if records:
+                await self._resolve_records_batch(records=records)
+        elif self._itinerary.config.sequential:
+            for record in records:
+                await self._resolve_record(record)
+        elif self._itinerary.config.partition_ordered:
+            partitions = {}
+            for record in records:
+                partitions.setdefault(record.partition_key, []).append(record)
+            await asyncio.gather(
+                *[
+                    self._resolve_partition(records=group)
+                    for group in partitions.values()
+                ]
+            )
+        elif self._in_flight_slots is not None:
+            for record in records:
+                await self._in_flight_slots.acquire()
+                task = asyncio.create_task(self._resolve_record(record))
+                self._in_flight.add(task)
+                task.add_done_callback(self._release_in_flight_slot)
+        else:
+            await asyncio.gather(*[self._resolve_record(record) for record in records])
+        self._flush_completed()
+
+    def _release_in_flight_slot(self, task: asyncio.Task):
+        self._in_flight.discard(task)
+        self._in_flight_slots.release()
+        if not self._in_flight:
+            self._flush_completed()
@@ -1,5 +1,6 @@
 import asyncio
-from typing import Callable, Type
+from dataclasses import replace
+from typing import Callable, Dict, Type
 
 import meeseeks
 
@@ -24,12 +25,17 @@ class GuideService(IGuide):
         self._spawners = []
 
     def register_route(
-        self, queue_name: str, config: GenericQueueConfig, callback: Callable
+        self,
+        queue_name: str,
+        config: GenericQueueConfig,
+        callback: Callable,
+        batch: bool = False,
     ):
         itinerary = Itinerary(
             queue_name=queue_name,
             config=config,
             callback=callback,
+            batch=batch,
         )
         if config.connector_name not in self._itineraries:
             self._itineraries.update({config.connector_name: []})
@@ -39,7 +45,7 @@ class GuideService(IGuide):
         self,
         connector: Type[AQueueConnector],
         config: GenericConnectorConfig,
-        spawn_process: bool,
+        spawn_process: bool | int,
     ):
         region_map = RegionMap(
             spawn_process=spawn_process, config=config, connector=connector
@@ -51,7 +57,10 @@ class GuideService(IGuide):
         self._spawners = [
             Spawner(
                 region_map=self._region_maps.get(connector_name),
-                itineraries=self._itineraries.get(connector_name, []),
+                itineraries=[
+                    self._with_dead_letter_map(itinerary=itinerary)
+                    for itinerary in self._itineraries.get(connector_name, [])
+                ],
             )
             for connector_name in self._region_maps
         ]
@@ -62,6 +71,22 @@ class GuideService(IGuide):
             ]
         )
 
-    def end(self):
-        for spawner in self._spawners:
-            spawner.close()
+    def _with_dead_letter_map(self, itinerary: Itinerary) -> Itinerary:
+        dead_letter = itinerary.config.dead_letter
+        if dead_letter is None:
+            return itinerary
+        region_map = self._region_maps.get(dead_letter.connector_name)
+        if region_map is None:
+            raise ValueError(
+                f"The dead letter connector {dead_letter.connector_name} is not registered"
+            )
+        return replace(itinerary, dead_letter_map=region_map)
+
+    def restart_counts(self) -> Dict[str, int]:
+        return {
+            spawner.connector_name: sum(spawner.restart_counts)
+            for spawner in self._spawners
+        }
+
+    async def end(self):
+        await asyncio.gather(*[spawner.close() for spawner in self._spawners])
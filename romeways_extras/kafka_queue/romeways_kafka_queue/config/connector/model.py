@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from romeways import GenericConnectorConfig
 
@@ -10,7 +10,10 @@ class KafkaConnectorConfig(GenericConnectorConfig):
      -> https://aiokafka.readthedocs.io/en/stable/api.html#aiokafka.AIOKafkaConsumer
     client_id: str See aiokafka.AIOKafkaConsumer doc.
      -> https://aiokafka.readthedocs.io/en/stable/api.html#aiokafka.AIOKafkaConsumer
+    linger_ms: int See aiokafka.AIOKafkaProducer doc.
+     -> https://aiokafka.readthedocs.io/en/stable/api.html#aiokafka.AIOKafkaProducer
     """
 
     bootstrap_server: str | list[str]
     client_id: str
+    linger_ms: int = field(default=0, kw_only=True)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from romeways import GenericQueueConfig
 
@@ -10,7 +10,18 @@ class KafkaQueueConfig(GenericQueueConfig):
      -> https://aiokafka.readthedocs.io/en/stable/api.html#aiokafka.AIOKafkaConsumer
     group_id: str See aiokafka.AIOKafkaConsumer doc.
      -> https://aiokafka.readthedocs.io/en/stable/api.html#aiokafka.AIOKafkaConsumer
+    multiplex: bool If the topic must be consumed by one AIOKafkaConsumer shared with all
+     the multiplex queues of the connector with the same group_id
+    manual_commit: bool If the offsets must be committed when their handlers finish
+     instead of the aiokafka auto commit. It commits the highest contiguous completed
+     offset of each partition
+    commit_every: int Completed messages that trigger a manual commit
+    commit_interval: float Time in seconds between the manual commits
     """
 
     topic: str
     group_id: str
+    multiplex: bool = field(default=False, kw_only=True)
+    manual_commit: bool = field(default=False, kw_only=True)
+    commit_every: int = field(default=100, kw_only=True)
+    commit_interval: float = field(default=5.0, kw_only=True)
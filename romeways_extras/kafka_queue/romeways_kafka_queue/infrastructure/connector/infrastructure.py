@@ -1,54 +1,213 @@
+import asyncio
 import logging
 from typing import List
 
 from aiokafka import AIOKafkaConsumer, ConsumerRecord, AIOKafkaProducer
+from aiokafka.errors import KafkaError
 from kafka import TopicPartition
 
-from romeways import AQueueConnector
+from romeways import AQueueConnector, Record
 
 from romeways_kafka_queue import KafkaQueueConfig
 from romeways_kafka_queue.config import KafkaConnectorConfig
+from romeways_kafka_queue.infrastructure.multiplexer import KafkaTopicMultiplexer
+from romeways_kafka_queue.infrastructure.offset_tracker import KafkaOffsetTracker
 
 
 class KafkaQueueConnector(AQueueConnector):
+    supports_blocking_fetch = True
+
     _connector_config: KafkaConnectorConfig
     _config: KafkaQueueConfig
     _consumer: AIOKafkaConsumer
     _producer: AIOKafkaProducer
+    _multiplexer: KafkaTopicMultiplexer
+    _offsets: KafkaOffsetTracker
+    _commit_task: asyncio.Task
+    _paused: bool = False
+
+    @property
+    def acks_records(self) -> bool:
+        return self._config.manual_commit
+
+    @property
+    def _multiplexer_key(self) -> tuple:
+        # The shared consumer commit mode is fixed when it is built
+        return "multiplexer", self._config.group_id, self._config.manual_commit
 
     async def on_start(self):
-        self._consumer = AIOKafkaConsumer(
-            self._config.topic,
+        if self._config.multiplex:
+            self._multiplexer = await self._resource_pool.acquire(
+                key=self._multiplexer_key,
+                factory=self._build_multiplexer,
+                closer=self._stop_multiplexer,
+            )
+            self._multiplexer.subscribe(
+                topic=self._config.topic, max_buffered=abs(self._config.max_chunk_size)
+            )
+        else:
+            self._consumer = AIOKafkaConsumer(
+                self._config.topic,
+                bootstrap_servers=self._connector_config.bootstrap_server,
+                client_id=self._connector_config.client_id,
+                group_id=self._config.group_id,
+                enable_auto_commit=not self._config.manual_commit,
+            )
+        self._producer = await self._resource_pool.acquire(
+            key="producer", factory=self._start_producer, closer=self._stop_producer
+        )
+        if not self._config.multiplex:
+            await self._consumer.start()
+        if self._config.manual_commit:
+            self._offsets = KafkaOffsetTracker()
+            self._commit_task = asyncio.create_task(self._commit_periodically())
+
+    async def on_start_sender(self):
+        self._producer = await self._resource_pool.acquire(
+            key="producer", factory=self._start_producer, closer=self._stop_producer
+        )
+
+    async def _start_producer(self) -> AIOKafkaProducer:
+        producer = AIOKafkaProducer(
             bootstrap_servers=self._connector_config.bootstrap_server,
+            linger_ms=self._connector_config.linger_ms,
+        )
+        await producer.start()
+        return producer
+
+    @staticmethod
+    async def _stop_producer(producer: AIOKafkaProducer):
+        await producer.stop()
+
+    async def _build_multiplexer(self) -> KafkaTopicMultiplexer:
+        return KafkaTopicMultiplexer(
+            bootstrap_server=self._connector_config.bootstrap_server,
             client_id=self._connector_config.client_id,
             group_id=self._config.group_id,
+            enable_auto_commit=not self._config.manual_commit,
         )
-        self._producer = AIOKafkaProducer(
-            bootstrap_servers=self._connector_config.bootstrap_server
-        )
-        await self._producer.start()
-        await self._consumer.start()
 
-    async def get_messages(self, max_chunk_size: int) -> List[bytes]:
-        data: dict[TopicPartition, list[ConsumerRecord]] = await self._consumer.getmany(
-            max_records=abs(max_chunk_size)
-        )
-        buffer = []
-        for messages in data.values():
-            for msg in messages:
-                if msg.value is None:
-                    logging.warning(
-                        "Message from topic '%s' with partition '%s', offset '%d', "
-                        "key '%s' and timestamp '%d' without payload. Discard message.",
-                        msg.topic,
-                        msg.partition,
-                        msg.offset,
-                        msg.key,
-                        msg.timestamp,
-                    )
-                    continue
-                buffer.append(msg.value)
-        return buffer
+    @staticmethod
+    async def _stop_multiplexer(multiplexer: KafkaTopicMultiplexer):
+        await multiplexer.stop()
+
+    async def get_records(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[Record]:
+        timeout_ms = 0 if timeout is None else int(timeout * 1000)
+        if self._config.multiplex:
+            consumer_records = await self._multiplexer.get_records(
+                topic=self._config.topic,
+                max_records=abs(max_chunk_size),
+                timeout_ms=timeout_ms,
+            )
+        else:
+            if self._paused:
+                # Partitions assigned by a rebalance while paused come unpaused
+                self._consumer.pause(*self._consumer.assignment())
+            data: dict[
+                TopicPartition, list[ConsumerRecord]
+            ] = await self._consumer.getmany(
+                timeout_ms=timeout_ms, max_records=abs(max_chunk_size)
+            )
+            consumer_records = [msg for messages in data.values() for msg in messages]
+        records = []
+        for msg in consumer_records:
+            topic_partition = TopicPartition(msg.topic, msg.partition)
+            if self._config.manual_commit:
+                self._offsets.track(topic_partition, msg.offset)
+            if msg.value is None:
+                logging.warning(
+                    "Message from topic '%s' with partition '%s', offset '%d', "
+                    "key '%s' and timestamp '%d' without payload. Discard message.",
+                    msg.topic,
+                    msg.partition,
+                    msg.offset,
+                    msg.key,
+                    msg.timestamp,
+                )
+                if self._config.manual_commit:
+                    self._offsets.complete(topic_partition, msg.offset)
+                continue
+            records.append(
+                Record(
+                    value=msg.value, partition_key=topic_partition, offset=msg.offset
+                )
+            )
+        return records
+
+    async def get_messages(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[bytes]:
+        records = await self.get_records(max_chunk_size=max_chunk_size, timeout=timeout)
+        return [record.value for record in records]
+
+    async def ack(self, records: List[Record]):
+        if not self._config.manual_commit:
+            return
+        for record in records:
+            self._offsets.complete(record.partition_key, record.offset)
+        if self._offsets.uncommitted >= self._config.commit_every:
+            await self._commit()
+
+    async def _commit(self):
+        offsets = self._offsets.offsets_to_commit()
+        if not offsets:
+            return
+        try:
+            if self._config.multiplex:
+                await self._multiplexer.commit(offsets)
+            else:
+                await self._consumer.commit(offsets)
+        except KafkaError as exception:
+            logging.warning(
+                "The offsets %s of topic '%s' could not be committed. Error %s",
+                offsets,
+                self._config.topic,
+                exception,
+            )
+            return
+        self._offsets.committed(offsets)
+
+    async def _commit_periodically(self):
+        while True:
+            await asyncio.sleep(self._config.commit_interval)
+            await self._commit()
 
     async def send_messages(self, message: bytes):
         await self._producer.send(self._config.topic, message)
+
+    async def send_messages_batch(self, messages: List[bytes]):
+        deliveries = [
+            await self._producer.send(self._config.topic, message)
+            for message in messages
+        ]
+        await asyncio.gather(*deliveries)
+
+    async def pause(self):
+        self._paused = True
+        if self._config.multiplex:
+            self._multiplexer.hold(topic=self._config.topic)
+        else:
+            self._consumer.pause(*self._consumer.assignment())
+
+    async def resume(self):
+        self._paused = False
+        if self._config.multiplex:
+            self._multiplexer.release(topic=self._config.topic)
+        else:
+            self._consumer.resume(*self._consumer.paused())
+
+    async def on_stop(self):
+        if self._config.manual_commit:
+            self._commit_task.cancel()
+            await self._commit()
+        if self._config.multiplex:
+            self._multiplexer.unsubscribe(topic=self._config.topic)
+            await self._resource_pool.release(key=self._multiplexer_key)
+        else:
+            await self._consumer.stop()
+        await self._resource_pool.release(key="producer")
+
+    async def on_stop_sender(self):
+        await self._resource_pool.release(key="producer")
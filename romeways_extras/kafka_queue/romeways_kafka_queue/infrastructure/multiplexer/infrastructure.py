@@ -0,0 +1,121 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List
+
+from aiokafka import AIOKafkaConsumer, ConsumerRecord
+from kafka import TopicPartition
+
+
+class KafkaTopicMultiplexer:
+    """
+    One AIOKafkaConsumer subscribed to the topics of all the itineraries with the same
+    group_id. Each getmany result is split by topic in local buffers and a topic whose
+    buffer holds max_buffered records has its partitions paused until it drains. A
+    topic can also be held paused by its itinerary with hold and release.
+    """
+
+    def __init__(
+        self,
+        bootstrap_server: str | list[str],
+        client_id: str,
+        group_id: str,
+        enable_auto_commit: bool = True,
+    ):
+        self._bootstrap_server = bootstrap_server
+        self._client_id = client_id
+        self._group_id = group_id
+        self._enable_auto_commit = enable_auto_commit
+        self._topics: List[str] = []
+        self._buffers: Dict[str, Deque[ConsumerRecord]] = {}
+        self._max_buffered: Dict[str, int] = {}
+        self._paused: set[str] = set()
+        self._held: set[str] = set()
+        self._lock = asyncio.Lock()
+        self._consumer: AIOKafkaConsumer | None = None
+
+    def subscribe(self, topic: str, max_buffered: int):
+        if topic in self._buffers:
+            return
+        self._topics.append(topic)
+        self._buffers[topic] = deque()
+        self._max_buffered[topic] = max(max_buffered, 1)
+        if self._consumer is not None:
+            self._consumer.subscribe(topics=self._topics)
+
+    def unsubscribe(self, topic: str):
+        if topic not in self._buffers:
+            return
+        self._topics.remove(topic)
+        del self._buffers[topic]
+        del self._max_buffered[topic]
+        self._paused.discard(topic)
+        self._held.discard(topic)
+        if self._consumer is not None and self._topics:
+            self._consumer.subscribe(topics=self._topics)
+
+    async def stop(self):
+        if self._consumer is not None:
+            await self._consumer.stop()
+            self._consumer = None
+
+    def hold(self, topic: str):
+        self._held.add(topic)
+        if self._consumer is not None:
+            self._consumer.pause(*self._topic_partitions(topic))
+
+    def release(self, topic: str):
+        self._held.discard(topic)
+        if self._consumer is not None and topic not in self._paused:
+            self._consumer.resume(*self._topic_partitions(topic))
+
+    async def commit(self, offsets: Dict[TopicPartition, int]):
+        if self._consumer is not None:
+            await self._consumer.commit(offsets)
+
+    async def get_records(
+        self, topic: str, max_records: int, timeout_ms: int = 0
+    ) -> List[ConsumerRecord]:
+        buffer = self._buffers[topic]
+        if not buffer:
+            async with self._lock:
+                if not buffer:
+                    await self._fetch(max_records=max_records, timeout_ms=timeout_ms)
+        records = [buffer.popleft() for _ in range(min(max_records, len(buffer)))]
+        if topic in self._paused and len(buffer) < self._max_buffered[topic]:
+            self._paused.discard(topic)
+            if topic not in self._held:
+                self._consumer.resume(*self._topic_partitions(topic))
+        return records
+
+    async def _fetch(self, max_records: int, timeout_ms: int):
+        if self._consumer is None:
+            self._consumer = AIOKafkaConsumer(
+                *self._topics,
+                bootstrap_servers=self._bootstrap_server,
+                client_id=self._client_id,
+                group_id=self._group_id,
+                enable_auto_commit=self._enable_auto_commit,
+            )
+            await self._consumer.start()
+        for topic in self._held:
+            # Partitions assigned by a rebalance while held come unpaused
+            self._consumer.pause(*self._topic_partitions(topic))
+        data: Dict[TopicPartition, List[ConsumerRecord]] = await self._consumer.getmany(
+            timeout_ms=timeout_ms, max_records=max_records
+        )
+        for topic_partition, records in data.items():
+            buffer = self._buffers.get(topic_partition.topic)
+            if buffer is None:
+                continue
+            buffer.extend(records)
+        for topic, buffer in self._buffers.items():
+            if topic not in self._paused and len(buffer) >= self._max_buffered[topic]:
+                self._paused.add(topic)
+                self._consumer.pause(*self._topic_partitions(topic))
+
+    def _topic_partitions(self, topic: str) -> List[TopicPartition]:
+        return [
+            topic_partition
+            for topic_partition in self._consumer.assignment()
+            if topic_partition.topic == topic
+        ]
@@ -0,0 +1,55 @@
+from collections import deque
+from typing import Deque, Dict, Set
+
+from kafka import TopicPartition
+
+
+class KafkaOffsetTracker:
+    """
+    Keep the fetched and the completed offsets of each partition. The commit position
+    of a partition only moves past an offset when it and all the offsets fetched before
+    it are completed, so a crash replays the uncommitted work.
+    """
+
+    def __init__(self):
+        self._fetched: Dict[TopicPartition, Deque[int]] = {}
+        self._completed: Dict[TopicPartition, Set[int]] = {}
+        self._positions: Dict[TopicPartition, int] = {}
+        self._committed: Dict[TopicPartition, int] = {}
+        self._uncommitted = 0
+
+    @property
+    def uncommitted(self) -> int:
+        return self._uncommitted
+
+    def track(self, topic_partition: TopicPartition, offset: int):
+        fetched = self._fetched.setdefault(topic_partition, deque())
+        completed = self._completed.setdefault(topic_partition, set())
+        if fetched and offset <= fetched[-1]:
+            # The partition was reassigned or seeked, the old offsets come again
+            fetched.clear()
+            completed.clear()
+        fetched.append(offset)
+
+    def complete(self, topic_partition: TopicPartition, offset: int):
+        fetched = self._fetched.get(topic_partition)
+        if not fetched or offset < fetched[0]:
+            return
+        completed = self._completed[topic_partition]
+        completed.add(offset)
+        while fetched and fetched[0] in completed:
+            done = fetched.popleft()
+            completed.discard(done)
+            self._positions[topic_partition] = done + 1
+        self._uncommitted += 1
+
+    def offsets_to_commit(self) -> Dict[TopicPartition, int]:
+        return {
+            topic_partition: position
+            for topic_partition, position in self._positions.items()
+            if self._committed.get(topic_partition) != position
+        }
+
+    def committed(self, offsets: Dict[TopicPartition, int]):
+        self._committed.update(offsets)
+        self._uncommitted = 0
@@ -1,11 +1,12 @@
 import asyncio
 from multiprocessing import Queue
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 import pytest
 from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, ConsumerRecord
 from kafka import TopicPartition
 
+from romeways.src.infrastructure.resource_pool import ResourcePool
 from romeways import (
     KafkaConnectorConfig,
     KafkaQueueConfig,
@@ -33,7 +34,7 @@ class StubAIOKafkaConsumer:
         self._client_id = client_id
         self._group_id = group_id
 
-    async def getmany(self, max_records: int):
+    async def getmany(self, max_records: int, timeout_ms: int = 0):
         queue = QueueStubManager.get_queue(
             topic=self._topic, bootstrap_servers=self._bootstrap_server
         )
@@ -74,6 +75,9 @@ class StubAIOKafkaProducer:
             topic=topic, bootstrap_servers=self._bootstrap_server
         )
         queue.put_nowait(message)
+        delivery = asyncio.get_running_loop().create_future()
+        delivery.set_result(None)
+        return delivery
 
     async def start(self):
         pass
@@ -109,12 +113,252 @@ async def test_on_start():
         bootstrap_servers=connector_config.bootstrap_server,
         client_id=connector_config.client_id,
         group_id=config.group_id,
+        enable_auto_commit=True,
     )
     producer.assert_called_once_with(
-        AIOKafkaProducer, bootstrap_servers=connector_config.bootstrap_server
+        AIOKafkaProducer,
+        bootstrap_servers=connector_config.bootstrap_server,
+        linger_ms=connector_config.linger_ms,
+    )
+
+
+@pytest.mark.asyncio
+async def test_on_start_shared_producer():
+    connector_config = KafkaConnectorConfig(
+        connector_name="tests",
+        bootstrap_server="localhost:9200",
+        client_id="romeways_client_id",
+    )
+    resource_pool = ResourcePool()
+    connectors = [
+        KafkaQueueConnector(
+            connector_config=connector_config,
+            config=KafkaQueueConfig(
+                connector_name="tests",
+                topic=topic,
+                group_id="romeways_group_id",
+                frequency=1,
+                sequential=False,
+                max_chunk_size=10,
+            ),
+            resource_pool=resource_pool,
+        )
+        for topic in ["test_topic_a", "test_topic_b"]
+    ]
+    with patch.object(
+        AIOKafkaConsumer, "__new__", side_effect=lambda *_, **__: AsyncMock()
+    ) as consumer:
+        with patch.object(
+            AIOKafkaProducer, "__new__", return_value=AsyncMock()
+        ) as producer:
+            for connector in connectors:
+                await connector.on_start()
+            assert consumer.call_count == 2
+            producer.assert_called_once()
+            shared_producer = producer.return_value
+            assert connectors[0]._producer is connectors[1]._producer
+            await connectors[0].on_stop()
+            shared_producer.stop.assert_not_awaited()
+            await connectors[1].on_stop()
+            shared_producer.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_on_start_multiplex_commit_modes():
+    connector_config = KafkaConnectorConfig(
+        connector_name="tests",
+        bootstrap_server="localhost:9200",
+        client_id="romeways_client_id",
+    )
+    resource_pool = ResourcePool()
+    connectors = [
+        KafkaQueueConnector(
+            connector_config=connector_config,
+            config=KafkaQueueConfig(
+                connector_name="tests",
+                topic=topic,
+                group_id="romeways_group_id",
+                frequency=1,
+                sequential=False,
+                max_chunk_size=10,
+                multiplex=True,
+                manual_commit=manual_commit,
+            ),
+            resource_pool=resource_pool,
+        )
+        for topic, manual_commit in [
+            ("test_topic_a", False),
+            ("test_topic_b", True),
+            ("test_topic_c", True),
+        ]
+    ]
+    with patch(
+        "romeways_kafka_queue.infrastructure.connector.infrastructure"
+        ".KafkaTopicMultiplexer",
+        side_effect=lambda **_: AsyncMock(subscribe=MagicMock()),
+    ) as multiplexer, patch.object(
+        AIOKafkaProducer, "__new__", return_value=AsyncMock()
+    ):
+        for connector in connectors:
+            await connector.on_start()
+        for connector in connectors:
+            await connector.on_stop()
+
+    assert [
+        call.kwargs["enable_auto_commit"] for call in multiplexer.call_args_list
+    ] == [
+        True,
+        False,
+    ]
+    multiplexers = [connector._multiplexer for connector in connectors]
+    assert multiplexers[0] is not multiplexers[1]
+    assert multiplexers[1] is multiplexers[2]
+
+
+@pytest.mark.asyncio
+async def test_on_stop():
+    connector = KafkaQueueConnector(
+        connector_config=KafkaConnectorConfig(
+            connector_name="tests",
+            bootstrap_server="localhost:9200",
+            client_id="romeways_client_id",
+        ),
+        config=KafkaQueueConfig(
+            connector_name="tests",
+            topic="test_topic",
+            group_id="romeways_group_id",
+            frequency=1,
+            sequential=False,
+            max_chunk_size=10,
+        ),
+    )
+    with patch.object(AIOKafkaConsumer, "__new__", return_value=AsyncMock()):
+        with patch.object(AIOKafkaProducer, "__new__", return_value=AsyncMock()):
+            await connector.on_start()
+    await connector.on_stop()
+    connector._consumer.stop.assert_awaited_once()  # pylint: disable=W0212
+    connector._producer.stop.assert_awaited_once()  # pylint: disable=W0212
+
+
+@pytest.mark.asyncio
+async def test_on_start_sender():
+    connector = KafkaQueueConnector(
+        connector_config=KafkaConnectorConfig(
+            connector_name="tests",
+            bootstrap_server="localhost:9200",
+            client_id="romeways_client_id",
+        ),
+        config=KafkaQueueConfig(
+            connector_name="tests",
+            topic="test_topic_dlq",
+            group_id="romeways_group_id",
+            frequency=1,
+            sequential=False,
+            max_chunk_size=10,
+        ),
+    )
+    with patch.object(
+        AIOKafkaConsumer, "__new__", return_value=AsyncMock()
+    ) as consumer, patch.object(AIOKafkaProducer, "__new__", return_value=AsyncMock()):
+        await connector.on_start_sender()
+    consumer.assert_not_called()
+    producer = connector._producer  # pylint: disable=W0212
+    await connector.on_stop_sender()
+    producer.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_manual_commit():
+    connector = KafkaQueueConnector(
+        connector_config=KafkaConnectorConfig(
+            connector_name="tests",
+            bootstrap_server="localhost:9200",
+            client_id="romeways_client_id",
+        ),
+        config=KafkaQueueConfig(
+            connector_name="tests",
+            topic="test_topic",
+            group_id="romeways_group_id",
+            frequency=1,
+            sequential=False,
+            max_chunk_size=10,
+            manual_commit=True,
+            commit_every=2,
+        ),
+    )
+    with patch.object(
+        AIOKafkaConsumer, "__new__", return_value=AsyncMock()
+    ) as consumer, patch.object(AIOKafkaProducer, "__new__", return_value=AsyncMock()):
+        await connector.on_start()
+    assert consumer.call_args.kwargs["enable_auto_commit"] is False
+    assert connector.acks_records is True
+
+    topic_partition = TopicPartition("test_topic", 0)
+    connector._consumer.getmany.return_value = {  # pylint: disable=W0212
+        topic_partition: [
+            ConsumerRecord(
+                topic="test_topic",
+                partition=0,
+                offset=offset,
+                timestamp=0,
+                timestamp_type=1,
+                key=None,
+                value=str(offset).encode(),
+                checksum=0,
+                serialized_key_size=0,
+                serialized_value_size=0,
+                headers=None,
+            )
+            for offset in range(3)
+        ]
+    }
+    records = await connector.get_records(10)
+    assert [record.offset for record in records] == [0, 1, 2]
+
+    await connector.ack(records=[records[1]])
+    await connector.ack(records=[records[0]])
+    connector._consumer.commit.assert_awaited_once_with(  # pylint: disable=W0212
+        {topic_partition: 2}
+    )
+    await connector.ack(records=[records[2]])
+    await connector.on_stop()
+    connector._consumer.commit.assert_awaited_with(  # pylint: disable=W0212
+        {topic_partition: 3}
     )
 
 
+@pytest.mark.asyncio
+async def test_get_messages_timeout():
+    connector = await get_connector()
+    consumer = MagicMock()
+    consumer.getmany = AsyncMock(return_value={})
+    connector._consumer = consumer  # pylint: disable=W0212
+
+    assert KafkaQueueConnector.supports_blocking_fetch is True
+    await connector.get_messages(2, timeout=1.5)
+    consumer.getmany.assert_awaited_once_with(timeout_ms=1500, max_records=2)
+
+
+@pytest.mark.asyncio
+async def test_pause_and_resume():
+    connector = await get_connector()
+    topic_partition = TopicPartition("test_topic", 0)
+    consumer = MagicMock()
+    consumer.assignment.return_value = {topic_partition}
+    consumer.paused.return_value = {topic_partition}
+    consumer.getmany = AsyncMock(return_value={})
+    connector._consumer = consumer  # pylint: disable=W0212
+
+    await connector.pause()
+    consumer.pause.assert_called_once_with(topic_partition)
+    await connector.get_messages(1)
+    assert consumer.pause.call_count == 2
+    await connector.resume()
+    consumer.resume.assert_called_once_with(topic_partition)
+    await connector.get_messages(1)
+    assert consumer.pause.call_count == 2
+
+
 async def get_connector():
     connector_name = "tests"
     bootstrap_server = "localhost:9200"
@@ -168,6 +412,15 @@ async def test_get_messages():
     assert items_c == [b"4"]
 
 
+@pytest.mark.asyncio
+async def test_send_messages_batch():
+    connector = await get_connector()
+    await connector.send_messages_batch([str(i).encode() for i in range(3)])
+    await asyncio.sleep(1)
+    items = await connector.get_messages(5)
+    assert items == [b"0", b"1", b"2"]
+
+
 @pytest.mark.asyncio
 async def test_get_messages_without_none():
     connector = await get_connector()
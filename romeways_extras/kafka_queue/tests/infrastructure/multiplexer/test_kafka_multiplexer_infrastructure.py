@@ -0,0 +1,186 @@
+from unittest.mock import patch, AsyncMock, MagicMock
+
+import pytest
+from aiokafka import ConsumerRecord
+from kafka import TopicPartition
+
+from romeways.src.infrastructure.resource_pool import ResourcePool
+from romeways import (
+    KafkaConnectorConfig,
+    KafkaQueueConfig,
+    KafkaQueueConnector,
+)
+from romeways_kafka_queue.infrastructure.multiplexer import KafkaTopicMultiplexer
+
+
+def get_record(topic: str, offset: int, value: bytes | None) -> ConsumerRecord:
+    return ConsumerRecord(
+        topic=topic,
+        partition=0,
+        offset=offset,
+        timestamp=0,
+        timestamp_type=1,
+        key=None,
+        value=value,
+        checksum=0,
+        serialized_key_size=0,
+        serialized_value_size=0,
+        headers=None,
+    )
+
+
+class StubMultiTopicConsumer:
+    instances = []
+
+    def __init__(
+        self, *topics, bootstrap_servers, client_id, group_id, enable_auto_commit
+    ):
+        self.topics = list(topics)
+        self.group_id = group_id
+        self.enable_auto_commit = enable_auto_commit
+        self.chunks = []
+        self.getmany_calls = 0
+        self.pause = MagicMock()
+        self.resume = MagicMock()
+        self.subscribe = MagicMock()
+        self.stopped = False
+        StubMultiTopicConsumer.instances.append(self)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        self.stopped = True
+
+    async def getmany(self, max_records: int, timeout_ms: int = 0):
+        self.getmany_calls += 1
+        return self.chunks.pop(0) if self.chunks else {}
+
+    def assignment(self):
+        return {TopicPartition(topic, 0) for topic in self.topics}
+
+
+@pytest.fixture(name="stub_consumer")
+def fixture_stub_consumer():
+    StubMultiTopicConsumer.instances = []
+    with patch(
+        "romeways_kafka_queue.infrastructure.multiplexer.infrastructure.AIOKafkaConsumer",
+        StubMultiTopicConsumer,
+    ):
+        yield StubMultiTopicConsumer
+
+
+@pytest.mark.asyncio
+async def test_get_records_demultiplex(stub_consumer):
+    multiplexer = KafkaTopicMultiplexer(
+        bootstrap_server="localhost:9200", client_id="client", group_id="group"
+    )
+    multiplexer.subscribe(topic="topic_a", max_buffered=10)
+    multiplexer.subscribe(topic="topic_b", max_buffered=10)
+
+    records_a = await multiplexer.get_records(topic="topic_a", max_records=10)
+    consumer = stub_consumer.instances[0]
+    assert consumer.topics == ["topic_a", "topic_b"]
+    assert records_a == []
+
+    consumer.chunks.append(
+        {
+            TopicPartition("topic_a", 0): [get_record("topic_a", 1, b"a1")],
+            TopicPartition("topic_b", 0): [
+                get_record("topic_b", 1, b"b1"),
+                get_record("topic_b", 2, b"b2"),
+            ],
+        }
+    )
+    records_a = await multiplexer.get_records(topic="topic_a", max_records=10)
+    records_b = await multiplexer.get_records(topic="topic_b", max_records=1)
+    records_b += await multiplexer.get_records(topic="topic_b", max_records=1)
+    assert [record.value for record in records_a] == [b"a1"]
+    assert [record.value for record in records_b] == [b"b1", b"b2"]
+    assert consumer.getmany_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_get_records_pause_and_resume(stub_consumer):
+    multiplexer = KafkaTopicMultiplexer(
+        bootstrap_server="localhost:9200", client_id="client", group_id="group"
+    )
+    multiplexer.subscribe(topic="topic_a", max_buffered=1)
+    multiplexer.subscribe(topic="topic_b", max_buffered=1)
+    await multiplexer.get_records(topic="topic_a", max_records=1)
+    consumer = stub_consumer.instances[0]
+    consumer.chunks.append(
+        {TopicPartition("topic_b", 0): [get_record("topic_b", 1, b"b1")]}
+    )
+
+    await multiplexer.get_records(topic="topic_a", max_records=1)
+    consumer.pause.assert_called_once_with(TopicPartition("topic_b", 0))
+    await multiplexer.get_records(topic="topic_b", max_records=1)
+    consumer.resume.assert_called_once_with(TopicPartition("topic_b", 0))
+
+
+@pytest.mark.asyncio
+async def test_hold_and_release(stub_consumer):
+    multiplexer = KafkaTopicMultiplexer(
+        bootstrap_server="localhost:9200", client_id="client", group_id="group"
+    )
+    multiplexer.subscribe(topic="topic_a", max_buffered=1)
+    await multiplexer.get_records(topic="topic_a", max_records=1)
+    consumer = stub_consumer.instances[0]
+
+    multiplexer.hold(topic="topic_a")
+    consumer.pause.assert_called_once_with(TopicPartition("topic_a", 0))
+    await multiplexer.get_records(topic="topic_a", max_records=1)
+    assert consumer.pause.call_count == 2
+    multiplexer.release(topic="topic_a")
+    consumer.resume.assert_called_once_with(TopicPartition("topic_a", 0))
+
+
+@pytest.mark.asyncio
+async def test_connectors_share_multiplexer(stub_consumer):
+    connector_config = KafkaConnectorConfig(
+        connector_name="tests",
+        bootstrap_server="localhost:9200",
+        client_id="romeways_client_id",
+    )
+    resource_pool = ResourcePool()
+    connectors = [
+        KafkaQueueConnector(
+            connector_config=connector_config,
+            config=KafkaQueueConfig(
+                connector_name="tests",
+                topic=topic,
+                group_id="romeways_group_id",
+                frequency=1,
+                sequential=False,
+                max_chunk_size=10,
+                multiplex=True,
+            ),
+            resource_pool=resource_pool,
+        )
+        for topic in ["topic_a", "topic_b"]
+    ]
+    with patch.object(KafkaQueueConnector, "_start_producer", return_value=AsyncMock()):
+        for connector in connectors:
+            await connector.on_start()
+
+    assert connectors[0]._multiplexer is connectors[1]._multiplexer
+    assert await connectors[0].get_messages(10) == []
+    consumer = stub_consumer.instances[0]
+    consumer.chunks.append(
+        {
+            TopicPartition("topic_a", 0): [get_record("topic_a", 1, b"a1")],
+            TopicPartition("topic_b", 0): [
+                get_record("topic_b", 1, None),
+                get_record("topic_b", 2, b"b2"),
+            ],
+        }
+    )
+    assert await connectors[1].get_messages(10) == [b"b2"]
+    assert await connectors[0].get_messages(10) == [b"a1"]
+    assert len(stub_consumer.instances) == 1
+
+    await connectors[0].on_stop()
+    assert consumer.stopped is False
+    await connectors[1].on_stop()
+    assert consumer.stopped is True
@@ -0,0 +1,49 @@
+from kafka import TopicPartition
+
+from romeways_kafka_queue.infrastructure.offset_tracker import KafkaOffsetTracker
+
+
+def test_offsets_to_commit_contiguous():
+    topic_partition = TopicPartition("topic", 0)
+    tracker = KafkaOffsetTracker()
+    for offset in [10, 11, 13]:
+        tracker.track(topic_partition, offset)
+
+    tracker.complete(topic_partition, 11)
+    assert tracker.offsets_to_commit() == {}
+    tracker.complete(topic_partition, 10)
+    assert tracker.offsets_to_commit() == {topic_partition: 12}
+    tracker.complete(topic_partition, 13)
+    assert tracker.offsets_to_commit() == {topic_partition: 14}
+    assert tracker.uncommitted == 3
+
+
+def test_committed():
+    topic_partition = TopicPartition("topic", 0)
+    tracker = KafkaOffsetTracker()
+    tracker.track(topic_partition, 0)
+    tracker.complete(topic_partition, 0)
+
+    tracker.committed({topic_partition: 1})
+    assert tracker.offsets_to_commit() == {}
+    assert tracker.uncommitted == 0
+
+
+def test_track_reassigned_partition():
+    topic_partition = TopicPartition("topic", 0)
+    tracker = KafkaOffsetTracker()
+    for offset in [5, 6]:
+        tracker.track(topic_partition, offset)
+    tracker.track(topic_partition, 5)
+
+    tracker.complete(topic_partition, 6)
+    assert tracker.offsets_to_commit() == {}
+    tracker.complete(topic_partition, 5)
+    assert tracker.offsets_to_commit() == {topic_partition: 6}
+
+
+def test_complete_untracked_partition():
+    tracker = KafkaOffsetTracker()
+    tracker.complete(TopicPartition("topic", 0), 1)
+    assert tracker.offsets_to_commit() == {}
+    assert tracker.uncommitted == 0
@@ -1,2 +1,2 @@
-from .config import MemoryQueueConfig, MemoryConnectorConfig
-from .infrastructure import MemoryQueueConnector
+from .config import MemoryQueueConfig, AsyncMemoryQueueConfig, MemoryConnectorConfig
+from .infrastructure import MemoryQueueConnector, AsyncMemoryQueueConnector
@@ -1,2 +1,2 @@
 from .connector import MemoryConnectorConfig
-from .queue import MemoryQueueConfig
+from .queue import MemoryQueueConfig, AsyncMemoryQueueConfig
@@ -1 +1 @@
-from .model import MemoryQueueConfig
+from .model import MemoryQueueConfig, AsyncMemoryQueueConfig
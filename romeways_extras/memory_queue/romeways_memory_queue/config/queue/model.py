@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 from multiprocessing import Queue
 
@@ -7,3 +8,8 @@ from romeways import GenericQueueConfig
 @dataclass(slots=True, frozen=True)
 class MemoryQueueConfig(GenericQueueConfig):
     queue: Queue
+
+
+@dataclass(slots=True, frozen=True)
+class AsyncMemoryQueueConfig(GenericQueueConfig):
+    queue: asyncio.Queue
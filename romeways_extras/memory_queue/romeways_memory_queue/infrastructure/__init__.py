@@ -1 +1 @@
-from .connector import MemoryQueueConnector
+from .connector import MemoryQueueConnector, AsyncMemoryQueueConnector
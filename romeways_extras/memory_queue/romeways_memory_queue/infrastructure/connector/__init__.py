@@ -1 +1 @@
-from .infrastructure import MemoryQueueConnector
+from .infrastructure import MemoryQueueConnector, AsyncMemoryQueueConnector
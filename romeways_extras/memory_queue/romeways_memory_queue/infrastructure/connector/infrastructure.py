@@ -1,23 +1,107 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Queue
+from queue import Empty
 from typing import List
 
-from romeways import AQueueConnector
+from romeways import AQueueConnector, Record
 
 
 class MemoryQueueConnector(AQueueConnector):
+    supports_blocking_fetch = True
+
+    # Runs the blocking queue reads, a fetch can hold its thread up to the timeout
+    # so it does not share the loop default executor
+    _executor: ThreadPoolExecutor | None = None
+
     async def on_start(self):
-        pass
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"romeways-{self._config.connector_name}"
+        )
+
+    async def on_stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def get_records(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[Record]:
+        messages = await self.get_messages(
+            max_chunk_size=max_chunk_size, timeout=timeout
+        )
+        return [Record(value=message) for message in messages]
 
-    async def get_messages(self, max_chunk_size: int) -> List[bytes]:
+    async def get_messages(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[bytes]:
         queue: Queue = self._config.queue
+        if max_chunk_size == 0:
+            return []
+        drain = asyncio.get_running_loop().run_in_executor(
+            self._executor, self._drain, queue, abs(max_chunk_size), timeout
+        )
+        try:
+            return await asyncio.shield(drain)
+        except asyncio.CancelledError:
+            # The executor thread can not be cancelled, its messages go back to the end
+            # of the queue so they come after the messages sent in the meantime
+            drain.add_done_callback(lambda future: self._requeue(queue, future))
+            raise
+
+    @staticmethod
+    def _drain(queue: Queue, max_chunk_size: int, timeout: float | None) -> List[bytes]:
         buffer = []
-        for _ in range(abs(max_chunk_size)):
-            if not queue.empty():
+        try:
+            buffer.append(queue.get(block=timeout is not None, timeout=timeout))
+            while len(buffer) < max_chunk_size:
                 buffer.append(queue.get_nowait())
-                continue
-            break
+        except Empty:
+            pass
         return buffer
 
+    @staticmethod
+    def _requeue(queue: Queue, future: asyncio.Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        for message in future.result():
+            queue.put_nowait(message)
+
     async def send_messages(self, message: bytes):
         queue: Queue = self._config.queue
         queue.put_nowait(message)
+
+
+class AsyncMemoryQueueConnector(AQueueConnector):
+    supports_blocking_fetch = True
+
+    async def on_start(self):
+        pass
+
+    async def get_records(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[Record]:
+        messages = await self.get_messages(
+            max_chunk_size=max_chunk_size, timeout=timeout
+        )
+        return [Record(value=message) for message in messages]
+
+    async def get_messages(
+        self, max_chunk_size: int, timeout: float | None = None
+    ) -> List[bytes]:
+        queue: asyncio.Queue = self._config.queue
+        if max_chunk_size == 0:
+            return []
+        buffer = []
+        if queue.empty() and timeout is not None:
+            try:
+                buffer.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                return buffer
+        while len(buffer) < abs(max_chunk_size) and not queue.empty():
+            buffer.append(queue.get_nowait())
+        return buffer
+
+    async def send_messages(self, message: bytes):
+        queue: asyncio.Queue = self._config.queue
+        queue.put_nowait(message)
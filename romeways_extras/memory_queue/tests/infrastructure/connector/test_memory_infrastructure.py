@@ -1,5 +1,7 @@
 import asyncio
+import threading
 from multiprocessing import Queue
+from unittest.mock import patch
 
 import pytest
 
@@ -7,7 +9,12 @@ from romeways import (
     MemoryConnectorConfig,
     MemoryQueueConfig,
     MemoryQueueConnector,
+    AsyncMemoryQueueConfig,
+    AsyncMemoryQueueConnector,
+    Record,
 )
+from romeways.src.domain.models.config.itinerary import Itinerary
+from romeways.src.service.chauffeur import ChauffeurService
 
 
 def get_connector():
@@ -24,6 +31,19 @@ def get_connector():
     return MemoryQueueConnector(connector_config=connector_config, config=config)
 
 
+def get_async_connector():
+    connector_name = "test_connector"
+    connector_config = MemoryConnectorConfig(connector_name=connector_name)
+    config = AsyncMemoryQueueConfig(
+        connector_name=connector_name,
+        queue=asyncio.Queue(),
+        frequency=1,
+        sequential=False,
+        max_chunk_size=10,
+    )
+    return AsyncMemoryQueueConnector(connector_config=connector_config, config=config)
+
+
 @pytest.mark.asyncio
 async def test_get_messages_empty_queue():
     connector = get_connector()
@@ -62,3 +82,106 @@ async def test_get_messages_max_chunk_size_lt_0():
     await asyncio.sleep(1)
     items = await connector.get_messages(-1)
     assert items == [b"0"]
+
+
+@pytest.mark.asyncio
+async def test_get_messages_timeout():
+    connector = get_connector()
+    for i in range(3):
+        await connector.send_messages(str(i).encode())
+    items = await connector.get_messages(5, timeout=1)
+    assert items[0] == b"0"
+    items += await connector.get_messages(5, timeout=1)
+    assert items == [b"0", b"1", b"2"]
+
+
+@pytest.mark.asyncio
+async def test_get_messages_timeout_empty_queue():
+    connector = get_connector()
+    items = await connector.get_messages(5, timeout=0.1)
+    assert items == []
+
+
+@pytest.mark.asyncio
+async def test_get_messages_own_executor():
+    connector = get_connector()
+    await connector.on_start()
+    await connector.send_messages(b"0")
+    threads = []
+
+    def drain(queue, max_chunk_size, timeout):
+        threads.append(threading.current_thread().name)
+        return [queue.get(timeout=timeout)]
+
+    with patch.object(MemoryQueueConnector, "_drain", side_effect=drain):
+        items = await connector.get_messages(5, timeout=1)
+    await connector.on_stop()
+
+    assert items == [b"0"]
+    assert threads[0].startswith("romeways-test_connector")
+    assert connector._executor is None
+
+
+@pytest.mark.asyncio
+async def test_get_messages_cancelled_requeue():
+    connector = get_connector()
+    task = asyncio.create_task(connector.get_messages(5, timeout=1))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    await connector.send_messages(b"0")
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0.2)
+    items = await connector.get_messages(5, timeout=1)
+    assert items == [b"0"]
+
+
+@pytest.mark.asyncio
+async def test_async_get_messages():
+    connector = get_async_connector()
+    for i in range(5):
+        await connector.send_messages(str(i).encode())
+    items_a = await connector.get_messages(3)
+    items_b = await connector.get_messages(3)
+    items_c = await connector.get_messages(0)
+    assert items_a == [b"0", b"1", b"2"]
+    assert items_b == [b"3", b"4"]
+    assert items_c == []
+
+
+@pytest.mark.asyncio
+async def test_async_get_messages_timeout():
+    connector = get_async_connector()
+    task = asyncio.create_task(connector.get_messages(3, timeout=1))
+    await asyncio.sleep(0.1)
+    assert task.done() is False
+    await connector.send_messages(b"0")
+    items = await asyncio.wait_for(task, timeout=0.1)
+    assert items == [b"0"]
+    assert await connector.get_messages(3, timeout=0.1) == []
+
+
+async def callback(message):
+    pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("get_queue_connector", [get_connector, get_async_connector])
+async def test_chauffeur_fetch_blocks_on_empty_queue(get_queue_connector):
+    queue_connector = get_queue_connector()
+    config = queue_connector._config  # pylint: disable=W0212
+    chauffeur_service = ChauffeurService(
+        queue_connector=queue_connector,
+        itinerary=Itinerary(queue_name="test_queue", config=config, callback=callback),
+    )
+    with patch.object(
+        ChauffeurService, "_clock_handler", return_value=None
+    ) as patched_clock_handler:
+        fetch = asyncio.create_task(chauffeur_service._fetch())  # pylint: disable=W0212
+        await asyncio.sleep(0.2)
+        assert fetch.done() is False
+        await queue_connector.send_messages(b"0")
+        records = await asyncio.wait_for(fetch, timeout=0.5)
+
+    assert records == [Record(value=b"0")]
+    patched_clock_handler.assert_not_called()
@@ -0,0 +1,2 @@
+from .config import SharedMemoryQueueConfig, SharedMemoryConnectorConfig
+from .infrastructure import SharedMemoryQueueConnector, SharedMemoryRing
@@ -0,0 +1,2 @@
+from .connector import SharedMemoryConnectorConfig
+from .queue import SharedMemoryQueueConfig
@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+from romeways import GenericConnectorConfig
+
+
+@dataclass(slots=True, frozen=True)
+class SharedMemoryConnectorConfig(GenericConnectorConfig):
+    pass
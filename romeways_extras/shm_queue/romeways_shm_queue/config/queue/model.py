@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+from romeways import GenericQueueConfig
+
+from romeways_shm_queue.infrastructure.ring import SharedMemoryRing
+
+
+@dataclass(slots=True, frozen=True)
+class SharedMemoryQueueConfig(GenericQueueConfig):
+    """
+    ring: SharedMemoryRing The shared memory ring buffer created by the producer process
+    """
+
+    ring: SharedMemoryRing
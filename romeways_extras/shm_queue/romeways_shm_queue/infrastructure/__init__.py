@@ -0,0 +1,2 @@
+from .ring import SharedMemoryRing
+from .connector import SharedMemoryQueueConnector
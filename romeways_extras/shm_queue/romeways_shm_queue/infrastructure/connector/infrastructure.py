@@ -0,0 +1,26 @@
+from typing import List
+
+from romeways import AQueueConnector
+
+from romeways_shm_queue.infrastructure.ring import SharedMemoryRing
+
+
+class SharedMemoryQueueConnector(AQueueConnector):
+    async def on_start(self):
+        pass
+
+    async def get_messages(self, max_chunk_size: int) -> List[memoryview]:
+        ring: SharedMemoryRing = self._config.ring
+        return ring.read_batch(max_records=abs(max_chunk_size))
+
+    async def send_messages(self, message: bytes):
+        await self.send_messages_batch([message])
+
+    async def send_messages_batch(self, messages: List[bytes]):
+        ring: SharedMemoryRing = self._config.ring
+        written = ring.write_batch(messages)
+        if written < len(messages):
+            raise BufferError(
+                f"The shared memory ring {ring.name} is full, "
+                f"{len(messages) - written} messages were not sent"
+            )
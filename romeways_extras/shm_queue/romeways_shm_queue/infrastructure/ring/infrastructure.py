@@ -0,0 +1,136 @@
+import struct
+from multiprocessing import Lock
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List
+
+# head and tail counters, they only grow and the ring position is the counter modulo capacity
+_HEADER = struct.Struct("<QQ")
+_LENGTH = struct.Struct("<I")
+# A length that marks the rest of the ring end as unused, the next record is on the start
+_PADDING = 0xFFFFFFFF
+
+
+class SharedMemoryRing:
+    """
+    Ring buffer of length prefixed byte records on a multiprocessing.shared_memory block.
+    Records never wrap, when one does not fit before the ring end the remaining space is
+    padded and the record is written on the start. The instance can be passed to spawned
+    processes, they attach to the same block.
+    """
+
+    def __init__(self, capacity: int = 1024 * 1024):
+        if capacity <= _LENGTH.size:
+            raise ValueError(f"The capacity must be greater than {_LENGTH.size} bytes")
+        self._capacity = capacity
+        self._lock = Lock()
+        self._shm = SharedMemory(create=True, size=_HEADER.size + capacity)
+        self._owner = True
+        _HEADER.pack_into(self._shm.buf, 0, 0, 0)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __getstate__(self):
+        return self._shm.name, self._capacity, self._lock
+
+    def __setstate__(self, state):
+        name, self._capacity, self._lock = state
+        self._shm = SharedMemory(name=name)
+        self._owner = False
+        # Only the creator process must unlink the block
+        resource_tracker.unregister(
+            self._shm._name, "shared_memory"
+        )  # pylint: disable=W0212
+
+    def write(self, message: bytes | memoryview) -> bool:
+        """
+        Append the message, returns False when the ring has no space for it
+        """
+        return self.write_batch([message]) == 1
+
+    def write_batch(self, messages: List[bytes | memoryview]) -> int:
+        """
+        Append the messages in order until one does not fit, returns how many were written
+        """
+        buf = self._shm.buf
+        capacity = self._capacity
+        written = 0
+        with self._lock:
+            head, tail = _HEADER.unpack_from(buf, 0)
+            for message in messages:
+                size = _LENGTH.size + len(message)
+                if size > capacity:
+                    raise ValueError(
+                        f"The message with {len(message)} bytes does not fit the ring"
+                    )
+                position = tail % capacity
+                padding = capacity - position if capacity - position < size else 0
+                if capacity - (tail - head) < padding + size:
+                    break
+                if padding:
+                    if padding >= _LENGTH.size:
+                        _LENGTH.pack_into(buf, _HEADER.size + position, _PADDING)
+                    tail += padding
+                    position = 0
+                offset = _HEADER.size + position
+                _LENGTH.pack_into(buf, offset, len(message))
+                buf[offset + _LENGTH.size : offset + size] = message
+                tail += size
+                written += 1
+            _HEADER.pack_into(buf, 0, head, tail)
+        return written
+
+    def read_batch(self, max_records: int) -> List[memoryview]:
+        """
+        Take up to max_records records. The records are copied out of the ring with one
+        copy per contiguous span and returned as read only memoryviews of the copy
+        """
+        buf = self._shm.buf
+        capacity = self._capacity
+        with self._lock:
+            head, tail = _HEADER.unpack_from(buf, 0)
+            spans = []
+            cursor = head
+            while cursor < tail and len(spans) < max_records:
+                position = cursor % capacity
+                if capacity - position < _LENGTH.size:
+                    cursor += capacity - position
+                    continue
+                (length,) = _LENGTH.unpack_from(buf, _HEADER.size + position)
+                if length == _PADDING:
+                    cursor += capacity - position
+                    continue
+                start = cursor - head + _LENGTH.size
+                spans.append((start, start + length))
+                cursor += _LENGTH.size + length
+            if not spans:
+                if cursor != head:
+                    _HEADER.pack_into(buf, 0, cursor, tail)
+                return []
+            data = bytearray(cursor - head)
+            first = head % capacity
+            first_size = min(cursor - head, capacity - first)
+            data[:first_size] = buf[
+                _HEADER.size + first : _HEADER.size + first + first_size
+            ]
+            if first_size < len(data):
+                data[first_size:] = buf[
+                    _HEADER.size : _HEADER.size + len(data) - first_size
+                ]
+            _HEADER.pack_into(buf, 0, cursor, tail)
+        view = memoryview(data).toreadonly()
+        return [view[start:end] for start, end in spans]
+
+    def close(self):
+        """
+        Detach from the block, the creator also removes it
+        """
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
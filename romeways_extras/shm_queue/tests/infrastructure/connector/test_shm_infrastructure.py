@@ -0,0 +1,50 @@
+import pytest
+
+from romeways import (
+    SharedMemoryConnectorConfig,
+    SharedMemoryQueueConfig,
+    SharedMemoryQueueConnector,
+    SharedMemoryRing,
+)
+
+
+@pytest.fixture(name="connector")
+def fixture_connector():
+    ring = SharedMemoryRing(capacity=64)
+    connector_name = "test_connector"
+    connector_config = SharedMemoryConnectorConfig(connector_name=connector_name)
+    config = SharedMemoryQueueConfig(
+        connector_name=connector_name,
+        ring=ring,
+        frequency=1,
+        sequential=False,
+        max_chunk_size=10,
+    )
+    yield SharedMemoryQueueConnector(connector_config=connector_config, config=config)
+    ring.close()
+
+
+@pytest.mark.asyncio
+async def test_get_messages_empty_queue(connector):
+    items = await connector.get_messages(1)
+    assert items == []
+
+
+@pytest.mark.asyncio
+async def test_get_messages(connector):
+    for i in range(5):
+        await connector.send_messages(str(i).encode())
+    items_a = await connector.get_messages(2)
+    items_b = await connector.get_messages(2)
+    items_c = await connector.get_messages(-2)
+    assert [bytes(item) for item in items_a] == [b"0", b"1"]
+    assert [bytes(item) for item in items_b] == [b"2", b"3"]
+    assert [bytes(item) for item in items_c] == [b"4"]
+
+
+@pytest.mark.asyncio
+async def test_send_messages_batch_full(connector):
+    with pytest.raises(BufferError):
+        await connector.send_messages_batch([b"x" * 30, b"y" * 30])
+    items = await connector.get_messages(2)
+    assert [bytes(item) for item in items] == [b"x" * 30]
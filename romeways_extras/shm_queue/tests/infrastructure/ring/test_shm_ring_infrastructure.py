@@ -0,0 +1,75 @@
+from multiprocessing import Process
+
+import pytest
+
+from romeways import SharedMemoryRing
+
+
+@pytest.fixture(name="ring")
+def fixture_ring():
+    ring = SharedMemoryRing(capacity=64)
+    yield ring
+    ring.close()
+
+
+def write_messages(ring: SharedMemoryRing, count: int):
+    for i in range(count):
+        ring.write(str(i).encode())
+
+
+def test_capacity_too_small():
+    with pytest.raises(ValueError):
+        SharedMemoryRing(capacity=4)
+
+
+def test_read_batch(ring):
+    assert ring.write_batch([b"a", b"bb", b"ccc"]) == 3
+    records = ring.read_batch(max_records=2)
+    assert [bytes(record) for record in records] == [b"a", b"bb"]
+    assert all(isinstance(record, memoryview) for record in records)
+    assert records[0].readonly is True
+    assert [bytes(record) for record in ring.read_batch(max_records=2)] == [b"ccc"]
+    assert ring.read_batch(max_records=2) == []
+
+
+def test_read_batch_zero_records(ring):
+    ring.write(b"a")
+    assert ring.read_batch(max_records=0) == []
+    assert [bytes(record) for record in ring.read_batch(max_records=1)] == [b"a"]
+
+
+def test_write_full(ring):
+    assert ring.write(b"x" * 60) is True
+    assert ring.write(b"y") is False
+    assert ring.write_batch([b"y", b"z"]) == 0
+    ring.read_batch(max_records=1)
+    assert ring.write(b"y") is True
+
+
+def test_write_message_bigger_than_ring(ring):
+    with pytest.raises(ValueError):
+        ring.write(b"x" * 61)
+
+
+def test_wrap_around(ring):
+    for round_ in range(20):
+        messages = [f"{round_}-{i}".encode() * 3 for i in range(2)]
+        assert ring.write_batch(messages) == 2
+        records = ring.read_batch(max_records=5)
+        assert [bytes(record) for record in records] == messages
+
+
+def test_wrap_around_without_padding_marker(ring):
+    # 4 + 58 leaves 2 bytes before the ring end, too small for a padding marker
+    ring.write(b"x" * 58)
+    ring.read_batch(max_records=1)
+    assert ring.write(b"abc") is True
+    assert [bytes(record) for record in ring.read_batch(max_records=1)] == [b"abc"]
+
+
+def test_cross_process(ring):
+    process = Process(target=write_messages, args=(ring, 5))
+    process.start()
+    process.join()
+    records = ring.read_batch(max_records=10)
+    assert [bytes(record) for record in records] == [str(i).encode() for i in range(5)]
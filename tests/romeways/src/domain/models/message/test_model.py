@@ -1,4 +1,11 @@
-from romeways import Message
+import pickle
+from unittest.mock import patch
+
+import pytest
+
+from romeways import ACodec, Message, LazyMessage
+from romeways.src.domain.models.message.model import _UNSET
+from romeways.src.infrastructure.codec import JsonCodec, OrjsonCodec
 
 
 def test_from_message_raw_message_str():
@@ -13,6 +20,16 @@ def test_from_message_raw_message_int():
     assert message.payload == "10"
 
 
+def test_from_message_memoryview():
+    message = Message.from_message(message=memoryview(b"a message"))
+    assert message.payload == "a message"
+    message = Message.from_message(
+        message=memoryview(b'{"payload": "10", "rw_resend_times": 2}')
+    )
+    assert message.payload == "10"
+    assert message.rw_resend_times == 2
+
+
 def test_from_message_raw_message_json():
     message = Message.from_message(message=b'{"attr": 10}')
     assert message.rw_resend_times == 0
@@ -40,3 +57,143 @@ def test_rebuild_message_from_message_to_json():
     json_message = message_a.to_json()
     message_b = Message.from_message(message=json_message)
     assert message_b == message_a
+
+
+def test_from_message_raw_message_json_list():
+    message = Message.from_message(message=b"[1, 2]")
+    assert message.rw_resend_times == 0
+    assert message.payload == "[1, 2]"
+
+
+def test_from_message_orjson_codec():
+    pytest.importorskip("orjson")
+    codec = OrjsonCodec()
+    message = Message.from_message(
+        message=b'{"payload": {"attr": 10}, "rw_resend_times":1}', codec=codec
+    )
+    assert message.rw_resend_times == 1
+    assert message.payload == '{"attr":10}'
+    assert message.to_json(codec=codec) == (
+        b'{"payload":"{\\"attr\\":10}","rw_resend_times":1}'
+    )
+    assert Message.from_message(message=message.to_json(codec=codec)) == message
+
+
+class BinaryCodec(ACodec):
+    text = False
+
+    def decode(self, data: bytes):
+        if data[:1] != b"\x00":
+            raise ValueError("not binary")
+        return pickle.loads(data[1:])
+
+    def encode(self, content) -> bytes:
+        return b"\x00" + pickle.dumps(content)
+
+
+def test_from_message_binary_codec():
+    codec = BinaryCodec()
+    data = codec.encode({"payload": {"attr": 10}, "rw_resend_times": 1})
+    message = Message.from_message(message=data, codec=codec)
+    assert message.rw_resend_times == 1
+    assert message.payload == '{"attr": 10}'
+
+    lazy_message = LazyMessage.from_message(message=data, codec=codec)
+    assert lazy_message.rw_resend_times == 1
+    assert lazy_message.payload == '{"attr": 10}'
+    assert lazy_message.json == {"attr": 10}
+    resent = LazyMessage.from_message(message=message.to_json(codec=codec), codec=codec)
+    assert resent.json == {"attr": 10}
+
+
+def test_lazy_message_raise_resend_counter_binary_codec():
+    codec = BinaryCodec()
+    raw = b"\xff\xfe"
+    message = LazyMessage.from_message(message=raw, codec=codec)
+    resent = message.raise_resend_counter()
+    assert message._payload is _UNSET
+    assert resent.rw_resend_times == 1
+    assert resent.body == raw
+
+    received = LazyMessage.from_message(
+        message=resent.to_json(codec=codec), codec=codec
+    )
+    assert received.rw_resend_times == 1
+    assert received.body == raw
+    with pytest.raises(ValueError):
+        Message.from_message(message=resent.to_json(codec=codec), codec=codec)
+
+
+def test_lazy_message_raise_resend_counter_not_utf8():
+    message = LazyMessage.from_message(message=b"\xff\xfe")
+    with pytest.raises(ValueError):
+        message.raise_resend_counter()
+
+
+def test_lazy_message_raw_message_str():
+    raw = b"a message"
+    message = LazyMessage.from_message(message=raw)
+    assert message.body is raw
+    assert message._payload is _UNSET
+    assert message.rw_resend_times == 0
+    assert message.payload == "a message"
+    assert message.payload is message.payload
+
+
+def test_lazy_message_memoryview():
+    raw = memoryview(b'xx{"attr": 10}')[2:]
+    message = LazyMessage.from_message(message=raw)
+    assert message.body is raw
+    assert message.rw_resend_times == 0
+    assert message.payload == '{"attr": 10}'
+    assert message.json == {"attr": 10}
+
+
+def test_lazy_message_json_decoded_once():
+    message = LazyMessage.from_message(message=b'{"attr": 10}')
+    with patch.object(
+        JsonCodec, "decode", side_effect=JsonCodec.decode, autospec=True
+    ) as patched_decode:
+        assert message.rw_resend_times == 0
+        assert message.json == {"attr": 10}
+        assert message.json == {"attr": 10}
+    patched_decode.assert_called_once()
+
+
+def test_lazy_message_invalid_json():
+    message = LazyMessage.from_message(message=b"{not json")
+    assert message.rw_resend_times == 0
+    assert message.payload == "{not json"
+    with pytest.raises(ValueError):
+        assert message.json
+
+
+def test_lazy_message_from_resend():
+    message = LazyMessage.from_message(
+        message=b'{"payload": {"attr": 10}, "rw_resend_times":1}'
+    )
+    assert message.rw_resend_times == 1
+    assert message.payload == '{"attr": 10}'
+    assert message.json == {"attr": 10}
+    assert message.body == b'{"attr": 10}'
+
+
+def test_lazy_message_to_json():
+    message_a = LazyMessage.from_message(message=b'{"attr": 10}')
+    json_message = message_a.raise_resend_counter().to_json()
+    assert json_message == b'{"payload": "{\\"attr\\": 10}", "rw_resend_times": 1}'
+    message_b = LazyMessage.from_message(message=json_message)
+    assert message_b.rw_resend_times == 1
+    assert message_b.json == {"attr": 10}
+    assert message_b.to_json() == json_message
+
+
+def test_lazy_message_pickle():
+    message = LazyMessage.from_message(
+        message=memoryview(b'xx{"payload": "10", "rw_resend_times": 1}')[2:]
+    )
+    assert message.payload == "10"
+    copy = pickle.loads(pickle.dumps(message))
+    assert copy.raw == b'{"payload": "10", "rw_resend_times": 1}'
+    assert copy.payload == "10"
+    assert copy.rw_resend_times == 1
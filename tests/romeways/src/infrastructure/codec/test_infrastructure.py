@@ -0,0 +1,53 @@
+import pytest
+
+from romeways.src.infrastructure.codec import (
+    JsonCodec,
+    OrjsonCodec,
+    MsgpackCodec,
+    get_codec,
+    register_codec,
+)
+
+
+def test_json_codec():
+    codec = JsonCodec()
+    data = codec.encode({"payload": "10", "rw_resend_times": 1})
+    assert data == b'{"payload": "10", "rw_resend_times": 1}'
+    assert codec.decode(data) == {"payload": "10", "rw_resend_times": 1}
+    assert codec.may_be_envelope(data) is True
+    assert codec.may_be_envelope(b"10") is False
+    assert codec.may_be_envelope(b"") is False
+
+
+def test_orjson_codec():
+    pytest.importorskip("orjson")
+    codec = OrjsonCodec()
+    data = codec.encode({"payload": "10", "rw_resend_times": 1})
+    assert data == b'{"payload":"10","rw_resend_times":1}'
+    assert codec.decode(data) == {"payload": "10", "rw_resend_times": 1}
+    with pytest.raises(ValueError):
+        codec.decode(b"{not json")
+
+
+def test_msgpack_codec():
+    pytest.importorskip("msgpack")
+    codec = MsgpackCodec()
+    data = codec.encode({"payload": "10", "rw_resend_times": 1})
+    assert codec.decode(data) == {"payload": "10", "rw_resend_times": 1}
+    assert codec.may_be_envelope(data) is True
+    assert codec.may_be_envelope(b"10") is False
+
+
+def test_get_codec():
+    assert isinstance(get_codec("json"), JsonCodec)
+    with pytest.raises(ValueError) as exception:
+        get_codec("not_registered")
+    assert exception.value.args[0] == "The codec not_registered is not registered"
+
+
+def test_register_codec():
+    class StubCodec(JsonCodec):
+        pass
+
+    register_codec(name="stub", codec=StubCodec)
+    assert isinstance(get_codec("stub"), StubCodec)
@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import pytest
+
+from romeways import AMetricsSink
+from romeways.src.infrastructure.metrics_sink import (
+    LogMetricsSink,
+    get_metrics_sink,
+    register_metrics_sink,
+)
+
+
+def test_log_metrics_sink_latency_quantile():
+    sink = LogMetricsSink(connector_name="tests", queue_name="test_queue_name")
+    assert sink.latency_quantile(0.5) is None
+    for latency in [0.0005] * 98 + [0.3, 20.0]:
+        sink.on_handler(latency=latency, size=1, outcome="success")
+
+    assert sink.latency_quantile(0.5) == 0.001
+    assert sink.latency_quantile(0.99) == 0.5
+    assert sink.latency_quantile(1.0) == float("inf")
+
+
+def test_log_metrics_sink_close():
+    sink = LogMetricsSink(connector_name="tests", queue_name="test_queue_name")
+    sink.on_fetch(latency=0.2, chunk_size=4)
+    sink.on_in_flight(in_flight=3)
+    sink.on_handler(latency=0.02, size=3, outcome="success")
+    sink.on_handler(latency=0.02, size=1, outcome="resend")
+    with patch("logging.info", return_value=None) as patched_logging_info:
+        sink.close()
+
+    args = patched_logging_info.call_args.args
+    assert args[1:3] == ("tests", "test_queue_name")
+    assert args[5:8] == (1, 0.2, 4.0)
+    assert args[9:16] == (3, 0, 1, 0, 3, 0.05, 0.05)
+    assert sink.latency_quantile(0.5) is None
+
+
+def test_log_metrics_sink_log_interval():
+    with patch(
+        "romeways.src.infrastructure.metrics_sink.infrastructure.monotonic",
+        side_effect=[0.0, 30.0, 61.0],
+    ), patch("logging.info", return_value=None) as patched_logging_info:
+        sink = LogMetricsSink(connector_name="tests", queue_name="test_queue_name")
+        sink.on_fetch(latency=0.1, chunk_size=1)
+        patched_logging_info.assert_not_called()
+        sink.on_fetch(latency=0.1, chunk_size=1)
+
+    patched_logging_info.assert_called_once()
+
+
+def test_register_metrics_sink():
+    class StubMetricsSink(AMetricsSink):
+        pass
+
+    register_metrics_sink(name="stub", sink=StubMetricsSink)
+    assert get_metrics_sink("stub") is StubMetricsSink
+    assert get_metrics_sink("log") is LogMetricsSink
+    with pytest.raises(ValueError):
+        get_metrics_sink("not_registered")
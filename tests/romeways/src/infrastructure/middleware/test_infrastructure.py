@@ -0,0 +1,123 @@
+import asyncio
+import os
+import pstats
+from unittest.mock import patch
+
+import pytest
+
+from romeways import HandlerContext, Message
+from romeways.src.infrastructure.middleware import (
+    ProfilerMiddleware,
+    get_middleware,
+    get_middlewares,
+    register_middleware,
+)
+
+MODULE = "romeways.src.infrastructure.middleware.infrastructure"
+
+
+async def handler(message):
+    sum(range(1000))
+
+
+def get_context() -> HandlerContext:
+    return HandlerContext(
+        connector_name="tests",
+        queue_name="test_queue_name",
+        callback=handler,
+        argument=Message(payload="10", rw_resend_times=0),
+        records=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_profiler_middleware_dump_dir(tmp_path):
+    middleware = ProfilerMiddleware(sample_rate=1.0, dump_every=2, dump_dir=tmp_path)
+    context = get_context()
+    for _ in range(3):
+        await middleware(context, lambda: handler(context.argument))
+
+    path = tmp_path / f"tests.test_queue_name.handler.{os.getpid()}.prof"
+    assert pstats.Stats(str(path)).total_calls > 0
+    os.remove(path)
+    middleware.close()
+    assert path.exists()
+    os.remove(path)
+    middleware.close()
+    assert not path.exists()
+
+
+@pytest.mark.asyncio
+async def test_profiler_middleware_log():
+    middleware = ProfilerMiddleware(sample_rate=1.0, dump_every=1)
+    context = get_context()
+    with patch("logging.info", return_value=None) as patched_logging_info:
+        await middleware(context, lambda: handler(context.argument))
+
+    args = patched_logging_info.call_args.args
+    assert args[1:4] == ("tests.test_queue_name.handler", os.getpid(), 1)
+    assert "cumulative" in args[4]
+
+
+@pytest.mark.asyncio
+async def test_profiler_middleware_sampling():
+    middleware = ProfilerMiddleware(sample_rate=0.5)
+    context = get_context()
+    calls = []
+
+    async def call_next():
+        calls.append(context)
+
+    with patch(f"{MODULE}.random.random", return_value=0.7), patch(
+        f"{MODULE}.cProfile.Profile"
+    ) as patched_profile:
+        await middleware(context, call_next)
+    patched_profile.assert_not_called()
+
+    middleware._profiling = True
+    with patch(f"{MODULE}.random.random", return_value=0.1), patch(
+        f"{MODULE}.cProfile.Profile"
+    ) as patched_profile:
+        await middleware(context, call_next)
+    patched_profile.assert_not_called()
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_profiler_middleware_handler_exception():
+    middleware = ProfilerMiddleware(sample_rate=1.0)
+
+    async def call_next():
+        await asyncio.sleep(0)
+        raise ValueError("error")
+
+    with pytest.raises(ValueError):
+        await middleware(get_context(), call_next)
+    assert middleware._profiling is False
+    assert middleware._samples == {"tests.test_queue_name.handler": 1}
+
+
+def test_profiler_middleware_wrong_sample_rate():
+    with pytest.raises(ValueError) as exception:
+        ProfilerMiddleware(sample_rate=0)
+
+    assert exception.value.args[0] == "The sample_rate attribute is not between 0 and 1"
+
+
+def test_get_middlewares():
+    profiler = ProfilerMiddleware()
+    tracer = ProfilerMiddleware()
+    with patch.dict(f"{MODULE}._middlewares", clear=True), patch(
+        f"{MODULE}._default_middlewares", []
+    ):
+        register_middleware(name="tracer", middleware=tracer)
+        register_middleware(name="profiler", middleware=profiler, default=True)
+        register_middleware(name="profiler", middleware=profiler, default=True)
+
+        assert get_middleware("tracer") is tracer
+        assert get_middlewares([]) == [profiler]
+        assert get_middlewares(["tracer", "profiler"]) == [profiler, tracer]
+        with pytest.raises(ValueError) as exception:
+            get_middlewares(["not_registered"])
+
+    assert exception.value.args[0] == "The middleware not_registered is not registered"
@@ -0,0 +1,49 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from romeways.src.infrastructure.resource_pool import ResourcePool
+
+
+@pytest.mark.asyncio
+async def test_acquire_and_release():
+    resource_pool = ResourcePool()
+    factory = AsyncMock(side_effect=lambda: object())
+    closer = AsyncMock()
+
+    resource_a = await resource_pool.acquire(key="a", factory=factory, closer=closer)
+    resource_b = await resource_pool.acquire(key="a", factory=factory, closer=closer)
+    assert resource_a is resource_b
+    factory.assert_awaited_once()
+
+    await resource_pool.release(key="a")
+    closer.assert_not_awaited()
+    await resource_pool.release(key="a")
+    closer.assert_awaited_once_with(resource_a)
+
+    resource_c = await resource_pool.acquire(key="a", factory=factory, closer=closer)
+    assert resource_c is not resource_a
+
+
+@pytest.mark.asyncio
+async def test_acquire_concurrent():
+    resource_pool = ResourcePool()
+
+    async def factory():
+        await asyncio.sleep(0.1)
+        return object()
+
+    resources = await asyncio.gather(
+        *[
+            resource_pool.acquire(key="a", factory=factory, closer=AsyncMock())
+            for _ in range(3)
+        ]
+    )
+    assert len({id(resource) for resource in resources}) == 1
+
+
+@pytest.mark.asyncio
+async def test_release_unknown_key():
+    resource_pool = ResourcePool()
+    await resource_pool.release(key="unknown")
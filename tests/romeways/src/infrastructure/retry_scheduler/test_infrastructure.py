@@ -0,0 +1,61 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from romeways import Record
+from romeways.src.infrastructure.retry_scheduler import RetryScheduler
+
+
+@pytest.mark.asyncio
+async def test_schedule_in_due_order():
+    on_due = MagicMock()
+    retry_scheduler = RetryScheduler(on_due=on_due)
+    record_a = Record(value=b"a")
+    record_b = Record(value=b"b")
+
+    retry_scheduler.schedule(delayed=[(0.2, b"a")], records=[record_a])
+    retry_scheduler.schedule(delayed=[(0.1, b"b")], records=[record_b])
+    assert len(retry_scheduler) == 2
+
+    await asyncio.sleep(0.15)
+    on_due.assert_called_once_with([b"b"], [record_b])
+    await asyncio.sleep(0.1)
+    on_due.assert_called_with([b"a"], [record_a])
+    assert len(retry_scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_schedule_coalesce():
+    on_due = MagicMock()
+    retry_scheduler = RetryScheduler(on_due=on_due)
+
+    retry_scheduler.schedule(delayed=[(0.05, b"a"), (0.051, b"b")], records=[])
+    await asyncio.sleep(0.1)
+    on_due.assert_called_once_with([b"a", b"b"], [])
+
+
+@pytest.mark.asyncio
+async def test_group_records_released_with_last_retry():
+    on_due = MagicMock()
+    retry_scheduler = RetryScheduler(on_due=on_due)
+    record = Record(value=b"batch")
+
+    retry_scheduler.schedule(delayed=[(0.05, b"a"), (0.2, b"b")], records=[record])
+    await asyncio.sleep(0.1)
+    on_due.assert_called_once_with([b"a"], [])
+    await asyncio.sleep(0.15)
+    on_due.assert_called_with([b"b"], [record])
+
+
+@pytest.mark.asyncio
+async def test_drain():
+    on_due = MagicMock()
+    retry_scheduler = RetryScheduler(on_due=on_due)
+    record = Record(value=b"a")
+
+    retry_scheduler.schedule(delayed=[(10, b"a")], records=[record])
+    assert retry_scheduler.drain() == ([b"a"], [record])
+    await asyncio.sleep(0)
+    on_due.assert_not_called()
+    assert len(retry_scheduler) == 0
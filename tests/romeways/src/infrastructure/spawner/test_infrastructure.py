@@ -1,11 +1,15 @@
 import asyncio
 from asyncio import CancelledError
+from unittest.mock import patch
 
 import pytest
 
-from romeways import AQueueConnector, GenericConnectorConfig
+from romeways import AQueueConnector, GenericConnectorConfig, GenericQueueConfig
+from romeways.src.domain.models.config.itinerary import Itinerary
 from romeways.src.domain.models.config.map import RegionMap
 from romeways.src.infrastructure.spawner import Spawner
+from romeways.src.infrastructure.spawner import infrastructure
+from romeways.src.service.chauffeur import ChauffeurService
 from tests.mocs.stubs.queue_connector import StubQueueConnector
 
 
@@ -20,14 +24,37 @@ async def test_start_async_worker():
         itineraries=[],
     )
 
-    async def callback_to_spawn(region_map, itineraries):
+    async def callback_to_spawn(region_map, itineraries, stop_event):
+        await stop_event.wait()
+        return "stopped"
+
+    task = asyncio.create_task(spawner.start(callback_to_spawn=callback_to_spawn))
+    await asyncio.sleep(0)
+    assert len(spawner._tasks) == 1
+    await spawner.close()
+    assert spawner._tasks[0].result() == "stopped"
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_close_async_worker_after_timeout(monkeypatch):
+    monkeypatch.setattr(infrastructure, "KILL_GRACE_TIME", 0.0)
+    spawner = Spawner(
+        region_map=RegionMap(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(connector_name="tests", shutdown_timeout=0.1),
+            spawn_process=False,
+        ),
+        itineraries=[],
+    )
+
+    async def callback_to_spawn(region_map, itineraries, stop_event):
         while True:
             await asyncio.sleep(1)
 
     task = asyncio.create_task(spawner.start(callback_to_spawn=callback_to_spawn))
     await asyncio.sleep(0)
-    assert len(spawner._tasks) == 1
-    spawner.close()
+    await spawner.close()
     await asyncio.sleep(0)
     with pytest.raises(CancelledError):
         assert spawner._tasks[0].result()
@@ -45,14 +72,217 @@ async def test_start_process_worker():
         itineraries=[],
     )
 
-    async def callback_to_spawn(region_map, itineraries):
+    async def callback_to_spawn(region_map, itineraries, stop_event):
+        await stop_event.wait()
+
+    task = asyncio.create_task(spawner.start(callback_to_spawn=callback_to_spawn))
+    await asyncio.sleep(0.5)
+    assert len(spawner._processes) == 1
+    assert spawner._processes[0].is_alive() is True
+    await spawner.close()
+    assert spawner._processes[0].is_alive() is False
+    assert spawner._processes[0].exitcode == 0
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_close_process_worker_after_timeout(monkeypatch):
+    monkeypatch.setattr(infrastructure, "KILL_GRACE_TIME", 0.0)
+    spawner = Spawner(
+        region_map=RegionMap(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(connector_name="tests", shutdown_timeout=0.3),
+            spawn_process=True,
+        ),
+        itineraries=[],
+    )
+
+    async def callback_to_spawn(region_map, itineraries, stop_event):
         while True:
             await asyncio.sleep(1)
 
     task = asyncio.create_task(spawner.start(callback_to_spawn=callback_to_spawn))
-    await asyncio.sleep(0)
-    assert len(spawner._processes) == 1
-    spawner.close()
+    await asyncio.sleep(0.5)
+    await spawner.close()
     await asyncio.sleep(0.1)
     assert spawner._processes[0].is_alive() is False
+    assert spawner._processes[0].exitcode == -9
+    task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_start_process_worker_pool():
+    spawner = Spawner(
+        region_map=RegionMap(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(connector_name="tests"),
+            spawn_process=3,
+        ),
+        itineraries=[],
+    )
+
+    async def callback_to_spawn(region_map, itineraries, stop_event):
+        await stop_event.wait()
+
+    task = asyncio.create_task(spawner.start(callback_to_spawn=callback_to_spawn))
+    await asyncio.sleep(0)
+    assert len(spawner._processes) == 3
+    assert len({process.pid for process in spawner._processes}) == 3
+    await spawner.close()
+    assert all(process.is_alive() is False for process in spawner._processes)
     task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_supervise_restarts_crashed_process(monkeypatch):
+    monkeypatch.setattr(infrastructure, "SUPERVISOR_INTERVAL", 0.05)
+    spawner = Spawner(
+        region_map=RegionMap(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(
+                connector_name="tests", restart_backoff=0.05, max_restarts=2
+            ),
+            spawn_process=True,
+        ),
+        itineraries=[],
+    )
+
+    async def callback_to_spawn(region_map, itineraries, stop_event):
+        raise RuntimeError("crash")
+
+    with patch("logging.warning") as patched_logging_warning, patch(
+        "logging.error"
+    ) as patched_logging_error:
+        await spawner.start(callback_to_spawn=callback_to_spawn)
+        first_process = spawner._processes[0]
+        await asyncio.sleep(1.5)
+        await spawner.close()
+
+    assert spawner._processes[0] is not first_process
+    assert spawner.restart_counts == [2]
+    assert patched_logging_warning.call_count == 2
+    patched_logging_error.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_supervise_restarts_crashed_task(monkeypatch):
+    monkeypatch.setattr(infrastructure, "SUPERVISOR_INTERVAL", 0.05)
+    spawner = Spawner(
+        region_map=RegionMap(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(
+                connector_name="tests", restart_backoff=0.05, max_restart_backoff=0.2
+            ),
+            spawn_process=False,
+        ),
+        itineraries=[],
+    )
+    calls = []
+
+    async def callback_to_spawn(region_map, itineraries, stop_event):
+        calls.append(stop_event)
+        if len(calls) == 1:
+            raise RuntimeError("crash")
+        await stop_event.wait()
+
+    with patch("logging.warning") as patched_logging_warning:
+        await spawner.start(callback_to_spawn=callback_to_spawn)
+        await asyncio.sleep(0.3)
+        await spawner.close()
+
+    assert spawner.restart_counts == [1]
+    assert len(calls) == 2
+    assert calls[1].is_set() is True
+    patched_logging_warning.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_supervise_restarts_crashed_itinerary(monkeypatch):
+    monkeypatch.setattr(infrastructure, "SUPERVISOR_INTERVAL", 0.05)
+
+    async def callback(message):
+        pass
+
+    itineraries = [
+        Itinerary(
+            queue_name=f"test_queue_name_{max_chunk_size}",
+            config=GenericQueueConfig(
+                connector_name="tests",
+                frequency=0.01,
+                max_chunk_size=max_chunk_size,
+                sequential=True,
+            ),
+            callback=callback,
+        )
+        for max_chunk_size in (1, 2)
+    ]
+    spawner = Spawner(
+        region_map=RegionMap(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(
+                connector_name="tests",
+                shutdown_timeout=0.1,
+                restart_backoff=0.05,
+                max_restart_backoff=0.05,
+                max_restarts=10,
+            ),
+            spawn_process=False,
+        ),
+        itineraries=itineraries,
+    )
+    started, stopped, watchers = [], [], []
+
+    async def on_start(self):
+        started.append(self)
+
+    async def on_stop(self):
+        stopped.append(self)
+
+    async def get_messages(self, max_chunk_size):
+        if max_chunk_size == 2:
+            raise RuntimeError("crash")
+        return []
+
+    with patch.object(StubQueueConnector, "on_start", on_start), patch.object(
+        StubQueueConnector, "on_stop", on_stop
+    ), patch.object(StubQueueConnector, "get_messages", get_messages), patch(
+        "logging.warning"
+    ):
+        await spawner.start(callback_to_spawn=ChauffeurService.run)
+        for _ in range(10):
+            await asyncio.sleep(0.05)
+            watchers.append(
+                sum(
+                    1
+                    for task in asyncio.all_tasks()
+                    if task.get_coro().__name__ == "_watch" and not task.done()
+                )
+            )
+        await spawner.close()
+
+    assert spawner.restart_counts[0] >= 2
+    assert max(watchers) <= 2
+    assert len(stopped) == len(started)
+
+
+@pytest.mark.asyncio
+async def test_supervise_ignores_clean_exit(monkeypatch):
+    monkeypatch.setattr(infrastructure, "SUPERVISOR_INTERVAL", 0.05)
+    spawner = Spawner(
+        region_map=RegionMap(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(connector_name="tests"),
+            spawn_process=True,
+        ),
+        itineraries=[],
+    )
+
+    async def callback_to_spawn(region_map, itineraries, stop_event):
+        return None
+
+    await spawner.start(callback_to_spawn=callback_to_spawn)
+    await asyncio.sleep(0.5)
+    await spawner.close()
+
+    assert spawner.restart_counts == [0]
+    assert spawner._processes[0].exitcode == 0
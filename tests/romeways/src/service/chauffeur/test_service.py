@@ -1,101 +1,1008 @@
 from datetime import datetime, timedelta
-from unittest.mock import patch, call
+from unittest.mock import patch, call, PropertyMock
 
 import asyncio
+import threading
 import freezegun
 import pytest
 
-from romeways import GenericConnectorConfig, GenericQueueConfig
-from romeways.src.domain.exceptions import ResendException
+from romeways import (
+    AMetricsSink,
+    AMiddleware,
+    HandlerContext,
+    GenericConnectorConfig,
+    GenericQueueConfig,
+    Message,
+    LazyMessage,
+    Record,
+)
+from romeways.src.domain.exceptions import ResendException, BatchResendException
 from romeways.src.domain.models.config.itinerary import Itinerary
 from romeways.src.domain.models.config.map import RegionMap
+from romeways.src.infrastructure.metrics_sink import register_metrics_sink
+from romeways.src.infrastructure.middleware import register_middleware
 from romeways.src.service.chauffeur import ChauffeurService
+from romeways.src.service.chauffeur import service
 
 from tests.mocs.stubs.queue_connector import StubQueueConnector
 
 
-def get_chauffeur_service(callback, sequential=False) -> ChauffeurService:
+def sync_batch_resend_callback(messages):
+    raise BatchResendException("resend_error", messages=messages[:1])
+
+
+def sync_lazy_message_callback(message):
+    if message.payload != "10" or message.rw_resend_times != 1:
+        raise ValueError(f"Wrong message {message.payload!r}")
+
+
+def get_chauffeur_service(
+    callback,
+    sequential=False,
+    max_chunk_size=1,
+    batch=False,
+    frequency=1,
+    dead_letter_connector=None,
+    **config_kwargs,
+) -> ChauffeurService:
     queue_config = GenericQueueConfig(
         connector_name="test_connector_name",
-        frequency=1,
-        max_chunk_size=1,
+        frequency=frequency,
+        max_chunk_size=max_chunk_size,
         sequential=sequential,
+        **config_kwargs,
+    )
+
+    chauffeur = ChauffeurService(
+        queue_connector=StubQueueConnector(
+            connector_config=GenericConnectorConfig(connector_name="tests"),
+            config=queue_config,
+        ),
+        itinerary=Itinerary(
+            queue_name="test_queue_name",
+            config=queue_config,
+            callback=callback,
+            batch=batch,
+        ),
+        dead_letter_connector=dead_letter_connector,
+    )
+    return chauffeur
+
+
+@pytest.mark.asyncio
+async def test_clock_handler():
+    async def callback(message):
+        pass
+
+    with patch("asyncio.sleep", return_value=None) as patched_asyncio_sleep:
+        with patch("logging.warning", return_value=None) as patched_logging_warning:
+            with freezegun.freeze_time("2012-01-14T00:00:00.000"):
+                chauffeur_service = get_chauffeur_service(callback)
+                await chauffeur_service._clock_handler()
+            with freezegun.freeze_time("2012-01-14T00:00:01.000"):
+                await chauffeur_service._clock_handler()
+            with freezegun.freeze_time("2012-01-14T00:00:01.500"):
+                await chauffeur_service._clock_handler()
+            with freezegun.freeze_time("2012-01-14T00:00:03.000"):
+                await chauffeur_service._clock_handler()
+    patched_asyncio_sleep.assert_has_calls([call(0), call(0), call(0.5), call(0)])
+    patched_logging_warning.assert_called_once()
+
+
+def test_adapt_frequency_disabled():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback, max_chunk_size=2)
+    chauffeur_service._adapt_frequency(chunk_size=2)
+    assert chauffeur_service._frequency == 1
+    chauffeur_service._adapt_frequency(chunk_size=0)
+    assert chauffeur_service._frequency == 1
+
+
+def test_adapt_frequency():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(
+        callback, max_chunk_size=2, adaptive_frequency=True, max_frequency=5
+    )
+    frequencies = []
+    for chunk_size in [2, 0, 0, 0, 0, 0, 1, 2]:
+        chauffeur_service._adapt_frequency(chunk_size=chunk_size)
+        frequencies.append(chauffeur_service._frequency)
+    assert frequencies == [0.0, 1, 2, 4, 5, 5, 1, 0.0]
+
+
+@pytest.mark.asyncio
+async def test_clock_handler_adaptive_frequency_full_chunk():
+    async def callback(message):
+        pass
+
+    with patch("asyncio.sleep", return_value=None) as patched_asyncio_sleep:
+        with patch("logging.warning", return_value=None) as patched_logging_warning:
+            with freezegun.freeze_time("2012-01-14T00:00:00.000"):
+                chauffeur_service = get_chauffeur_service(
+                    callback, adaptive_frequency=True
+                )
+                await chauffeur_service._clock_handler()
+                chauffeur_service._adapt_frequency(chunk_size=1)
+            with freezegun.freeze_time("2012-01-14T00:00:00.500"):
+                await chauffeur_service._clock_handler()
+                chauffeur_service._adapt_frequency(chunk_size=0)
+            with freezegun.freeze_time("2012-01-14T00:00:01.000"):
+                await chauffeur_service._clock_handler()
+    patched_asyncio_sleep.assert_has_calls([call(0), call(0), call(0.5)])
+    patched_logging_warning.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_exception():
+    async def callback(message):
+        raise Exception("resend_error")
+
+    chauffeur_service = get_chauffeur_service(callback)
+
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        await chauffeur_service._resolve_message(message=b"10")
+
+    patched_logging_error.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_resend_exception():
+    async def callback(message):
+        raise ResendException("resend_error")
+
+    chauffeur_service = get_chauffeur_service(callback)
+
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        with patch.object(
+            ChauffeurService, "_resend_message", return_value=None
+        ) as patched_resend_message:
+            await chauffeur_service._resolve_message(message=b"10")
+
+    patched_logging_error.assert_called_once()
+    patched_resend_message.assert_called_with(
+        message=Message(payload="10", rw_resend_times=0),
+        reason="ResendException('resend_error')",
+    )
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_handler_timeout():
+    cancelled = []
+
+    async def callback(message):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(message)
+            raise
+
+    StubMetricsSink.events = []
+    register_metrics_sink(name="stub", sink=StubMetricsSink)
+    chauffeur_service = get_chauffeur_service(
+        callback, handler_timeout=0.05, metrics="stub"
+    )
+
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        with patch.object(
+            ChauffeurService, "_resend_message", return_value=True
+        ) as patched_resend_message:
+            assert await chauffeur_service._resolve_message(message=b"10") is True
+
+    patched_logging_error.assert_called_once()
+    assert cancelled == [Message(payload="10", rw_resend_times=0)]
+    patched_resend_message.assert_called_once_with(
+        message=Message(payload="10", rw_resend_times=0),
+        reason="HandlerTimeoutException('The handler did not finish in 0.05 seconds')",
+    )
+    assert ("handler", 1, "timeout") in StubMetricsSink.events
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_handler_own_timeout_error():
+    async def callback(message):
+        raise TimeoutError("dependency_timeout")
+
+    chauffeur_service = get_chauffeur_service(callback, handler_timeout=1)
+
+    with patch("logging.error", return_value=None), patch.object(
+        ChauffeurService, "_resend_message", return_value=True
+    ) as patched_resend_message:
+        assert await chauffeur_service._resolve_message(message=b"10") is False
+
+    patched_resend_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_batch_handler_timeout():
+    async def callback(messages):
+        await asyncio.sleep(10)
+
+    chauffeur_service = get_chauffeur_service(
+        callback, batch=True, handler_timeout=0.05
+    )
+
+    with patch("logging.error", return_value=None), patch.object(
+        ChauffeurService, "_resend_message", return_value=True
+    ) as patched_resend_message:
+        assert await chauffeur_service._resolve_batch(messages=[b"10", b"20"]) is True
+
+    assert patched_resend_message.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_undecodable():
+    received = []
+
+    async def callback(message):
+        received.append(message)
+
+    chauffeur_service = get_chauffeur_service(callback)
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        assert await chauffeur_service._resolve_message(message=b"\xff\xfe") is False
+        assert (
+            await chauffeur_service._resolve_batch(messages=[b"10", b"\xff"]) is False
+        )
+
+    assert patched_logging_error.call_count == 2
+    assert received == []
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_lazy_message():
+    received = []
+
+    async def callback(message):
+        received.append(message)
+
+    chauffeur_service = get_chauffeur_service(callback, lazy_message=True)
+    await chauffeur_service._resolve_message(message=b"10")
+
+    assert isinstance(received[0], LazyMessage)
+    assert received[0].payload == "10"
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_lazy_message_resend_not_utf8():
+    async def callback(message):
+        raise ResendException("resend_error")
+
+    chauffeur_service = get_chauffeur_service(callback, lazy_message=True)
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        assert await chauffeur_service._resolve_message(message=b"\xff\xfe") is False
+
+    assert patched_logging_error.call_count == 2
+    assert chauffeur_service._resends == []
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_thread_executor():
+    received = []
+
+    def callback(message):
+        received.append((message, threading.current_thread().name))
+
+    chauffeur_service = get_chauffeur_service(
+        callback, executor="thread", executor_workers=1
+    )
+    await chauffeur_service._resolve_message(message=b"10")
+
+    assert received[0][0].payload == "10"
+    assert received[0][1] != threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_resolve_batch_process_executor():
+    chauffeur_service = get_chauffeur_service(
+        sync_batch_resend_callback, batch=True, executor="process", executor_workers=1
+    )
+    with patch("logging.error", return_value=None):
+        with patch.object(
+            ChauffeurService, "_resend_message", return_value=None
+        ) as patched_resend_message:
+            await chauffeur_service._resolve_batch(messages=[b"10", b"20"])
+
+    patched_resend_message.assert_called_once_with(
+        message=Message(payload="10", rw_resend_times=0),
+        reason="BatchResendException('resend_error')",
+    )
+
+
+@pytest.mark.asyncio
+async def test_resolve_message_lazy_message_process_executor():
+    chauffeur_service = get_chauffeur_service(
+        sync_lazy_message_callback,
+        lazy_message=True,
+        executor="process",
+        executor_workers=1,
+    )
+    raw = memoryview(b'xx{"payload": "10", "rw_resend_times": 1}')[2:]
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        assert await chauffeur_service._resolve_message(message=raw) is False
+
+    patched_logging_error.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_batch():
+    received = []
+
+    async def callback(messages):
+        received.append([message.payload for message in messages])
+
+    chauffeur_service = get_chauffeur_service(callback, batch=True)
+    with patch.object(
+        ChauffeurService, "_resend_message", return_value=None
+    ) as patched_resend_message:
+        await chauffeur_service._dispatch(
+            records=[Record(value=b"10"), Record(value=b"20")]
+        )
+        await chauffeur_service._dispatch(records=[])
+
+    assert received == [["10", "20"]]
+    patched_resend_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_batch_resend_exception():
+    async def callback(messages):
+        raise ResendException("resend_error")
+
+    chauffeur_service = get_chauffeur_service(callback, batch=True)
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        with patch.object(
+            ChauffeurService, "_resend_message", return_value=None
+        ) as patched_resend_message:
+            await chauffeur_service._resolve_batch(messages=[b"10", b"20"])
+
+    patched_logging_error.assert_called_once()
+    patched_resend_message.assert_has_calls(
+        [
+            call(
+                message=Message(payload="10", rw_resend_times=0),
+                reason="ResendException('resend_error')",
+            ),
+            call(
+                message=Message(payload="20", rw_resend_times=0),
+                reason="ResendException('resend_error')",
+            ),
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_resolve_batch_batch_resend_exception():
+    async def callback(messages):
+        raise BatchResendException("resend_error", messages=messages[1:2])
+
+    chauffeur_service = get_chauffeur_service(callback, batch=True)
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        with patch.object(
+            ChauffeurService, "_resend_message", return_value=None
+        ) as patched_resend_message:
+            await chauffeur_service._resolve_batch(messages=[b"10", b"20", b"30"])
+
+    patched_logging_error.assert_called_once()
+    patched_resend_message.assert_called_once_with(
+        message=Message(payload="20", rw_resend_times=0),
+        reason="BatchResendException('resend_error')",
+    )
+
+
+@pytest.mark.asyncio
+async def test_resolve_batch_exception():
+    async def callback(messages):
+        raise Exception("error")
+
+    chauffeur_service = get_chauffeur_service(callback, batch=True)
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        with patch.object(
+            ChauffeurService, "_resend_message", return_value=None
+        ) as patched_resend_message:
+            await chauffeur_service._resolve_batch(messages=[b"10"])
+
+    patched_logging_error.assert_called_once()
+    patched_resend_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resend_message():
+    async def callback(message):
+        raise ResendException("resend_error")
+
+    chauffeur_service = get_chauffeur_service(callback)
+    with patch.object(
+        StubQueueConnector, "send_messages", return_value=None
+    ) as patched_send_messages:
+        chauffeur_service._resend_message(
+            message=Message(payload="10", rw_resend_times=0)
+        )
+        patched_send_messages.assert_not_called()
+        chauffeur_service._flush_completed()
+        await asyncio.wait(chauffeur_service._completion_tasks)
+
+    patched_send_messages.assert_called_with(b'{"payload": "10", "rw_resend_times": 1}')
+
+
+@pytest.mark.asyncio
+async def test_resend_message_orjson_codec():
+    async def callback(message):
+        raise ResendException("resend_error")
+
+    chauffeur_service = get_chauffeur_service(callback, codec="orjson")
+    with patch.object(
+        StubQueueConnector, "send_messages", return_value=None
+    ) as patched_send_messages:
+        chauffeur_service._resend_message(
+            message=Message(payload="10", rw_resend_times=0)
+        )
+        chauffeur_service._flush_completed()
+        await asyncio.wait(chauffeur_service._completion_tasks)
+
+    patched_send_messages.assert_called_with(b'{"payload":"10","rw_resend_times":1}')
+
+
+@pytest.mark.asyncio
+async def test_dispatch_flush_resends_in_batch():
+    sent = asyncio.Event()
+
+    async def callback(message):
+        raise ResendException("resend_error")
+
+    async def send_messages_batch(messages):
+        await sent.wait()
+
+    chauffeur_service = get_chauffeur_service(callback, max_chunk_size=3)
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector, "send_messages_batch", side_effect=send_messages_batch
+    ) as patched_send_messages_batch:
+        await chauffeur_service._dispatch(
+            records=[Record(value=b"1"), Record(value=b"2"), Record(value=b"3")]
+        )
+        assert len(chauffeur_service._completion_tasks) == 1
+        sent.set()
+        await asyncio.wait(chauffeur_service._completion_tasks)
+
+    patched_send_messages_batch.assert_called_once_with(
+        [
+            b'{"payload": "1", "rw_resend_times": 1}',
+            b'{"payload": "2", "rw_resend_times": 1}',
+            b'{"payload": "3", "rw_resend_times": 1}',
+        ]
+    )
+    assert chauffeur_service._completion_tasks == set()
+
+
+@pytest.mark.asyncio
+async def test_send_completed_error():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback)
+    with patch(
+        "logging.error", return_value=None
+    ) as patched_logging_error, patch.object(
+        StubQueueConnector, "send_messages_batch", side_effect=Exception("error")
+    ):
+        await chauffeur_service._send_completed(messages=[b"1"])
+
+    patched_logging_error.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_partition_ordered():
+    events = []
+
+    async def callback(message):
+        events.append(("start", message.payload))
+        await asyncio.sleep(0.2 if message.payload == "a1" else 0.01)
+        events.append(("end", message.payload))
+
+    records = [
+        Record(value=b"a1", partition_key="a"),
+        Record(value=b"b1", partition_key="b"),
+        Record(value=b"a2", partition_key="a"),
+        Record(value=b"b2", partition_key="b"),
+    ]
+    chauffeur_service = get_chauffeur_service(
+        callback, max_chunk_size=4, partition_ordered=True
+    )
+    await chauffeur_service._dispatch(records=records)
+
+    assert events.index(("end", "a1")) < events.index(("start", "a2"))
+    assert events.index(("end", "b1")) < events.index(("start", "b2"))
+    assert events.index(("end", "b2")) < events.index(("end", "a1"))
+
+
+@pytest.mark.asyncio
+async def test_dispatch_partition_ordered_max_in_flight():
+    running = []
+    max_running = []
+
+    async def callback(message):
+        running.append(message.payload)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(message.payload)
+
+    records = [Record(value=str(i).encode(), partition_key=i % 3) for i in range(6)]
+    chauffeur_service = get_chauffeur_service(
+        callback, max_chunk_size=6, partition_ordered=True, max_in_flight=2
+    )
+    await chauffeur_service._dispatch(records=records)
+
+    assert len(max_running) == 6
+    assert max(max_running) == 2
+
+
+@pytest.mark.asyncio
+async def test_fetch_blocking():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback, frequency=2)
+    with patch.object(
+        StubQueueConnector, "supports_blocking_fetch", True
+    ), patch.object(
+        StubQueueConnector, "get_records", return_value=[Record(value=b"1")]
+    ) as patched_get_records, patch.object(
+        ChauffeurService, "_clock_handler", return_value=None
+    ) as patched_clock_handler:
+        records = await chauffeur_service._fetch()
+
+    assert records == [Record(value=b"1")]
+    patched_get_records.assert_awaited_once_with(max_chunk_size=1, timeout=2)
+    patched_clock_handler.assert_not_called()
+
+
+class StubMetricsSink(AMetricsSink):
+    events = []
+
+    def on_fetch(self, latency: float, chunk_size: int):
+        self.events.append(("fetch", chunk_size))
+
+    def on_handler(self, latency: float, size: int, outcome: str):
+        self.events.append(("handler", size, outcome))
+
+    def on_in_flight(self, in_flight: int):
+        self.events.append(("in_flight", in_flight))
+
+    def close(self):
+        self.events.append(("close",))
+
+
+@pytest.mark.asyncio
+async def test_metrics_sink():
+    async def callback(message):
+        if message.payload == "2":
+            raise ResendException("resend_error")
+        if message.payload == "3":
+            raise Exception("error")
+
+    StubMetricsSink.events = []
+    register_metrics_sink(name="stub", sink=StubMetricsSink)
+    chauffeur_service = get_chauffeur_service(
+        callback, sequential=True, max_chunk_size=3, metrics="stub"
+    )
+    records = [Record(value=str(i).encode()) for i in range(1, 4)]
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector, "get_records", return_value=records
+    ), patch.object(
+        ChauffeurService, "_clock_handler", return_value=None
+    ), patch.object(
+        StubQueueConnector, "send_messages_batch", return_value=None
+    ):
+        await chauffeur_service._dispatch(records=await chauffeur_service._fetch())
+        await chauffeur_service.stop(timeout=1)
+
+    assert chauffeur_service._metrics.queue_name == "test_queue_name"
+    assert StubMetricsSink.events == [
+        ("fetch", 3),
+        ("in_flight", 1),
+        ("handler", 1, "success"),
+        ("in_flight", 0),
+        ("in_flight", 1),
+        ("handler", 1, "resend"),
+        ("in_flight", 0),
+        ("in_flight", 1),
+        ("handler", 1, "error"),
+        ("in_flight", 0),
+        ("close",),
+    ]
+
+
+class StubMiddleware(AMiddleware):
+    def __init__(self, name: str, events: list):
+        self._name = name
+        self._events = events
+
+    async def __call__(self, context, call_next):
+        self._events.append((self._name, context))
+        await call_next()
+        self._events.append((self._name, "after"))
+
+    def close(self):
+        self._events.append((self._name, "close"))
+
+
+@pytest.mark.asyncio
+async def test_middlewares():
+    events = []
+
+    async def callback(messages):
+        events.append(("handler", messages))
+
+    register_middleware(name="outer", middleware=StubMiddleware("outer", events))
+    register_middleware(name="inner", middleware=StubMiddleware("inner", events))
+    chauffeur_service = get_chauffeur_service(
+        callback, batch=True, middlewares=("outer", "inner")
+    )
+    records = [Record(value=b"10", partition_key=0, offset=1)]
+    await chauffeur_service._resolve_records_batch(records=records)
+    await chauffeur_service.stop(timeout=1)
+
+    context = events[0][1]
+    assert context == HandlerContext(
+        connector_name="test_connector_name",
+        queue_name="test_queue_name",
+        callback=callback,
+        argument=[Message(payload="10", rw_resend_times=0)],
+        records=records,
+        batch=True,
+    )
+    assert events == [
+        ("outer", context),
+        ("inner", context),
+        ("handler", [Message(payload="10", rw_resend_times=0)]),
+        ("inner", "after"),
+        ("outer", "after"),
+        ("outer", "close"),
+        ("inner", "close"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_backpressure_messages():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(
+        callback, frequency=0, max_chunk_size=2, high_water_messages=3
+    )
+    with patch.object(
+        StubQueueConnector, "get_messages", return_value=[b"1", b"2"]
+    ), patch.object(
+        StubQueueConnector, "pause", return_value=None
+    ) as patched_pause, patch.object(
+        StubQueueConnector, "resume", return_value=None
+    ) as patched_resume:
+        first = await chauffeur_service._fetch()
+        patched_pause.assert_not_called()
+        second = await chauffeur_service._fetch()
+        patched_pause.assert_awaited_once()
+
+        await chauffeur_service._dispatch(records=first)
+        await chauffeur_service._apply_backpressure()
+        patched_resume.assert_not_called()
+        await chauffeur_service._resolve_record(second[0])
+        await chauffeur_service._apply_backpressure()
+        patched_resume.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_fetch_backpressure_bytes():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(
+        callback,
+        frequency=0,
+        max_chunk_size=1,
+        high_water_bytes=10,
+        low_water_bytes=0,
+    )
+    with patch.object(
+        StubQueueConnector, "get_messages", return_value=[b"0123456789"]
+    ), patch.object(
+        StubQueueConnector, "pause", return_value=None
+    ) as patched_pause, patch.object(
+        StubQueueConnector, "resume", return_value=None
+    ) as patched_resume:
+        records = await chauffeur_service._fetch()
+        patched_pause.assert_awaited_once()
+        await chauffeur_service._dispatch(records=records)
+        await chauffeur_service._fetch()
+        patched_resume.assert_awaited_once()
+        assert patched_pause.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_resend_message_max_attempts():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback, retry_max_attempts=2)
+    with patch("logging.error", return_value=None) as patched_logging_error:
+        assert chauffeur_service._resend_message(
+            message=Message(payload="10", rw_resend_times=1)
+        )
+        assert not chauffeur_service._resend_message(
+            message=Message(payload="10", rw_resend_times=2)
+        )
+
+    patched_logging_error.assert_called_once()
+    assert chauffeur_service._resends == [b'{"payload": "10", "rw_resend_times": 2}']
+
+
+def get_dead_letter_connector() -> StubQueueConnector:
+    return StubQueueConnector(
+        connector_config=GenericConnectorConfig(connector_name="dead_letters"),
+        config=GenericQueueConfig(
+            connector_name="dead_letters",
+            frequency=1,
+            max_chunk_size=1,
+            sequential=False,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_dispatch_dead_letter():
+    async def callback(message):
+        raise ResendException("resend_error")
+
+    dead_letter_connector = get_dead_letter_connector()
+    chauffeur_service = get_chauffeur_service(
+        callback,
+        dead_letter_connector=dead_letter_connector,
+        retry_max_attempts=1,
+        dead_letter=dead_letter_connector._config,
     )
+    record = Record(value=b'{"payload": "10", "rw_resend_times": 1}', offset=1)
+    with patch.object(
+        StubQueueConnector, "acks_records", new_callable=PropertyMock, return_value=True
+    ), patch.object(
+        StubQueueConnector, "send_messages_batch", return_value=None
+    ) as patched_send_messages_batch, patch.object(
+        StubQueueConnector, "ack", return_value=None
+    ) as patched_ack:
+        await chauffeur_service._dispatch(records=[record])
+        await asyncio.wait(chauffeur_service._completion_tasks)
 
-    chauffeur = ChauffeurService(
-        queue_connector=StubQueueConnector(
-            connector_config=GenericConnectorConfig(connector_name="tests"),
-            config=queue_config,
-        ),
-        itinerary=Itinerary(
-            queue_name="test_queue_name", config=queue_config, callback=callback
-        ),
+    patched_send_messages_batch.assert_awaited_once_with(
+        [
+            b'{"payload": "10", "rw_resend_times": 1, '
+            b'"rw_dead_letter_reason": "ResendException(\'resend_error\')"}'
+        ]
     )
-    return chauffeur
+    patched_ack.assert_awaited_once_with(records=[record])
 
 
 @pytest.mark.asyncio
-async def test_clock_handler():
+async def test_send_completed_dead_letter_error_skip_ack():
     async def callback(message):
         pass
 
-    with patch("asyncio.sleep", return_value=None) as patched_asyncio_sleep:
-        with patch("logging.warning", return_value=None) as patched_logging_warning:
-            with freezegun.freeze_time("2012-01-14T00:00:00.000"):
-                chauffeur_service = get_chauffeur_service(callback)
-                await chauffeur_service._clock_handler()
-            with freezegun.freeze_time("2012-01-14T00:00:01.000"):
-                await chauffeur_service._clock_handler()
-            with freezegun.freeze_time("2012-01-14T00:00:01.500"):
-                await chauffeur_service._clock_handler()
-            with freezegun.freeze_time("2012-01-14T00:00:03.000"):
-                await chauffeur_service._clock_handler()
-    patched_asyncio_sleep.assert_has_calls([call(0), call(0), call(0.5), call(0)])
-    patched_logging_warning.assert_called_once()
+    dead_letter_connector = get_dead_letter_connector()
+    chauffeur_service = get_chauffeur_service(
+        callback,
+        dead_letter_connector=dead_letter_connector,
+        retry_max_attempts=1,
+        dead_letter=dead_letter_connector._config,
+    )
+    with patch(
+        "logging.error", return_value=None
+    ) as patched_logging_error, patch.object(
+        StubQueueConnector, "send_messages_batch", side_effect=Exception("error")
+    ), patch.object(
+        StubQueueConnector, "ack", return_value=None
+    ) as patched_ack:
+        await chauffeur_service._send_completed(
+            messages=[],
+            resent_records=[Record(value=b"2", partition_key=0, offset=2)],
+            dead_letters=[b"2"],
+        )
+
+    patched_logging_error.assert_called_once()
+    patched_ack.assert_not_called()
+
+
+def test_retry_delay():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(
+        callback, retry_delay=0.5, retry_multiplier=3
+    )
+    assert chauffeur_service._retry_delay(attempt=1) == 0.5
+    assert chauffeur_service._retry_delay(attempt=3) == 4.5
+
+    chauffeur_service = get_chauffeur_service(callback, retry_delay=1, retry_jitter=0.5)
+    for _ in range(20):
+        assert 0.5 <= chauffeur_service._retry_delay(attempt=1) <= 1.5
 
 
 @pytest.mark.asyncio
-async def test_resolve_message_exception():
+async def test_dispatch_delayed_resend():
     async def callback(message):
-        raise Exception("resend_error")
+        raise ResendException("resend_error")
+
+    record = Record(value=b"1", partition_key=0, offset=1)
+    chauffeur_service = get_chauffeur_service(callback, retry_delay=0.2)
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector, "acks_records", new_callable=PropertyMock, return_value=True
+    ), patch.object(
+        StubQueueConnector, "send_messages_batch", return_value=None
+    ) as patched_send_messages_batch, patch.object(
+        StubQueueConnector, "ack", return_value=None
+    ) as patched_ack:
+        await chauffeur_service._dispatch(records=[record])
+        await asyncio.sleep(0.1)
+        patched_send_messages_batch.assert_not_called()
+        patched_ack.assert_not_called()
+        await asyncio.sleep(0.15)
+
+    patched_send_messages_batch.assert_awaited_once_with(
+        [b'{"payload": "1", "rw_resend_times": 1}']
+    )
+    patched_ack.assert_awaited_once_with(records=[record])
+
+
+@pytest.mark.asyncio
+async def test_stop_send_delayed_resends():
+    async def callback(message):
+        raise ResendException("resend_error")
+
+    chauffeur_service = get_chauffeur_service(callback, retry_delay=10)
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector, "send_messages_batch", return_value=None
+    ) as patched_send_messages_batch, patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ):
+        await chauffeur_service._dispatch(records=[Record(value=b"1")])
+        await chauffeur_service.stop(timeout=1)
 
+    patched_send_messages_batch.assert_awaited_once_with(
+        [b'{"payload": "1", "rw_resend_times": 1}']
+    )
+
+
+@pytest.mark.asyncio
+async def test_dispatch_ack_records():
+    async def callback(message):
+        if message.payload == "2":
+            raise ResendException("resend_error")
+
+    records = [
+        Record(value=str(i).encode(), partition_key=0, offset=i) for i in range(3)
+    ]
+    chauffeur_service = get_chauffeur_service(
+        callback, sequential=True, max_chunk_size=3
+    )
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector, "acks_records", new_callable=PropertyMock, return_value=True
+    ), patch.object(
+        StubQueueConnector, "send_messages_batch", return_value=None
+    ), patch.object(
+        StubQueueConnector, "ack", return_value=None
+    ) as patched_ack:
+        await chauffeur_service._dispatch(records=records)
+        await asyncio.wait(chauffeur_service._completion_tasks)
+
+    patched_ack.assert_awaited_once_with(records=[records[0], records[1], records[2]])
+
+
+@pytest.mark.asyncio
+async def test_send_completed_resend_error_skip_ack():
+    async def callback(message):
+        pass
+
+    records = [Record(value=b"1", partition_key=0, offset=1)]
+    resent_records = [Record(value=b"2", partition_key=0, offset=2)]
     chauffeur_service = get_chauffeur_service(callback)
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector, "send_messages_batch", side_effect=Exception("error")
+    ), patch.object(StubQueueConnector, "ack", return_value=None) as patched_ack:
+        await chauffeur_service._send_completed(
+            messages=[b"2"], acks=records, resent_records=resent_records
+        )
 
-    with patch("logging.error", return_value=None) as patched_logging_error:
-        await chauffeur_service._resolve_message(message=b"10")
+    patched_ack.assert_awaited_once_with(records=records)
 
-    patched_logging_error.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_send_completed_resend_error_retry(monkeypatch):
+    monkeypatch.setattr(service, "SEND_RETRY_DELAY", 0.05)
+
+    async def callback(message):
+        pass
+
+    resent_records = [Record(value=b"2", partition_key=0, offset=2)]
+    chauffeur_service = get_chauffeur_service(callback)
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector,
+        "send_messages_batch",
+        side_effect=[Exception("error"), Exception("error"), None],
+    ) as patched_send_messages_batch, patch.object(
+        StubQueueConnector, "ack", return_value=None
+    ) as patched_ack:
+        await chauffeur_service._send_completed(
+            messages=[b"2"], resent_records=resent_records
+        )
+        patched_ack.assert_not_called()
+        await asyncio.sleep(0.3)
+
+    assert patched_send_messages_batch.await_count == 3
+    patched_send_messages_batch.assert_awaited_with([b"2"])
+    patched_ack.assert_awaited_once_with(records=resent_records)
+    assert chauffeur_service._failed_sends == []
+    assert chauffeur_service._send_failures == 0
 
 
 @pytest.mark.asyncio
-async def test_resolve_message_resend_exception():
+async def test_stop_retry_failed_sends(monkeypatch):
+    monkeypatch.setattr(service, "SEND_RETRY_DELAY", 60)
+
     async def callback(message):
-        raise ResendException("resend_error")
+        pass
 
+    resent_records = [Record(value=b"2", partition_key=0, offset=2)]
     chauffeur_service = get_chauffeur_service(callback)
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector,
+        "send_messages_batch",
+        side_effect=[Exception("error"), None],
+    ) as patched_send_messages_batch, patch.object(
+        StubQueueConnector, "ack", return_value=None
+    ) as patched_ack, patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ):
+        await chauffeur_service._send_completed(
+            messages=[b"2"], resent_records=resent_records
+        )
+        await asyncio.wait_for(chauffeur_service.stop(timeout=1), timeout=0.5)
 
-    with patch("logging.error", return_value=None) as patched_logging_error:
-        with patch.object(
-            ChauffeurService, "_resend_message", return_value=None
-        ) as patched_resend_message:
-            await chauffeur_service._resolve_message(message=b"10")
+    assert patched_send_messages_batch.await_count == 2
+    patched_ack.assert_awaited_once_with(records=resent_records)
 
-    patched_logging_error.assert_called_once()
-    patched_resend_message.assert_called_with(message=b"10")
+
+@pytest.mark.asyncio
+async def test_dispatch_without_acks_records():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback)
+    with patch.object(StubQueueConnector, "ack", return_value=None) as patched_ack:
+        await chauffeur_service._dispatch(records=[Record(value=b"1")])
+
+    assert chauffeur_service._completion_tasks == set()
+    patched_ack.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_resend_message():
+async def test_stop_flush_resends():
     async def callback(message):
         raise ResendException("resend_error")
 
-    chauffeur_service = get_chauffeur_service(callback)
-    with patch.object(
-        StubQueueConnector, "send_messages", return_value=None
-    ) as patched_send_messages:
-        await chauffeur_service._resend_message(message=b"10")
+    chauffeur_service = get_chauffeur_service(
+        callback, max_chunk_size=2, max_in_flight=1
+    )
+    with patch("logging.error", return_value=None), patch.object(
+        StubQueueConnector, "send_messages_batch", return_value=None
+    ) as patched_send_messages_batch, patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ):
+        chauffeur_service._resend_message(
+            message=Message(payload="10", rw_resend_times=0)
+        )
+        await chauffeur_service.stop(timeout=1)
 
-    patched_send_messages.assert_called_with(b'{"payload": "10", "rw_resend_times": 1}')
+    patched_send_messages_batch.assert_awaited_once_with(
+        [b'{"payload": "10", "rw_resend_times": 1}']
+    )
 
 
 @pytest.mark.asyncio
@@ -168,6 +1075,283 @@ async def test_watch_sequential_true():
     assert datetime_b == datetime_a
 
 
+@pytest.mark.asyncio
+async def test_watch_max_in_flight():
+    running = []
+    max_running = []
+    message_call_sequence = []
+
+    async def callback(message):
+        running.append(message)
+        max_running.append(len(running))
+        await asyncio.sleep(0.45 if message.payload == "slow" else 0.1)
+        running.remove(message)
+        message_call_sequence.append(message.payload)
+
+    chauffeur_service = get_chauffeur_service(
+        callback, max_chunk_size=4, max_in_flight=2, adaptive_frequency=True
+    )
+    with patch.object(
+        StubQueueConnector,
+        "get_messages",
+        side_effect=[[b"slow", b"1", b"2", b"3"], [b"4", b"5"]] + [[]] * 10,
+    ) as patched_get_messages:
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.35)
+        assert patched_get_messages.call_count >= 2
+        assert message_call_sequence == ["1", "2", "3"]
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert max(max_running) == 2
+    assert message_call_sequence == ["1", "2", "3", "4", "slow", "5"]
+
+
+@pytest.mark.asyncio
+async def test_watch_prefetch():
+    events = []
+    chunks = [[b"1", b"2"], [b"3", b"4"]]
+
+    async def callback(message):
+        events.append(f"start {message.payload}")
+        await asyncio.sleep(0.2)
+
+    async def get_messages(max_chunk_size):
+        events.append("fetch")
+        await asyncio.sleep(0.1)
+        return chunks.pop(0) if chunks else []
+
+    chauffeur_service = get_chauffeur_service(
+        callback, max_chunk_size=2, prefetch=1, adaptive_frequency=True
+    )
+    with patch.object(StubQueueConnector, "get_messages", side_effect=get_messages):
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.45)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert events[:5] == ["fetch", "fetch", "start 1", "start 2", "fetch"]
+    assert "start 3" in events
+    assert events.index("start 3") < 8
+
+
+@pytest.mark.asyncio
+async def test_watch_prefetch_fetch_error():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback, prefetch=2)
+    with patch.object(
+        StubQueueConnector, "get_messages", side_effect=ConnectionError("down")
+    ):
+        with pytest.raises(ConnectionError):
+            await chauffeur_service._watch()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_stop_full_buffer():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback, prefetch=1)
+    buffer = asyncio.Queue(maxsize=1)
+    buffer.put_nowait([Record(value=b"1")])
+    chauffeur_service._stopping = True
+    await asyncio.wait_for(chauffeur_service._prefetch(buffer=buffer), timeout=0.5)
+
+    assert buffer.get_nowait() == [Record(value=b"1")]
+    assert buffer.empty() is True
+
+
+@pytest.mark.asyncio
+async def test_stop_while_fetching():
+    async def callback(message):
+        pass
+
+    chauffeur_service = get_chauffeur_service(callback, frequency=60)
+    with patch.object(
+        StubQueueConnector, "get_messages", return_value=[]
+    ), patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ) as patched_on_stop:
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(chauffeur_service.stop(timeout=1), timeout=0.5)
+
+    assert task.done() is True
+    assert task.cancelled() is False
+    patched_on_stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_in_flight():
+    done = []
+
+    async def callback(message):
+        await asyncio.sleep(0.3)
+        done.append(message.payload)
+
+    chauffeur_service = get_chauffeur_service(
+        callback, max_chunk_size=2, max_in_flight=2
+    )
+    with patch.object(
+        StubQueueConnector, "get_messages", side_effect=[[b"1", b"2"]] + [[]] * 10
+    ), patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ) as patched_on_stop:
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.1)
+        await chauffeur_service.stop(timeout=1)
+
+    assert done == ["1", "2"]
+    assert task.done() is True
+    patched_on_stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stop_timeout():
+    async def callback(message):
+        await asyncio.sleep(5)
+
+    chauffeur_service = get_chauffeur_service(callback, sequential=True)
+    with patch.object(
+        StubQueueConnector, "get_messages", return_value=[b"1"]
+    ), patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ) as patched_on_stop, patch(
+        "logging.warning", return_value=None
+    ) as patched_logging_warning, patch(
+        "logging.error", return_value=None
+    ):
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(chauffeur_service.stop(timeout=0.1), timeout=1)
+
+    assert task.done() is True
+    patched_logging_warning.assert_called_once()
+    patched_on_stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("config_kwargs", [{}, {"max_in_flight": 2}])
+async def test_stop_timeout_skip_ack_cancelled(config_kwargs):
+    async def callback(message):
+        await asyncio.sleep(5)
+
+    records = [Record(value=b"1", partition_key=0, offset=1)]
+    chauffeur_service = get_chauffeur_service(callback, **config_kwargs)
+    with patch.object(
+        StubQueueConnector, "get_records", side_effect=[records]
+    ), patch.object(
+        StubQueueConnector, "acks_records", new_callable=PropertyMock, return_value=True
+    ), patch.object(
+        StubQueueConnector, "ack", return_value=None
+    ) as patched_ack, patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ), patch(
+        "logging.warning", return_value=None
+    ):
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.1)
+        await asyncio.wait_for(chauffeur_service.stop(timeout=0.1), timeout=1)
+
+    assert task.done() is True
+    patched_ack.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stop_prefetch_timeout():
+    done = []
+
+    async def callback(message):
+        await asyncio.sleep(2)
+        done.append(message.payload)
+
+    chauffeur_service = get_chauffeur_service(
+        callback, sequential=True, prefetch=1, adaptive_frequency=True
+    )
+    with patch.object(
+        StubQueueConnector, "get_messages", side_effect=[[b"1"], [b"2"], [b"3"]]
+    ), patch.object(StubQueueConnector, "on_stop", return_value=None), patch(
+        "logging.warning", return_value=None
+    ):
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.05)
+        started = asyncio.get_running_loop().time()
+        await asyncio.wait_for(chauffeur_service.stop(timeout=0.1), timeout=1)
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed < 0.5
+    assert done == []
+    assert task.done() is True
+    assert task.cancelled() is False
+
+
+@pytest.mark.asyncio
+async def test_stop_prefetch_handles_buffered_chunks():
+    done = []
+
+    async def callback(message):
+        await asyncio.sleep(0.1)
+        done.append(message.payload)
+
+    chauffeur_service = get_chauffeur_service(
+        callback, sequential=True, prefetch=2, adaptive_frequency=True
+    )
+    with patch.object(
+        StubQueueConnector, "get_messages", side_effect=[[b"1"], [b"2"], [b"3"]]
+    ), patch.object(StubQueueConnector, "on_stop", return_value=None):
+        task = asyncio.create_task(chauffeur_service._watch())
+        await asyncio.sleep(0.05)
+        await chauffeur_service.stop(timeout=1)
+
+    assert done == ["1", "2", "3"]
+    assert task.done() is True
+
+
+@pytest.mark.asyncio
+async def test_run_stop_event():
+    async def callback(message):
+        pass
+
+    itinerary = Itinerary(
+        queue_name="test_queue_name",
+        config=GenericQueueConfig(
+            connector_name="test_connector_name",
+            frequency=1,
+            max_chunk_size=1,
+            sequential=False,
+        ),
+        callback=callback,
+    )
+    region_map = RegionMap(
+        spawn_process=False,
+        config=GenericConnectorConfig(connector_name="test_connector_name"),
+        connector=StubQueueConnector,
+    )
+    stop_event = asyncio.Event()
+    with patch.object(
+        StubQueueConnector, "get_messages", return_value=[]
+    ), patch.object(
+        StubQueueConnector, "on_stop", return_value=None
+    ) as patched_on_stop:
+        task = asyncio.create_task(
+            ChauffeurService.run(
+                region_map=region_map,
+                itineraries=[itinerary, itinerary],
+                stop_event=stop_event,
+            )
+        )
+        await asyncio.sleep(0.1)
+        stop_event.set()
+        await asyncio.wait_for(task, timeout=1)
+
+    assert patched_on_stop.await_count == 2
+
+
 @pytest.mark.asyncio
 async def test_run():
     async def callback(message):
@@ -202,3 +1386,39 @@ async def test_run():
         task.cancel()
 
     assert path_watch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_run_shares_resource_pool():
+    async def callback(message):
+        pass
+
+    itinerary = Itinerary(
+        queue_name="test_queue_name",
+        config=GenericQueueConfig(
+            connector_name="test_connector_name",
+            frequency=1,
+            max_chunk_size=1,
+            sequential=False,
+        ),
+        callback=callback,
+    )
+    region_map = RegionMap(
+        spawn_process=False,
+        config=GenericConnectorConfig(connector_name="test_connector_name"),
+        connector=StubQueueConnector,
+    )
+    connectors = []
+
+    async def on_start(self):
+        connectors.append(self)
+
+    with patch.object(StubQueueConnector, "on_start", on_start), patch.object(
+        ChauffeurService, "_watch", return_value=None
+    ):
+        await ChauffeurService.run(
+            region_map=region_map, itineraries=[itinerary, itinerary]
+        )
+
+    assert len(connectors) == 2
+    assert connectors[0]._resource_pool is connectors[1]._resource_pool
@@ -1,5 +1,5 @@
 import asyncio
-from unittest.mock import patch
+from unittest.mock import patch, PropertyMock
 
 import pytest
 
@@ -79,8 +79,71 @@ async def test_start_and_end():
         task = asyncio.create_task(guide_service.start())
         await asyncio.sleep(0)
     with patch.object(Spawner, "close", return_value=None) as patch_close:
-        guide_service.end()
+        await guide_service.end()
     task.cancel()
 
     patch_start.assert_called_once()
     patch_close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_restart_counts():
+    guide_service_singleton_ref.clean_references()
+    guide_service = GuideService()
+    guide_service.register_connector(
+        connector=StubQueueConnector,
+        config=GenericConnectorConfig(connector_name="test_connector_name"),
+        spawn_process=False,
+    )
+    with patch.object(Spawner, "start", return_value=None):
+        await guide_service.start()
+    with patch.object(
+        Spawner, "restart_counts", new_callable=PropertyMock, return_value=[1, 2]
+    ):
+        assert guide_service.restart_counts() == {"test_connector_name": 3}
+
+
+def test_with_dead_letter_map():
+    guide_service_singleton_ref.clean_references()
+    guide_service = GuideService()
+
+    async def callback(message):
+        pass
+
+    dead_letter_config = GenericConnectorConfig(connector_name="dead_letters")
+    guide_service.register_connector(
+        connector=StubQueueConnector, config=dead_letter_config, spawn_process=False
+    )
+    itinerary = Itinerary(
+        queue_name="test_queue_name",
+        config=GenericQueueConfig(
+            connector_name="test_connector_name",
+            frequency=1,
+            sequential=False,
+            max_chunk_size=10,
+            retry_max_attempts=3,
+            dead_letter=GenericQueueConfig(
+                connector_name="dead_letters",
+                frequency=1,
+                sequential=False,
+                max_chunk_size=10,
+            ),
+        ),
+        callback=callback,
+    )
+
+    assert guide_service._with_dead_letter_map(
+        itinerary=itinerary
+    ).dead_letter_map == RegionMap(
+        spawn_process=False, config=dead_letter_config, connector=StubQueueConnector
+    )
+
+    guide_service_singleton_ref.clean_references()
+    guide_service = GuideService()
+    with pytest.raises(ValueError) as exception:
+        guide_service._with_dead_letter_map(itinerary=itinerary)
+
+    assert (
+        exception.value.args[0]
+        == "The dead letter connector dead_letters is not registered"
+    )
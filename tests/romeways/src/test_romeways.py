@@ -42,6 +42,151 @@ def test_queue_consumer_invalid_controller():
     assert exception.value.args[0] == "The callback is not a coroutine function"
 
 
+def test_queue_consumer_wrong_retry_jitter():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        retry_jitter=1.5,
+    )
+
+    with pytest.raises(ValueError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert (
+        exception.value.args[0] == "The retry_jitter attribute is not between 0 and 1"
+    )
+
+
+def test_queue_consumer_wrong_dead_letter():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        retry_max_attempts=3,
+        dead_letter="dead_letters",
+    )
+
+    with pytest.raises(TypeError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert (
+        exception.value.args[0]
+        == "The dead_letter attribute is not a subclass of GenericQueueConfig"
+    )
+
+
+def test_queue_consumer_dead_letter_without_retry_max_attempts():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        dead_letter=GenericQueueConfig(
+            connector_name="dead_letters",
+            max_chunk_size=10,
+            frequency=1,
+            sequential=False,
+        ),
+    )
+
+    with pytest.raises(ValueError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert (
+        exception.value.args[0] == "The dead_letter attribute needs retry_max_attempts"
+    )
+
+
+def test_queue_consumer_wrong_handler_timeout():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        handler_timeout=0,
+    )
+
+    with pytest.raises(ValueError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert (
+        exception.value.args[0] == "The handler_timeout attribute is not greater than 0"
+    )
+
+
+def test_queue_consumer_wrong_executor():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        executor="fiber",
+    )
+
+    with pytest.raises(ValueError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        def controller(message):
+            pass
+
+    assert exception.value.args[0] == "The executor attribute is not thread or process"
+
+
+def test_queue_consumer_executor_with_coroutine():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        executor="thread",
+    )
+
+    with pytest.raises(TypeError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert (
+        exception.value.args[0]
+        == "The callback is a coroutine function and can not use executor"
+    )
+
+
+def test_queue_consumer_executor():
+    guide_service_singleton_ref.clean_references()
+
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        executor="process",
+    )
+
+    @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+    def controller(message):
+        pass
+
+    itinerary = GuideService()._itineraries["test_connector_name"][0]
+    assert itinerary.callback is controller
+
+
 def test_queue_consumer():
     guide_service_singleton_ref.clean_references()
 
@@ -57,6 +202,116 @@ def test_queue_consumer():
         pass
 
 
+def test_queue_consumer_batch():
+    guide_service_singleton_ref.clean_references()
+
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+    )
+
+    @romeways.queue_consumer(queue_name="test_queue_name", config=config, batch=True)
+    async def controller(messages):
+        pass
+
+    itinerary = GuideService()._itineraries["test_connector_name"][0]
+    assert itinerary.batch is True
+    assert itinerary.callback is controller
+
+
+def test_queue_consumer_unknown_codec():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        codec="not_registered",
+    )
+
+    with pytest.raises(ValueError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert exception.value.args[0] == "The codec not_registered is not registered"
+
+
+def test_codec_register_wrong_codec_type():
+    class StubCodec:
+        pass
+
+    with pytest.raises(TypeError) as exception:
+        romeways.codec_register(name="stub", codec=StubCodec)
+
+    assert exception.value.args[0] == "The codec attribute is not a subclass of ACodec"
+
+
+def test_queue_consumer_unknown_metrics():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        metrics="not_registered",
+    )
+
+    with pytest.raises(ValueError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert (
+        exception.value.args[0] == "The metrics sink not_registered is not registered"
+    )
+
+
+def test_metrics_register_wrong_sink_type():
+    class StubSink:
+        pass
+
+    with pytest.raises(TypeError) as exception:
+        romeways.metrics_register(name="stub", sink=StubSink)
+
+    assert (
+        exception.value.args[0]
+        == "The sink attribute is not a subclass of AMetricsSink"
+    )
+
+
+def test_queue_consumer_unknown_middleware():
+    config = GenericQueueConfig(
+        connector_name="test_connector_name",
+        max_chunk_size=10,
+        frequency=1,
+        sequential=False,
+        middlewares=("not_registered",),
+    )
+
+    with pytest.raises(ValueError) as exception:
+
+        @romeways.queue_consumer(queue_name="test_queue_name", config=config)
+        async def controller(message):
+            pass
+
+    assert exception.value.args[0] == "The middleware not_registered is not registered"
+
+
+def test_middleware_register_wrong_middleware_type():
+    with pytest.raises(TypeError) as exception:
+        romeways.middleware_register(
+            name="stub", middleware=romeways.ProfilerMiddleware
+        )
+
+    assert (
+        exception.value.args[0]
+        == "The middleware attribute is not an instance of AMiddleware"
+    )
+
+
 def test_connector_register_wrong_config_type():
     class StubConfig:
         pass
@@ -92,6 +347,42 @@ def test_connector_register_wrong_connector_type():
     )
 
 
+def test_connector_register_wrong_spawn_process():
+    with pytest.raises(TypeError) as exception:
+        romeways.connector_register(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(connector_name="test_connector_name"),
+            spawn_process="2",
+        )
+
+    assert (
+        exception.value.args[0] == "The spawn_process attribute is not a bool or an int"
+    )
+
+
+def test_connector_register_negative_spawn_process():
+    with pytest.raises(ValueError) as exception:
+        romeways.connector_register(
+            connector=StubQueueConnector,
+            config=GenericConnectorConfig(connector_name="test_connector_name"),
+            spawn_process=-1,
+        )
+
+    assert exception.value.args[0] == "The spawn_process attribute must not be negative"
+
+
+def test_connector_register_process_pool():
+    guide_service_singleton_ref.clean_references()
+    romeways.connector_register(
+        connector=StubQueueConnector,
+        config=GenericConnectorConfig(connector_name="test_connector_name"),
+        spawn_process=4,
+    )
+
+    region_map = GuideService()._region_maps["test_connector_name"]
+    assert region_map.spawn_process == 4
+
+
 def test_connector_register():
     guide_service_singleton_ref.clean_references()
     romeways.connector_register(